@@ -1,63 +1,69 @@
+import os
+import queue
+import sys
+import time
 from tkinter import PhotoImage
 
 import customtkinter
 from customtkinter import *
 
+from contact_index import FieldIndex, NameIndex, SearchCache, SearchWorker, SortedNameIndex
+from contact_store import ContactStore
+from contact_list_view import ContactListView
+from contact_phone import PhoneTrie, normalize_phone, phone_key
+from contact_stats import stats
+from contact_storage import BackgroundWriter, open_storage
+
 # ---
 # Data Storage
-# A dictionary to store contacts. The key is the contact's name,
-# and the value is another dictionary with their number and email.
+# The GUI shares its storage (contacts.json and its journal of recent edits, or
+# an SQLite .db file) with the command-line version. Contacts are kept in a
+# compact store that works like a dictionary: the key is the contact's name, and
+# the value holds their number and email. Changes are saved by a background
+# writer thread, so the window never waits on the disk.
 # ---
-contacts = {
-    "Kwame Mensah": {
-        "phone": "233241234567",
-        "email": "kwame.mensah@email.com"
-    },
-    "Ama Serwaa": {
-        "phone": "233549876543",
-        "email": "ama.serwaa@email.com"
-    },
-    "Kofi Osei": {
-        "phone": "233205678901",
-        "email": "kofi.osei@email.com"
-    },
-    "Akua Oforiwaa": {
-        "phone": "233261122334",
-        "email": "akua.oforiwaa@email.com"
-    },
-    "Yaw Boateng": {
-        "phone": "233270987654",
-        "email": "yaw.boateng@email.com"
-    },
-    "Adwoa Animah": {
-        "phone": "233501234567",
-        "email": "adwoa.animah@email.com"
-    },
-    "Kwasi Asare": {
-        "phone": "233244567890",
-        "email": "kwasi.asare@email.com"
-    },
-    "Yaa Opoku": {
-        "phone": "233558765432",
-        "email": "yaa.opoku@email.com"
-    },
-    "Nii Ayitey": {
-        "phone": "233202345678",
-        "email": "nii.ayitey@email.com"
-    },
-    "Naa Dei": {
-        "phone": "233246789012",
-        "email": "naa.dei@email.com"
-    }
-}
+CONTACTS_FILE = os.environ.get('CONTACTS_FILE', 'contacts.json')
+
+# Start the GUI with --profile to time loading, saving, searching, drawing the list
+# and each button. The Stats button shows the timings; they are saved to PROFILE_FILE on exit.
+PROFILE_FILE = 'contacts.profile.json'
+stats.enable_from_args(sys.argv, PROFILE_FILE)
+
+# The journal is only folded into contacts.json on quit, never from the writer thread
+storage = open_storage(CONTACTS_FILE, compact_every=None)
+stats.instrument_storage(storage)
+contacts = storage.load(ContactStore())
+writer = BackgroundWriter(storage)
+
+# An index over the contact names so searches don't have to check every contact.
+# The store keeps it up to date whenever a contact is added, updated or deleted.
+# With --profile, its searches (live ones too) are timed.
+name_index = contacts.add_index(stats.instrument(NameIndex(), 'fuzzy_search'))
+
+# The answers to recent searches, kept up to date as contacts are added and deleted.
+# Typing a name one letter at a time only has to filter the answer for the letters before.
+search_cache = contacts.add_index(stats.instrument(SearchCache(name_index), 'search'))
+FUZZY_RESULTS = 20  # How many of the closest names the Fuzzy Search button shows
+
+# Indexes from phone number and email back to the contact, for reverse lookups
+# and for refusing a number or email that another contact already has
+# Phones are keyed by their +233... form, so 0241234567 and 233241234567 are the same number.
+phone_index = contacts.add_index(FieldIndex('phone', phone_key))
+email_index = contacts.add_index(FieldIndex('email', str.lower))
+
+# A prefix trie over the phone numbers, so Lookup can also take the start of a number (e.g. 024)
+phone_trie = contacts.add_index(stats.instrument(PhoneTrie(), search='phone_prefix'))
+
+# The names in alphabetical order, kept in order on every add and delete
+sorted_names = contacts.add_index(SortedNameIndex())
 
 
 # ---
 # Helper functions for input validation. These are great for keeping the code clean!
 # ---
 def is_valid_phone(number):
-    """Checks if a string is a 10-digit number."""
-    return number.isdigit() and len(number) == 10
+    """Checks for a 10-digit local number (0XX...) or an international one (233XX... or +233XX...)."""
+    return normalize_phone(number) is not None
 
 
 def is_valid_email(email):
@@ -88,27 +94,28 @@ def add_contact_gui():
     if name in contacts:
         result_label.configure(text=f"Sorry, '{name}' already exists.", text_color='red')
     elif not is_valid_phone(number):
-        result_label.configure(text='Invalid phone number (must be 10 digits).', text_color='red')
+        result_label.configure(text='Invalid phone number (10 digits from 0, or 12 from 233).', text_color='red')
     elif not is_valid_email(email):
         result_label.configure(text='Invalid email format.', text_color='red')
+    elif phone_index.owner(number):
+        result_label.configure(text=f"That number already belongs to '{phone_index.owner(number)}'.", text_color='red')
+    elif email_index.owner(email):
+        result_label.configure(text=f"That email already belongs to '{email_index.owner(email)}'.", text_color='red')
     else:
-        contacts[name] = {'number': number, 'email': email}
+        contacts[name] = {'phone': number, 'email': email}
+        writer.record(name, contacts[name])
         result_label.configure(text=f"Contact '{name}' added successfully! 🎉", text_color='green')
 
 
 def view_contacts_gui():
-    """Displays all contacts in the text box."""
+    """Displays all contacts in the contact list, in alphabetical order."""
     if not contacts:
         result_label.configure(text='No contacts available.', text_color='orange')
-        contact_display.delete("0.0", "end")  # Clear the text box
-        contact_display.insert("end", "No contacts to display.")
+        contact_display.show_message("No contacts to display.")
     else:
-        contact_display.delete("0.0", "end")  # Clear the text box before showing new data
-        for name, details in contacts.items():
-            contact_display.insert("end", f'Name: {name}\n')
-            contact_display.insert("end", f'Phone: {details["phone"]}\n')
-            contact_display.insert("end", f'Email: {details["email"]}\n')
-            contact_display.insert("end", "---------------------\n")  # Separator
+        # The list only draws the rows on screen, and each page is sliced straight out
+        # of the sorted index, so this is quick even for huge address books
+        contact_display.show(sorted_names, contacts.get)
 
     result_label.configure(text="Displaying all contacts.")
 
@@ -119,25 +126,17 @@ def search_contact_gui():
     The fix here is to convert both the search term and the contact names
     to lowercase for a truly case-insensitive search.
     """
-    # Get the search term and convert to lowercase for case-insensitive matching
+    # Get the search term and convert to lowercase for case-insensitive matching.
+    # The term stays in the entry field so live search can keep refining it.
     search_term = name_entry.get().strip().lower()
-    name_entry.delete(0, END)  # Clear the entry field
 
     if not search_term:
         result_label.configure(text="Please enter a name to search.", text_color='red')
         return
 
-    found = False
-    contact_display.delete("0.0", "end")  # Clear previous results
-
-    # Iterate through contacts and check if the lowercase search term is in the lowercase name
-    for name, details in contacts.items():
-        if search_term in name.lower():
-            contact_display.insert("end", f'Name: {name}\n')
-            contact_display.insert("end", f'Phone: {details["phone"]}\n')
-            contact_display.insert("end", f'Email: {details["email"]}\n')
-            contact_display.insert("end", "---------------------\n")
-            found = True
+    # Look the search term up in the name index instead of checking every contact
+    found = search_cache.search(search_term)
+    contact_display.show(found, contacts.get)
 
     if found:
         result_label.configure(text=f"Search for '{search_term}' complete.", text_color='green')
@@ -145,6 +144,81 @@ def search_contact_gui():
         result_label.configure(text=f"No contacts found matching '{search_term}'.", text_color='orange')
 
 
+def fuzzy_search_contact_gui():
+    """Shows the contacts whose names are closest to the name field, best match first."""
+    search_term = name_entry.get().strip()
+    if not search_term:
+        result_label.configure(text="Please enter a name to search.", text_color='red')
+        return
+
+    # Ranked by how close each name is, so typos like "Kwami Mensa" still find "Kwame Mensah"
+    found = name_index.fuzzy_search(search_term, limit=FUZZY_RESULTS)
+    contact_display.show(found, contacts.get)
+
+    if found:
+        result_label.configure(text=f"Closest matches to '{search_term}'.", text_color='green')
+    else:
+        result_label.configure(text=f"No contacts found close to '{search_term}'.", text_color='orange')
+
+
+# ---
+# Live search
+# Typing in the name field searches as you go. Keystrokes are debounced, the
+# search runs on a worker thread against the name index, and only the newest
+# answer is shown. Each answer's keystroke-to-results time is recorded.
+# ---
+DEBOUNCE_MS = 25          # Wait this long after the last keystroke before searching
+POLL_MS = 5               # How often to check for the worker's answer
+LIVE_SEARCH_LIMIT = 500   # Live results are capped; the Search button shows them all
+LATENCY_BUDGET_MS = 50
+
+live_search = SearchWorker(lambda term: search_cache.search(term, limit=LIVE_SEARCH_LIMIT))
+search_latencies = []  # Keystroke-to-results times in milliseconds
+debounce_id = None
+last_keystroke = 0.0
+last_shown_query = 0
+
+
+def on_name_typed(event):
+    """Restarts the debounce timer on every keystroke in the name field."""
+    global debounce_id, last_keystroke
+    last_keystroke = time.perf_counter()
+    if debounce_id is not None:
+        root.after_cancel(debounce_id)
+    debounce_id = root.after(DEBOUNCE_MS, start_live_search)
+
+
+def start_live_search():
+    """Hands the current name field text to the search worker."""
+    global debounce_id
+    debounce_id = None
+    term = name_entry.get().strip()
+    if not term:
+        return
+    query_id = live_search.submit(term, last_keystroke)
+    root.after(POLL_MS, show_live_results, query_id)
+
+
+def show_live_results(query_id):
+    """Shows the worker's newest answer, and keeps checking until query_id is answered or replaced."""
+    global last_shown_query
+    while True:
+        try:
+            answered_id, term, found, started = live_search.results.get_nowait()
+        except queue.Empty:
+            break
+        if live_search.is_current(answered_id):
+            last_shown_query = answered_id
+            contact_display.show(found, contacts.get)
+            latency = (time.perf_counter() - started) * 1000
+            search_latencies.append(latency)
+            text = f"{len(found)}{'+' if len(found) == LIVE_SEARCH_LIMIT else ''} match(es) for '{term}' ({latency:.0f} ms)"
+            result_label.configure(text=text, text_color='green' if latency <= LATENCY_BUDGET_MS else 'orange')
+
+    if last_shown_query < query_id and live_search.is_current(query_id):
+        root.after(POLL_MS, show_live_results, query_id)
+
+
 def update_contact_gui():
     """Updates an existing contact's details."""
     name = name_entry.get().strip().title()
@@ -165,22 +239,59 @@ def update_contact_gui():
         return
 
     if number and not is_valid_phone(number):
-        result_label.configure(text='Invalid phone number (must be 10 digits).', text_color='red')
+        result_label.configure(text='Invalid phone number (10 digits from 0, or 12 from 233).', text_color='red')
         return
 
     if email and not is_valid_email(email):
         result_label.configure(text='Invalid email format.', text_color='red')
         return
 
-    # Update fields if provided
-    if number:
-        contacts[name]['phone'] = number
-    if email:
-        contacts[name]['email'] = email
+    if number and phone_index.owner(number, exclude=name):
+        result_label.configure(text=f"That number already belongs to '{phone_index.owner(number, exclude=name)}'.", text_color='red')
+        return
+
+    if email and email_index.owner(email, exclude=name):
+        result_label.configure(text=f"That email already belongs to '{email_index.owner(email, exclude=name)}'.", text_color='red')
+        return
+
+    # Update the fields that were filled in, in one edit (None leaves a field as it is)
+    contacts.edit(name, phone=number or None, email=email or None)
+    writer.record(name, contacts[name])
 
     result_label.configure(text=f"Contact '{name}' updated successfully! ✅", text_color='green')
 
 
+def lookup_contact_gui():
+    """Shows who owns the phone number or email typed into its field."""
+    number = number_entry.get().strip()
+    email = email_entry.get().strip()
+
+    # Each field has its own index, so this is a single dictionary lookup.
+    # The start of a number (like 024) lists everyone whose number begins with it.
+    if number and not is_valid_phone(number):
+        found = phone_trie.search(number)
+        contact_display.show(found, contacts.get)
+        if found:
+            result_label.configure(text=f"{len(found)} contact(s) have a number starting with '{number}'.",
+                                   text_color='green')
+        else:
+            result_label.configure(text=f"No number starts with '{number}'.", text_color='orange')
+        return
+    elif number:
+        value, owners = number, phone_index.lookup(number)
+    elif email:
+        value, owners = email, email_index.lookup(email)
+    else:
+        result_label.configure(text="Enter a phone number or email to look up.", text_color='red')
+        return
+
+    contact_display.show(owners, contacts.get)
+    if owners:
+        result_label.configure(text=f"'{value}' belongs to {', '.join(owners)}.", text_color='green')
+    else:
+        result_label.configure(text=f"No contact has '{value}'.", text_color='orange')
+
+
 def delete_contact_gui():
     """Deletes an existing contact from the dictionary."""
     name_to_delete = name_entry.get().strip().title()
@@ -188,12 +299,49 @@ def delete_contact_gui():
 
     if name_to_delete in contacts:
         del contacts[name_to_delete]
+        writer.record(name_to_delete, None)
         result_label.configure(text=f"Contact '{name_to_delete}' deleted. 👋", text_color='green')
     else:
         result_label.configure(text=f"Contact '{name_to_delete}' not found.", text_color='red')
 
-    # Refresh the view in case the deleted contact was visible
-    view_contacts_gui()
+
+# ---
+# Sharing the contacts file
+# Other copies of the program (CLI or GUI) may be saving to the same file. Every
+# few seconds we pick up just the contacts they changed, straight from the journal.
+# Waiting for the lock and reading the files happens on the writer thread; the
+# window only applies what it read, so it never freezes while another copy saves.
+# ---
+REFRESH_MS = 2000
+
+
+def load_changes_from_other_windows():
+    """Applies contacts saved by other open copies of the program, then checks again later."""
+    # Contacts we changed but haven't saved yet keep our version: it gets saved after theirs
+    changed = storage.apply_changes(skip=writer.pending_names())  # The list follows along through the change feed
+    if changed:
+        result_label.configure(text=f"{len(changed)} contact(s) updated from another window.", text_color='green')
+    writer.fetch_changes()  # Saves our edits, then reads theirs, ready for next time
+    root.after(REFRESH_MS, load_changes_from_other_windows)
+
+
+def show_stats_gui():
+    """Opens a window with how long each kind of operation has taken so far."""
+    window = CTkToplevel(root)
+    window.title("Timing Stats")
+    text = CTkTextbox(window, width=760, height=480, font=("Courier", 12))
+    text.pack(padx=10, pady=10, fill='both', expand=True)
+    cache = search_cache.info()
+    text.insert('1.0', stats.report() + f"\n\nSearch cache: {cache['hits']} hit(s), {cache['refined']} answered "
+                f"from a shorter search, {cache['misses']} miss(es), {cache['cached']} search(es) cached")
+    text.configure(state='disabled')
+
+
+def quit_gui():
+    """Writes any changes still waiting, lets storage finish up, then closes the window."""
+    writer.close()
+    storage.close()
+    root.quit()
 
 
 # ---
@@ -205,7 +353,7 @@ customtkinter.set_default_color_theme("blue")  # Themes: "blue", "green", "dark-
 
 root = CTk()
 root.title("Group 16 Contact Management System")
-root.geometry("950x650")
+root.geometry("950x720")
 # The original code references 'img.png' which isn't provided.
 # A common practice is to handle this by skipping the icon line or
 # using a default icon to avoid errors. We'll comment out the line.
@@ -223,6 +371,7 @@ input_frame.pack(pady=10, padx=10, fill='x')
 CTkLabel(input_frame, text="Name:").pack(padx=10, pady=5, anchor='w')
 name_entry = CTkEntry(input_frame, placeholder_text="Enter contact name")
 name_entry.pack(fill='x', padx=10, pady=5)
+name_entry.bind('<KeyRelease>', on_name_typed)  # Search as you type
 
 # Phone number input
 CTkLabel(input_frame, text="Phone Number:").pack(padx=10, pady=5, anchor='w')
@@ -238,32 +387,52 @@ email_entry.pack(fill='x', padx=10, pady=5)
 button_frame = CTkFrame(root)
 button_frame.pack(pady=10, padx=10, fill='x')
 
-# The buttons that call our functions
-add_button = CTkButton(button_frame, text="Add Contact", command=add_contact_gui)
+# The buttons that call our functions. With --profile, stats.wrap times each edit button;
+# searches are timed inside the name index, and drawing the list as 'render'.
+add_button = CTkButton(button_frame, text="Add Contact", command=stats.wrap(add_contact_gui, 'add'))
 add_button.pack(side="left", padx=5, pady=5, expand=True)
 
-view_button = CTkButton(button_frame, text="View All", command=view_contacts_gui)
+view_button = CTkButton(button_frame, text="View All", command=stats.wrap(view_contacts_gui, 'view'))
 view_button.pack(side="left", padx=5, pady=5, expand=True)
 
 search_button = CTkButton(button_frame, text="Search", command=search_contact_gui)
 search_button.pack(side="left", padx=5, pady=5, expand=True)
 
-update_button = CTkButton(button_frame, text="Update", command=update_contact_gui)
+fuzzy_button = CTkButton(button_frame, text="Fuzzy Search", command=fuzzy_search_contact_gui)
+fuzzy_button.pack(side="left", padx=5, pady=5, expand=True)
+
+update_button = CTkButton(button_frame, text="Update", command=stats.wrap(update_contact_gui, 'update'))
 update_button.pack(side="left", padx=5, pady=5, expand=True)
 
-delete_button = CTkButton(button_frame, text="Delete", command=delete_contact_gui)
+delete_button = CTkButton(button_frame, text="Delete", command=stats.wrap(delete_contact_gui, 'delete'))
 delete_button.pack(side="left", padx=5, pady=5, expand=True)
 
+lookup_button = CTkButton(button_frame, text="Lookup", command=stats.wrap(lookup_contact_gui, 'lookup'))
+lookup_button.pack(side="left", padx=5, pady=5, expand=True)
+
+stats_button = CTkButton(button_frame, text="Stats", command=show_stats_gui)
+stats_button.pack(side="left", padx=5, pady=5, expand=True)
+
 # A label to show messages to the user (e.g., success or error messages)
 result_label = CTkLabel(root, text="", font=("Arial", 14))
 result_label.pack(pady=5)
 
-# A Textbox widget to display all contacts or search results
-contact_display = CTkTextbox(root, width=400, height=150)
-contact_display.pack(pady=10)
+# A scrolling list to display all contacts or search results
+contact_display = ContactListView(root, rows=6, width=800)
+contact_display.pack(pady=10, padx=10, fill='x')
+stats.instrument(contact_display, show='render', contact_changed='patch')
+
+# Every add, update and delete (from the buttons or another window) patches just
+# the rows it touches, instead of the whole list being drawn again
+contacts.subscribe(contact_display.contact_changed)
 
 # A button to quit the application
-quit_button = CTkButton(root, text="Quit", command=root.quit, fg_color="red")
+quit_button = CTkButton(root, text="Quit", command=quit_gui, fg_color="red")
 quit_button.pack(pady=10)
 
+# Closing the window with the title bar's X saves too
+root.protocol("WM_DELETE_WINDOW", quit_gui)
+
+root.after(REFRESH_MS, load_changes_from_other_windows)
+
 root.mainloop()
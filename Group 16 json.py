@@ -1,40 +1,95 @@
 # Group 16 - Contact Management System
 # This program allows users to manage contacts with options to add, update, delete, search.
 
-import json # Import the json library
-
-# Define the file name for our contacts
-CONTACTS_FILE = 'contacts.json'
+import argparse
+import json
+import os
+import shlex
+import sys
+
+from contact_dedup import FIELDS, MIN_SCORE, field_values, find_duplicates, merge_group
+from contact_index import FieldIndex, NameIndex, SearchCache, SortedNameIndex
+from contact_phone import PhoneTrie, normalize_phone, phone_key
+from contact_io import export_contacts, import_contacts, is_valid_name
+from contact_store import ContactStore
+from contact_stats import PROFILE_FLAG, stats
+from contact_storage import LazyContacts, open_storage
+
+# Define the file name for our contacts. Set CONTACTS_FILE to a .db file to use SQLite instead;
+# python contact_storage.py migrate contacts.json contacts.db copies the contacts across.
+CONTACTS_FILE = os.environ.get('CONTACTS_FILE', 'contacts.json')
+
+# When True, each edit is appended to a journal (contacts.journal) instead of rewriting contacts.json.
+# The journal is folded back into contacts.json once it holds COMPACT_EVERY edits and is
+# a tenth the size of contacts.json, so quitting never has to rewrite the whole file.
+USE_JOURNAL = True
+COMPACT_EVERY = 200
+
+# When True, a binary copy of the snapshot (contacts.bin) is kept next to contacts.json.
+# It loads in a fraction of the time, and is ignored whenever contacts.json has changed since.
+USE_BINARY_SNAPSHOT = True
+
+# Start the program with --profile to time loading, saving, searching and each edit.
+# The [T] menu choice shows the timings, and they are written to PROFILE_FILE on exit.
+PROFILE_FILE = 'contacts.profile.json'
+stats.enable_from_args(sys.argv, PROFILE_FILE)
+
+storage = open_storage(CONTACTS_FILE, USE_JOURNAL, COMPACT_EVERY, USE_BINARY_SNAPSHOT)
+stats.instrument_storage(storage)
 
 # ---
-# Functions for managing the contacts JSON file
+# Functions for managing the contacts file
 # ---
 def load_contacts():
-    """Loads contacts from a JSON file. If the file doesn't exist, returns an empty dictionary."""
-    try:
-        with open(CONTACTS_FILE, 'r') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        # If the file does not exist, start with an empty dictionary
-        return {}
-
-def save_contacts(contacts_data):
-    """Saves the current contacts dictionary to a JSON file."""
-    with open(CONTACTS_FILE, 'w') as file:
-        json.dump(contacts_data, file, indent=4)
-    print("Contacts saved to file.")
-
-# A dictionary to store contacts.
-# We will initialize this by loading from the file.
-contacts = load_contacts()
-
+    """Loads contacts from storage. Returns an empty store if there is nothing saved yet."""
+    return storage.load(ContactStore())
+
+def save_changes(changes):
+    """Saves a transaction's (name, details) changes together, with a single write."""
+    storage.save_many(changes)
+    print(f"{len(changes)} change(s) saved to file.")
+
+def save_change(name):
+    """Saves a single added, updated or deleted contact."""
+    # Only the changed contact is written, so an edit costs the same no matter how big the file is
+    storage.save(name, contacts.get(name))
+    print("Change saved to file.")
+
+# A compact store that works like a dictionary of contacts.
+# It loads from the file in the background, so the menu shows up straight away;
+# the first action that needs the contacts waits for the load to finish.
+contacts = LazyContacts(load_contacts)
+
+# An index over the contact names so searches don't have to check every contact.
+# The store keeps it up to date whenever a contact is added, updated or deleted.
+# With --profile, its searches are timed (instrument() leaves it alone otherwise).
+name_index = contacts.add_index(stats.instrument(NameIndex(), 'fuzzy_search'))
+FUZZY_RESULTS = 10  # How many of the closest names a fuzzy search shows
+
+# The answers to recent searches, so repeating a search (or adding letters to one)
+# doesn't search the index again. Adds and deletes keep the answers up to date.
+search_cache = contacts.add_index(stats.instrument(SearchCache(name_index), 'search'))
+
+# Indexes from phone number and email back to the contact, for reverse lookups
+# and for refusing a number or email that another contact already has.
+# Phones are keyed by their +233... form, so 0241234567 and 233241234567 are the same number.
+phone_index = contacts.add_index(FieldIndex('phone', phone_key))
+email_index = contacts.add_index(FieldIndex('email', str.lower))
+
+# A prefix trie over the phone numbers, for finding everyone on a network such as 024
+phone_trie = contacts.add_index(stats.instrument(PhoneTrie(), search='phone_prefix'))
+
+# The names in alphabetical order, kept in order on every add and delete,
+# so View can jump straight to any page without sorting everyone again
+sorted_names = contacts.add_index(SortedNameIndex())
+PAGE_SIZE = 20  # Contacts per page in View
 
 # ---
 # Helper function to validate phone numbers
 # ---
 def is_valid_phone(number):
-    """Checks if a string is a 10-digit number."""
-    return number.isdigit() and len(number) == 10
+    """Checks for a 10-digit local number (0XX...) or an international one (233XX... or +233XX...)."""
+    return normalize_phone(number) is not None
 
 
 # ---
@@ -61,37 +116,81 @@ def add_contact():
             print(f"Sorry, a contact named '{name}' already exists.")
             return
 
-        # Loop until a valid 10-digit phone number is entered
+        # Loop until a valid phone number is entered
         while True:
-            number = input('Enter phone number (10 digits): ').strip()
-            if is_valid_phone(number):
+            number = input('Enter phone number (e.g. 0241234567 or 233241234567): ').strip()
+            if not is_valid_phone(number):
+                print('Invalid phone number. Use 10 digits starting with 0, or 12 starting with 233.')
+            elif phone_index.owner(number):
+                print(f"That number already belongs to '{phone_index.owner(number)}'.")
+            else:
                 break
-            print('Invalid phone number. It must be 10 digits.')
 
         # Loop until a valid email format is entered
         while True:
             email = input('Enter email: ').strip()
-            if is_valid_email(email) and len(email)>2:
+            if not (is_valid_email(email) and len(email)>2):
+                print('Invalid email format. Please include an "@" and a ".".')
+            elif email_index.owner(email):
+                print(f"That email already belongs to '{email_index.owner(email)}'.")
+            else:
                 break
-            print('Invalid email format. Please include an "@" and a ".".')
 
         # Store the new contact in the dictionary
-        contacts[name] = {'phone': number, 'email': email}
-        save_contacts(contacts)  # Save changes to the JSON file
+        with stats.timer('add'):
+            contacts[name] = {'phone': number, 'email': email}
+            save_change(name)  # Save changes to the JSON file
         print(f"Contact '{name}' added successfully! 🎉")
     else:
         print(f'{name} is not a valid name')
 
 
 def view_contacts():
-    """Displays all existing contacts."""
+    """Displays the contacts in alphabetical order, a page at a time."""
     print("\n--- All Contacts ---")
     if not contacts:
         print('No contacts available. Add some to get started!')
-    else:
-        for name, details in contacts.items():
-            print('------------------------------------------------------------------------')
-            print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}\n')
+        return
+
+    # The names being paged through, as positions in sorted_names: everyone, or a range like K-M
+    start, stop = 0, len(sorted_names)
+    page = 0
+    while True:
+        pages = max(1, (stop - start + PAGE_SIZE - 1) // PAGE_SIZE)
+        page = max(0, min(page, pages - 1))
+        first = start + page * PAGE_SIZE
+        with stats.timer('view'):
+            for name in sorted_names[first:min(first + PAGE_SIZE, stop)]:
+                details = contacts[name]
+                print('------------------------------------------------------------------------')
+                print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}\n')
+        print(f'Page {page + 1} of {pages} ({stop - start} contacts)')
+
+        choice = input('[N]ext, [P]revious, a page number, >K to jump to a name, K-M for a range, '
+                       'or Enter to go back: ').strip()
+        if not choice:
+            break
+        elif choice.lower() in ('n', 'next'):
+            page += 1
+        elif choice.lower() in ('p', 'prev', 'previous'):
+            page -= 1
+        elif choice.isdigit():
+            page = int(choice) - 1
+        elif choice.startswith('>'):
+            # The page holding the first name at or after the one typed
+            position = min(max(sorted_names.rank(choice[1:].strip()), start), stop - 1)
+            page = (position - start) // PAGE_SIZE
+        elif '-' in choice:
+            first_name, last_name = [part.strip() for part in choice.split('-', 1)]
+            range_start, range_stop = sorted_names.between(first_name, last_name)
+            if range_start == range_stop:
+                print(f"No contacts from '{first_name or 'the start'}' to '{last_name or 'the end'}'.")
+                continue
+            start, stop, page = range_start, range_stop, 0
+        else:
+            print('Invalid choice.')
+            continue
+        print()
 
 
 
@@ -102,9 +201,8 @@ def search_contact():
     found_contacts = []
 
     # Find all contacts that contain the search name (case-insensitive)
-    for name, details in contacts.items():
-        if search_name in name:
-            found_contacts.append((name, details))
+    for name in search_cache.search(search_name):
+        found_contacts.append((name, contacts[name]))
 
     if not found_contacts:
         print(f"No contacts found matching '{search_name}'.")
@@ -114,6 +212,22 @@ def search_contact():
             print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
 
 
+def fuzzy_search_contact():
+    """Finds the contacts whose names are closest to what was typed, even with typos."""
+    print("\n--- Fuzzy Search ---")
+    search_name = input('Enter a name (close spellings are fine): ').strip()
+
+    # Ranked best match first, so "Kwami Mensa" still finds "Kwame Mensah"
+    found = name_index.fuzzy_search(search_name, limit=FUZZY_RESULTS)
+    if not found:
+        print(f"No contacts found close to '{search_name}'.")
+    else:
+        print("Closest matches:")
+        for name in found:
+            details = contacts[name]
+            print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
+
+
 def update_contact():
     """Updates the phone and email of an existing contact."""
     print("\n--- Update Contact ---")
@@ -121,28 +235,39 @@ def update_contact():
 
     if update_name in contacts:
         print(f"Updating details for '{update_name}'.")
+        changes = {}
 
         # Get and validate the new phone number
         while True:
-            new_number = input('Enter new phone number (10 digits): ').strip()
+            new_number = input('Enter new phone number (e.g. 0241234567 or 233241234567): ').strip()
             if is_valid_phone(new_number):
-                contacts[update_name]['phone'] = new_number
+                owner = phone_index.owner(new_number, exclude=update_name)
+                if owner:
+                    print(f"That number already belongs to '{owner}'.")
+                    continue
+                changes['phone'] = new_number
                 break
             elif new_number == 's' or 'same':
                 break
-            print('Invalid phone number. It must be 10 digits.')
+            print('Invalid phone number. Use 10 digits starting with 0, or 12 starting with 233.')
 
         # Get and validate the new email
         while True:
             new_email = input('Enter new email: ').strip()
             if is_valid_email(new_email):
-                contacts[update_name]['email'] = new_email
+                owner = email_index.owner(new_email, exclude=update_name)
+                if owner:
+                    print(f"That email already belongs to '{owner}'.")
+                    continue
+                changes['email'] = new_email
                 break
             if new_email == 's'or 'same':
                 break
             print('Invalid email format. Please include an "@" and a ".".')
 
-        save_contacts(contacts)  # Save changes to the JSON file
+        with stats.timer('update'):
+            contacts.edit(update_name, **changes)
+            save_change(update_name)  # Save changes to the JSON file
         print(f"Contact '{update_name}' updated successfully! ✅")
     else:
         print(f"Contact '{update_name}' not found.")
@@ -154,13 +279,161 @@ def delete_contact():
     name_to_delete = input('Enter the name of the contact to delete: ').strip().title()
 
     if name_to_delete in contacts:
-        del contacts[name_to_delete]
-        save_contacts(contacts)  # Save changes to the JSON file
+        with stats.timer('delete'):
+            del contacts[name_to_delete]
+            save_change(name_to_delete)  # Save changes to the JSON file
         print(f"Contact '{name_to_delete}' deleted successfully. 👋")
     else:
         print(f"Contact '{name_to_delete}' not found.")
 
 
+def lookup_contact():
+    """Finds who a phone number or email belongs to."""
+    print("\n--- Lookup by Phone or Email ---")
+    value = input('Enter a phone number or email: ').strip()
+
+    # Emails and phone numbers each have their own index, so this is a single dictionary lookup
+    index = email_index if '@' in value else phone_index
+    with stats.timer('lookup'):
+        owners = index.lookup(value)
+    if not owners:
+        print(f"No contact has '{value}'.")
+    else:
+        for name in owners:
+            details = contacts[name]
+            print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
+
+
+def phone_prefix_search():
+    """Lists the contacts whose number starts with the digits typed, such as a network prefix."""
+    print("\n--- Search by Phone Prefix ---")
+    text = input('Enter the start of a number, e.g. 024 or 024/054: ').strip()
+
+    # Each prefix is a short walk down the phone trie, however many contacts there are
+    found = []
+    for prefix in text.replace(',', '/').split('/'):
+        if prefix.strip():
+            found.extend(phone_trie.search(prefix))
+    if not found:
+        print(f"No contacts have a number starting with '{text}'.")
+    else:
+        print(f"{len(found)} contact(s) found:")
+        for name in found:
+            details = contacts[name]
+            print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
+
+
+def import_contacts_from_file():
+    """Adds many contacts at once from a CSV, JSONL or vCard file."""
+    print("\n--- Import Contacts ---")
+    path = input('Enter the file to import (.csv, .jsonl or .vcf): ').strip()
+    report_path = os.path.splitext(path)[0] + '.rejected.csv'
+    try:
+        # The whole file is one transaction: its contacts are saved with one write, or not at all
+        with contacts.transaction(save_changes) as batch:
+            added, rejected = import_contacts(path, batch, is_valid_phone, is_valid_email, report_path=report_path)
+    except (OSError, ValueError) as error:
+        print(f'Could not import {path}: {error}')
+        return
+    print(f"Imported {added} contact(s). 🎉")
+    if rejected:
+        print(f"{rejected} row(s) were rejected; see {report_path} for the reasons.")
+
+
+def export_contacts_to_file():
+    """Writes every contact to a CSV, JSONL or vCard file."""
+    print("\n--- Export Contacts ---")
+    path = input('Enter the file to export to (.csv, .jsonl or .vcf): ').strip()
+    try:
+        count = export_contacts(contacts.items(), path)
+    except (OSError, ValueError) as error:
+        print(f'Could not export to {path}: {error}')
+        return
+    print(f"Exported {count} contact(s) to {path}.")
+
+
+def print_group(number, group):
+    print(f"\n{number}. Score {group.score} ({', '.join(group.reasons)})")
+    for choice, name in enumerate(group.names, 1):
+        details = contacts[name]
+        print(f'  {choice}) Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
+
+
+def choose_fields(batch, group, keep):
+    """Asks which phone and email to keep where the group has more than one. Returns {field: value}."""
+    chosen = {}
+    others = [name for name in group.names if name != keep]
+    for field in FIELDS:
+        values = field_values(batch, [keep] + others, field)
+        if len(values) < 2:
+            continue
+        for choice, value in enumerate(values, 1):
+            print(f'  {choice}) {value}')
+        answer = input(f'Which {field} to keep? (Enter keeps {values[0]}): ').strip()
+        if answer.isdigit() and 1 <= int(answer) <= len(values):
+            chosen[field] = values[int(answer) - 1]
+    return chosen
+
+
+def print_dropped(dropped):
+    for detail in dropped:
+        print(f"  Dropped {detail['field']} {detail['value']} of deleted '{detail['name']}'")
+
+
+def merge_duplicates():
+    """Finds contacts that look like the same person and merges them, automatically or one group at a time."""
+    print("\n--- Merge Duplicates ---")
+    print("Looking for duplicates...")
+    with stats.timer('dedup'):
+        groups, report = find_duplicates(contacts)
+    if not groups:
+        print("No duplicates found. 🎉")
+        return
+    certain = [group for group in groups if group.certain]
+    print(f"Found {len(groups)} group(s) of possible duplicates in {report['seconds']}s; "
+          f"{len(certain)} of them are near-certain (they match on two things, such as name and phone).")
+    choice = input('[A]utomatically merge the near-certain ones, [R]eview each group, or Enter to cancel: ')
+    choice = choice.strip().lower()
+
+    # All the merges are one transaction, saved with a single write at the end
+    merged = 0
+    with contacts.transaction(save_changes) as batch:
+        if choice in ('a', 'auto'):
+            for group in certain:
+                print_dropped(merge_group(batch, group, group.keeper(batch)))
+                merged += 1
+        elif choice in ('r', 'review'):
+            for number, group in enumerate(groups, 1):
+                print_group(number, group)
+                answer = input('Number of the contact to keep (the others are deleted), Enter to skip, Q to stop: ')
+                answer = answer.strip().lower()
+                if answer == 'q':
+                    break
+                if answer.isdigit() and 1 <= int(answer) <= len(group.names):
+                    keep = group.names[int(answer) - 1]
+                    print_dropped(merge_group(batch, group, keep, choose_fields(batch, group, keep)))
+                    merged += 1
+    print(f"Merged {merged} group(s).")
+
+
+def show_stats():
+    """Prints how long each kind of operation has taken so far (needs --profile)."""
+    print("\n--- Timing Stats ---")
+    print(stats.report())
+    cache = search_cache.info()
+    print(f"\nSearch cache: {cache['hits']} hit(s), {cache['refined']} answered from a shorter search, "
+          f"{cache['misses']} miss(es), {cache['cached']} search(es) cached")
+
+
+def load_changes_from_other_windows():
+    """Picks up contacts that other open copies of the program have saved in the meantime."""
+    contacts.wait()  # The contacts have to finish loading first
+    # Only the changed contacts are read from the journal, not the whole file
+    changed = storage.refresh()
+    if changed:
+        print(f"({len(changed)} contact(s) were changed in another window and are updated here.)")
+
+
 def main():
     """Main loop to run the contact management system."""
     print("Welcome to the Contact Management System! 📖")
@@ -169,11 +442,23 @@ def main():
         print("  [A]dd a new contact")
         print("  [V]iew all contacts")
         print("  [S]earch for a contact")
+        print("  [F]uzzy search (finds close spellings)")
         print("  [U]pdate an existing contact")
         print("  [D]elete a contact")
+        print("  [L]ookup a contact by phone or email")
+        print("  [P]hone prefix search (e.g. everyone on 024)")
+        print("  [I]mport contacts from a file")
+        print("  E[x]port contacts to a file")
+        print("  [M]erge duplicate contacts")
+        print("  [T]iming stats (start with --profile)")
         print("  [Q]uit the program")
 
         action = input('Your choice: ').strip().lower()
+        stats.count('menu.' + action)  # How often each menu choice is used
+
+        # Another window may have saved changes while we waited for a choice
+        if action not in ['quit', 'q']:
+            load_changes_from_other_windows()
 
         if action in ['add', 'a']:
             add_contact()
@@ -181,17 +466,240 @@ def main():
             view_contacts()
         elif action in ['search', 's']:
             search_contact()
+        elif action in ['fuzzy', 'f']:
+            fuzzy_search_contact()
         elif action in ['update', 'u']:
             update_contact()
         elif action in ['delete', 'd']:
             delete_contact()
+        elif action in ['lookup', 'l']:
+            lookup_contact()
+        elif action in ['prefix', 'p']:
+            phone_prefix_search()
+        elif action in ['import', 'i']:
+            import_contacts_from_file()
+        elif action in ['export', 'x']:
+            export_contacts_to_file()
+        elif action in ['merge', 'm']:
+            merge_duplicates()
+        elif action in ['stats', 't']:
+            show_stats()
         elif action in ['quit', 'q']:
+            # Every edit is already in the journal, so leaving doesn't rewrite contacts.json
+            storage.close(compact=False)
             print("Thanks for using the Contact Management System. Goodbye! 👋")
             break
         else:
             print('Invalid action. Please choose from the options above.')
 
 
+# ---
+# Command mode
+# For scripts and automation: give a command on the command line, or pipe many
+# commands in, one per line, and get JSON back instead of the menu.
+#     python "Group 16 json.py" add "Kwame Mensah" 0241234567 kwame@email.com
+#     python "Group 16 json.py" search kwa
+#     python "Group 16 json.py" update "Kwame Mensah" --phone 0551234567
+#     python "Group 16 json.py" delete "Kwame Mensah"
+#     python "Group 16 json.py" list
+#     python "Group 16 json.py" dedup --merge
+#     python "Group 16 json.py" batch < commands.txt
+# Each command prints one line of JSON: {"ok": true, ...} or {"ok": false, "error": ...}.
+# A batch applies every line in turn and then saves all the changes in one write,
+# so thousands of commands cost one journal append instead of one per command.
+# ---
+class CommandError(Exception):
+    """A command that can't be carried out, such as a bad phone number or an unknown name."""
+
+
+class CommandParser(argparse.ArgumentParser):
+    """Raises CommandError instead of exiting, so one bad line doesn't stop a batch."""
+
+    def error(self, message):
+        raise CommandError(message)
+
+
+def make_command_parser():
+    parser = CommandParser(prog='Group 16 json.py', description='Manage contacts without the menu.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add_command = commands.add_parser('add', help='add a new contact')
+    add_command.add_argument('name')
+    add_command.add_argument('phone')
+    add_command.add_argument('email')
+
+    search_command = commands.add_parser('search', help='find contacts by name')
+    search_command.add_argument('term')
+    search_command.add_argument('--fuzzy', action='store_true', help='rank the closest names, allowing typos')
+    search_command.add_argument('--limit', type=int, help='at most this many results')
+
+    update_command = commands.add_parser('update', help="change a contact's phone and/or email")
+    update_command.add_argument('name')
+    update_command.add_argument('--phone')
+    update_command.add_argument('--email')
+
+    delete_command = commands.add_parser('delete', help='delete a contact')
+    delete_command.add_argument('name')
+
+    list_command = commands.add_parser('list', help='list contacts in alphabetical order')
+    list_command.add_argument('--from', dest='first', help='start at this name (or letter)')
+    list_command.add_argument('--to', dest='last', help='stop after the names starting with this')
+    list_command.add_argument('--offset', type=int, default=0, help='skip this many contacts first')
+    list_command.add_argument('--limit', type=int, help='at most this many contacts')
+
+    dedup_command = commands.add_parser('dedup', help='find contacts that look like the same person')
+    dedup_command.add_argument('--merge', action='store_true',
+                               help='merge each near-certain group into its most complete contact')
+    dedup_command.add_argument('--min-score', type=float, default=MIN_SCORE,
+                               help=f'leave out weaker matches (default {MIN_SCORE})')
+
+    commands.add_parser('batch', help='read one command per line from stdin and save once at the end')
+    return parser
+
+
+def contact_json(name):
+    details = contacts[name]
+    return {'name': name, 'phone': details['phone'], 'email': details['email']}
+
+
+def run_command(arguments, changes):
+    """
+    Carries out one parsed command and returns its result as a dictionary.
+    Added, updated and deleted contacts are put in changes (name -> details, or
+    None for a delete) for the caller to save.
+    """
+    if arguments.command == 'add':
+        name = arguments.name.strip().title()
+        details = {'phone': arguments.phone.strip(), 'email': arguments.email.strip()}
+        if not is_valid_name(name):
+            raise CommandError(f"'{name}' is not a valid name")
+        if name in contacts:
+            raise CommandError(f"a contact named '{name}' already exists")
+        check_details(name, details)
+        with stats.timer('add'):
+            contacts[name] = details
+        changes[name] = contacts[name]
+        return {'ok': True, 'command': 'add', 'contact': contact_json(name)}
+
+    if arguments.command == 'update':
+        name = arguments.name.strip().title()
+        if name not in contacts:
+            raise CommandError(f"contact '{name}' not found")
+        if arguments.phone is None and arguments.email is None:
+            raise CommandError('give --phone and/or --email')
+        details = {'phone': (arguments.phone or contacts[name]['phone']).strip(),
+                   'email': (arguments.email or contacts[name]['email']).strip()}
+        check_details(name, details)
+        with stats.timer('update'):
+            contacts.edit(name, phone=details['phone'], email=details['email'])
+        changes[name] = contacts[name]
+        return {'ok': True, 'command': 'update', 'contact': contact_json(name)}
+
+    if arguments.command == 'delete':
+        name = arguments.name.strip().title()
+        if name not in contacts:
+            raise CommandError(f"contact '{name}' not found")
+        with stats.timer('delete'):
+            del contacts[name]
+        changes[name] = None
+        return {'ok': True, 'command': 'delete', 'name': name}
+
+    if arguments.command == 'search':
+        if arguments.fuzzy:
+            found = name_index.fuzzy_search(arguments.term, limit=arguments.limit or FUZZY_RESULTS)
+        else:
+            found = search_cache.search(arguments.term, limit=arguments.limit)
+        return {'ok': True, 'command': 'search', 'results': [contact_json(name) for name in found]}
+
+    if arguments.command == 'list':
+        start, stop = sorted_names.between(arguments.first, arguments.last)
+        start = min(start + max(arguments.offset, 0), stop)
+        if arguments.limit is not None:
+            stop = min(stop, start + max(arguments.limit, 0))
+        names = sorted_names[start:stop]
+        return {'ok': True, 'command': 'list', 'contacts': [contact_json(name) for name in names]}
+
+    if arguments.command == 'dedup':
+        with stats.timer('dedup'):
+            groups, report = find_duplicates(contacts, min_score=arguments.min_score)
+        result = []
+        for group in groups:
+            keep = group.keeper(contacts) if arguments.merge and group.certain else None
+            dropped = []
+            if keep is not None:
+                dropped = merge_group(contacts, group, keep)
+                for name in group.names:
+                    changes[name] = contacts[name] if name == keep else None
+            result.append({'names': group.names, 'score': group.score, 'reasons': group.reasons,
+                           'certain': group.certain, 'kept': keep, 'dropped': dropped})
+        return {'ok': True, 'command': 'dedup', 'groups': result, 'merged': sum(1 for group in result if group['kept']),
+                'stats': report}
+
+    raise CommandError(f"'{arguments.command}' can't be used here")
+
+
+def check_details(name, details):
+    """Raises CommandError unless details are a valid phone and email that no other contact has."""
+    if not is_valid_phone(details['phone']):
+        raise CommandError(f"invalid phone number '{details['phone']}'")
+    if not is_valid_email(details['email']):
+        raise CommandError(f"invalid email '{details['email']}'")
+    # The phone and email indexes refuse a number or email another contact already has
+    problem = contacts.conflict(name, details)
+    if problem:
+        raise CommandError(problem)
+
+
+def run_batch(parser, lines):
+    """Runs one command per line (blank lines and # comments are skipped), then saves once. Returns the exit status."""
+    changes = {}
+    failed = 0
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            arguments = parser.parse_args(shlex.split(line))
+            if arguments.command == 'batch':
+                raise CommandError("'batch' can't be used inside a batch")
+            result = run_command(arguments, changes)
+        except (CommandError, ValueError) as error:
+            result = {'ok': False, 'error': str(error)}
+            failed += 1
+        result['line'] = line_number
+        print(json.dumps(result))
+
+    # Every change from the whole batch goes to storage in a single write
+    if changes:
+        storage.save_many(changes.items())
+    storage.close(compact=False)
+    print(json.dumps({'ok': failed == 0, 'command': 'batch', 'saved': len(changes), 'failed': failed}))
+    return 1 if failed else 0
+
+
+def run_from_command_line(argv):
+    """Runs the command in argv (the arguments after the script name). Returns the exit status."""
+    parser = make_command_parser()
+    try:
+        arguments = parser.parse_args(argv)
+        if arguments.command == 'batch':
+            return run_batch(parser, sys.stdin)
+        changes = {}
+        result = run_command(arguments, changes)
+    except CommandError as error:
+        print(json.dumps({'ok': False, 'error': str(error)}))
+        return 1
+    if changes:
+        storage.save_many(changes.items())
+    storage.close(compact=False)
+    print(json.dumps(result))
+    return 0
+
+
 # This line ensures the main function runs when the script is executed.
+# With a command after the script name it runs that instead of the menu.
 if __name__ == "__main__":
+    command_args = [arg for arg in sys.argv[1:] if not arg.startswith(PROFILE_FLAG)]
+    if command_args:
+        sys.exit(run_from_command_line(command_args))
     main()
\ No newline at end of file
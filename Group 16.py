@@ -1,9 +1,22 @@
 # Group 16 - Contact Management System
 # This program allows users to manage contacts with options to add, update, delete, search.
 
-# A dictionary to store contacts. The key will be the contact's name,
-# and the value will be another dictionary containing their number and email.
-contacts = {
+import sys
+
+from contact_index import FieldIndex, NameIndex, SearchCache
+from contact_phone import PhoneTrie, normalize_phone, phone_key
+from contact_stats import stats
+from contact_store import ContactStore
+from contact_storage import MemoryStorage
+
+# Start the program with --profile to time searches and edits. The [T] menu choice
+# shows the timings, and they are written to PROFILE_FILE on exit.
+PROFILE_FILE = 'contacts.profile.json'
+stats.enable_from_args(sys.argv, PROFILE_FILE)
+
+# The contacts we start with. This version keeps everything in memory, so its
+# storage backend hands these over on load and saves nothing.
+storage = MemoryStorage({
     "Kwame Mensah": {
         "phone": "233241234567",
         "email": "kwame.mensah@email.com"
@@ -45,15 +58,39 @@ contacts = {
         "email": "naa.dei@email.com"
     }
 
-}
+})
+stats.instrument_storage(storage)
+
+# A compact store of contacts that works like a dictionary. The key will be the
+# contact's name, and the value holds their number and email.
+contacts = storage.load(ContactStore())
+
+# An index over the contact names so searches don't have to check every contact.
+# The store keeps it up to date whenever a contact is added, updated or deleted.
+# With --profile, its searches are timed (instrument() leaves it alone otherwise).
+name_index = contacts.add_index(stats.instrument(NameIndex(), 'fuzzy_search'))
+FUZZY_RESULTS = 10  # How many of the closest names a fuzzy search shows
+
+# The answers to recent searches, so repeating a search (or adding letters to one)
+# doesn't search the index again. Adds and deletes keep the answers up to date.
+search_cache = contacts.add_index(stats.instrument(SearchCache(name_index), 'search'))
+
+# Indexes from phone number and email back to the contact, for reverse lookups
+# and for refusing a number or email that another contact already has.
+# Phones are keyed by their +233... form, so 0241234567 and 233241234567 are the same number.
+phone_index = contacts.add_index(FieldIndex('phone', phone_key))
+email_index = contacts.add_index(FieldIndex('email', str.lower))
+
+# A prefix trie over the phone numbers, for finding everyone on a network such as 024
+phone_trie = contacts.add_index(stats.instrument(PhoneTrie(), search='phone_prefix'))
 
 
 # ---
 # Helper function to validate phone numbers
 # ---
 def is_valid_phone(number):
-    """Checks if a string is a 10-digit number."""
-    return number.isdigit() and len(number) == 10
+    """Checks for a 10-digit local number (0XX...) or an international one (233XX... or +233XX...)."""
+    return normalize_phone(number) is not None
 
 
 # ---
@@ -78,22 +115,30 @@ def add_contact():
         print(f"Sorry, a contact named '{name}' already exists.")
         return
 
-    # Loop until a valid 10-digit phone number is entered
+    # Loop until a valid phone number is entered
     while True:
-        number = input('Enter phone number (10 digits): ').strip()
-        if is_valid_phone(number):
+        number = input('Enter phone number (e.g. 0241234567 or 233241234567): ').strip()
+        if not is_valid_phone(number):
+            print('Invalid phone number. Use 10 digits starting with 0, or 12 starting with 233.')
+        elif phone_index.owner(number):
+            print(f"That number already belongs to '{phone_index.owner(number)}'.")
+        else:
             break
-        print('Invalid phone number. It must be 10 digits.')
 
     # Loop until a valid email format is entered
     while True:
         email = input('Enter email: ').strip()
-        if is_valid_email(email):
+        if not (is_valid_email(email)):
+            print('Invalid email format. Please include an "@" and a ".".')
+        elif email_index.owner(email):
+            print(f"That email already belongs to '{email_index.owner(email)}'.")
+        else:
             break
-        print('Invalid email format. Please include an "@" and a ".".')
 
     # Store the new contact in the dictionary
-    contacts[name] = {'number': number, 'email': email}
+    with stats.timer('add'):
+        contacts[name] = {'phone': number, 'email': email}
+        storage.save(name, contacts[name])
     print(f"Contact '{name}' added successfully! 🎉")
 
 
@@ -103,8 +148,9 @@ def view_contacts():
     if not contacts:
         print('No contacts available. Add some to get started!')
     else:
-        for name, details in contacts.items():
-            print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
+        with stats.timer('view'):
+            for name, details in contacts.items():
+                print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
 
 
 def search_contact():
@@ -114,9 +160,8 @@ def search_contact():
     found_contacts = []
 
     # Find all contacts that contain the search name (case-insensitive)
-    for name, details in contacts.items():
-        if search_name in name:
-            found_contacts.append((name, details))
+    for name in search_cache.search(search_name):
+        found_contacts.append((name, contacts[name]))
 
     if not found_contacts:
         print(f"No contacts found matching '{search_name}'.")
@@ -126,6 +171,22 @@ def search_contact():
             print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
 
 
+def fuzzy_search_contact():
+    """Finds the contacts whose names are closest to what was typed, even with typos."""
+    print("\n--- Fuzzy Search ---")
+    search_name = input('Enter a name (close spellings are fine): ').strip()
+
+    # Ranked best match first, so "Kwami Mensa" still finds "Kwame Mensah"
+    found = name_index.fuzzy_search(search_name, limit=FUZZY_RESULTS)
+    if not found:
+        print(f"No contacts found close to '{search_name}'.")
+    else:
+        print("Closest matches:")
+        for name in found:
+            details = contacts[name]
+            print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
+
+
 def update_contact():
     """Updates the phone and email of an existing contact."""
     print("\n--- Update Contact ---")
@@ -133,23 +194,35 @@ def update_contact():
 
     if update_name in contacts:
         print(f"Updating details for '{update_name}'.")
+        changes = {}
 
         # Get and validate the new phone number
         while True:
-            new_number = input('Enter new phone number (10 digits): ').strip()
+            new_number = input('Enter new phone number (e.g. 0241234567 or 233241234567): ').strip()
             if is_valid_phone(new_number):
-                contacts[update_name]['phone'] = new_number
+                owner = phone_index.owner(new_number, exclude=update_name)
+                if owner:
+                    print(f"That number already belongs to '{owner}'.")
+                    continue
+                changes['phone'] = new_number
                 break
-            print('Invalid phone number. It must be 10 digits.')
+            print('Invalid phone number. Use 10 digits starting with 0, or 12 starting with 233.')
 
         # Get and validate the new email
         while True:
             new_email = input('Enter new email: ').strip()
             if is_valid_email(new_email):
-                contacts[update_name]['email'] = new_email
+                owner = email_index.owner(new_email, exclude=update_name)
+                if owner:
+                    print(f"That email already belongs to '{owner}'.")
+                    continue
+                changes['email'] = new_email
                 break
             print('Invalid email format. Please include an "@" and a ".".')
 
+        with stats.timer('update'):
+            contacts.edit(update_name, **changes)
+            storage.save(update_name, contacts[update_name])
         print(f"Contact '{update_name}' updated successfully! ✅")
     else:
         print(f"Contact '{update_name}' not found.")
@@ -161,12 +234,59 @@ def delete_contact():
     name_to_delete = input('Enter the name of the contact to delete: ').strip().title()
 
     if name_to_delete in contacts:
-        del contacts[name_to_delete]
+        with stats.timer('delete'):
+            del contacts[name_to_delete]
+            storage.save(name_to_delete, None)
         print(f"Contact '{name_to_delete}' deleted successfully. 👋")
     else:
         print(f"Contact '{name_to_delete}' not found.")
 
 
+def lookup_contact():
+    """Finds who a phone number or email belongs to."""
+    print("\n--- Lookup by Phone or Email ---")
+    value = input('Enter a phone number or email: ').strip()
+
+    # Emails and phone numbers each have their own index, so this is a single dictionary lookup
+    index = email_index if '@' in value else phone_index
+    with stats.timer('lookup'):
+        owners = index.lookup(value)
+    if not owners:
+        print(f"No contact has '{value}'.")
+    else:
+        for name in owners:
+            details = contacts[name]
+            print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
+
+
+def phone_prefix_search():
+    """Lists the contacts whose number starts with the digits typed, such as a network prefix."""
+    print("\n--- Search by Phone Prefix ---")
+    text = input('Enter the start of a number, e.g. 024 or 024/054: ').strip()
+
+    # Each prefix is a short walk down the phone trie, however many contacts there are
+    found = []
+    for prefix in text.replace(',', '/').split('/'):
+        if prefix.strip():
+            found.extend(phone_trie.search(prefix))
+    if not found:
+        print(f"No contacts have a number starting with '{text}'.")
+    else:
+        print(f"{len(found)} contact(s) found:")
+        for name in found:
+            details = contacts[name]
+            print(f'Name: {name}, Phone: {details["phone"]}, Email: {details["email"]}')
+
+
+def show_stats():
+    """Prints how long each kind of operation has taken so far (needs --profile)."""
+    print("\n--- Timing Stats ---")
+    print(stats.report())
+    cache = search_cache.info()
+    print(f"\nSearch cache: {cache['hits']} hit(s), {cache['refined']} answered from a shorter search, "
+          f"{cache['misses']} miss(es), {cache['cached']} search(es) cached")
+
+
 def main():
     """Main loop to run the contact management system."""
     print("Welcome to the Contact Management System! 📖")
@@ -175,11 +295,16 @@ def main():
         print("  [A]dd a new contact")
         print("  [V]iew all contacts")
         print("  [S]earch for a contact")
+        print("  [F]uzzy search (finds close spellings)")
         print("  [U]pdate an existing contact")
         print("  [D]elete a contact")
+        print("  [L]ookup a contact by phone or email")
+        print("  [P]hone prefix search (e.g. everyone on 024)")
+        print("  [T]iming stats (start with --profile)")
         print("  [Q]uit the program")
 
         action = input('Your choice: ').strip().lower()
+        stats.count('menu.' + action)  # How often each menu choice is used
 
         if action in ['add', 'a']:
             add_contact()
@@ -187,11 +312,20 @@ def main():
             view_contacts()
         elif action in ['search', 's']:
             search_contact()
+        elif action in ['fuzzy', 'f']:
+            fuzzy_search_contact()
         elif action in ['update', 'u']:
             update_contact()
         elif action in ['delete', 'd']:
             delete_contact()
+        elif action in ['lookup', 'l']:
+            lookup_contact()
+        elif action in ['prefix', 'p']:
+            phone_prefix_search()
+        elif action in ['stats', 't']:
+            show_stats()
         elif action in ['quit', 'q']:
+            storage.close()
             print("Thanks for using the Contact Management System. Goodbye! 👋")
             break
         else:
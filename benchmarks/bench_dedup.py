@@ -0,0 +1,77 @@
+# Group 16 - Contact Management System
+# Benchmark: finding duplicates in a big generated address book.
+#
+# Run from the project folder:
+#     python benchmarks/bench_dedup.py                  (1M contacts)
+#     python benchmarks/bench_dedup.py 100000 --workers 1,4
+#
+# Copies of some generated contacts are planted among them, changed the way real
+# duplicates are: a typo in the name, the name's words swapped round, the surname
+# left off, or a different name with the same number. The benchmark reports how
+# long finding them takes and how many of the planted copies were found.
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_dedup import find_duplicates
+from contact_store import ContactStore
+from generate import generate_contacts
+
+DUPLICATE_SHARE = 100  # One contact in this many gets a planted copy
+
+
+def plant_duplicate(number, name, details):
+    """A changed copy of a contact: (copy's name, copy's details)."""
+    words = name.split()
+    kind = number % 4
+    if kind == 0:
+        # A typo: the last letter of the name dropped, and a new number
+        return name[:-1], {'phone': f'0209{number:06d}', 'email': details['email']}
+    if kind == 1:
+        # The words the other way round, with a different email
+        return ' '.join(reversed(words)), {'phone': details['phone'], 'email': f'copy{number}@email.com'}
+    if kind == 2 and len(words) > 2:
+        # The surname left off, with the same email written in capitals
+        return ' '.join(words[:-1]), {'phone': f'0209{number:06d}', 'email': details['email'].upper()}
+    # Someone else's name, with the same number in its international form
+    phone = details['phone']
+    phone = '233' + phone[1:] if phone.startswith('0') else phone
+    return f'Copy {number}', {'phone': phone, 'email': f'other{number}@email.com'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time finding duplicates in a generated address book.')
+    parser.add_argument('size', nargs='?', type=int, default=1_000_000)
+    parser.add_argument('--workers', default=str(os.cpu_count() or 1), help='comma-separated worker counts to try')
+    arguments = parser.parse_args()
+
+    contacts = ContactStore()
+    planted = []  # (original name, copy's name)
+    for index, (name, details) in enumerate(generate_contacts(arguments.size)):
+        contacts[name] = details
+        if index % DUPLICATE_SHARE == 0:
+            copy_name, copy_details = plant_duplicate(index, name, details)
+            if copy_name not in contacts:
+                planted.append((name, copy_name))
+                contacts[copy_name] = copy_details
+    print(f'{len(contacts):,} contacts with {len(planted):,} planted duplicates, {os.cpu_count()} CPU core(s)')
+
+    for workers in [int(count) for count in arguments.workers.split(',')]:
+        start = time.perf_counter()
+        groups, report = find_duplicates(contacts, workers)
+        seconds = time.perf_counter() - start
+        group_of = {name: number for number, group in enumerate(groups) for name in group.names}
+        found = sum(1 for name, copy_name in planted
+                    if name in group_of and group_of[name] == group_of.get(copy_name))
+        certain = sum(1 for group in groups if group.certain)
+        print(f'  {workers} worker(s): {seconds:.1f}s, {report["tasks"]} tasks, {report["pairs"]:,} pairs, '
+              f'{report["groups"]:,} groups ({certain:,} near-certain), '
+              f'found {found:,} of {len(planted):,} planted ({found / max(len(planted), 1):.1%})')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Group 16 - Contact Management System
+# Benchmark: the compact row format (contacts.rows, contacts.rows.gz) against
+# the indented JSON snapshot (contacts.json): bytes on disk, write time and load time.
+#
+# Run from the project folder:
+#     python benchmarks/bench_format.py             (100k and 1M contacts)
+#     python benchmarks/bench_format.py 10000       (any sizes you like)
+#
+# Loads run in a fresh process each time, into a ContactStore the way the
+# programs load them (without the binary snapshot, which works the same for all).
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT)
+
+from contact_storage import write_snapshot
+from generate import GeneratedContacts
+
+FILES = ['contacts.json', 'contacts.rows', 'contacts.rows.gz']
+
+# Run in a fresh process so every load is a cold start for Python
+LOAD = """
+import resource, sys, time
+sys.path.insert(0, {project!r})
+from contact_store import ContactStore
+from contact_storage import load_contacts
+start = time.perf_counter()
+contacts = load_contacts({path!r}, None, ContactStore())
+print(time.perf_counter() - start, len(contacts), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def time_load(path):
+    """Returns (seconds, contacts, peak memory of the loading process in MB)."""
+    code = LOAD.format(project=PROJECT, path=path)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    seconds, count, peak_kb = output.split()
+    return float(seconds), int(count), int(peak_kb) / 1024
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [100_000, 1_000_000]
+    for size in sizes:
+        print(f'\n{size:,} contacts')
+        print(f"  {'file':<18} {'MB':>8} {'vs json':>8} {'write s':>8} {'load s':>8} {'peak MB':>8}")
+        with tempfile.TemporaryDirectory() as folder:
+            json_size = None
+            for file_name in FILES:
+                path = os.path.join(folder, file_name)
+                start = time.perf_counter()
+                write_snapshot(path, GeneratedContacts(size))
+                write_seconds = time.perf_counter() - start
+                file_size = os.path.getsize(path)
+                json_size = json_size or file_size
+                seconds, count, peak = time_load(path)
+                assert count == size
+                print(f"  {file_name:<18} {file_size / 1e6:>8.1f} {file_size / json_size:>7.0%} "
+                      f"{write_seconds:>8.2f} {seconds:>8.2f} {peak:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
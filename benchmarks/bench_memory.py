@@ -0,0 +1,54 @@
+# Group 16 - Contact Management System
+# Benchmark: memory per contact, ContactStore vs. the old dictionary of dictionaries.
+#
+# Run from the project folder:
+#     python benchmarks/bench_memory.py            (1M contacts)
+#     python benchmarks/bench_memory.py 100000
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_store import ContactStore
+from generate import generate_names
+
+DOMAINS = ['email.com', 'gmail.com', 'yahoo.com', 'outlook.com']
+
+
+def make_contacts(names, seed=16):
+    """Yields (name, details) with freshly built phone and email strings, like a JSON load."""
+    rng = random.Random(seed)
+    for name in names:
+        phone = rng.choice(['024', '054', '020', '027', '055']) + f'{rng.randrange(10_000_000):07d}'
+        email = name.lower().replace(' ', '.') + '@' + rng.choice(DOMAINS)
+        yield name, {'phone': phone, 'email': email}
+
+
+def measure(build):
+    """Returns the bytes still allocated after build() runs, plus what it built."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    # The names are the keys in both layouts, so they are built up front and not counted
+    names = generate_names(count)
+
+    dict_bytes, contacts = measure(lambda: dict(make_contacts(names)))
+    del contacts
+    store_bytes, store = measure(lambda: ContactStore(make_contacts(names)))
+    print(f'{count:,} contacts (name strings not counted; both layouts share them)')
+    print(f'  dict of dicts : {dict_bytes / count:7.1f} bytes per contact  ({dict_bytes / 2**20:,.0f} MB)')
+    print(f'  ContactStore  : {store_bytes / count:7.1f} bytes per contact  ({store_bytes / 2**20:,.0f} MB)')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Group 16 - Contact Management System
+# Benchmark: name search with the trigram index vs. the old loop over every contact.
+#
+# Run from the project folder:
+#     python benchmarks/bench_search.py            (100k and 1M contacts)
+#     python benchmarks/bench_search.py 10000      (any sizes you like)
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_index import NameIndex, SearchWorker
+from generate import generate_names
+
+QUERIES = ['kwame', 'mensah', 'a ser', 'boateng', 'xyz', 'ama']
+FUZZY_QUERIES = ['kwami', 'kwami mensa', 'boatenn', 'ama serwa', 'efua oforiwa', 'kwme']
+REPEATS = 20
+LIVE_LIMIT = 500  # Same cap as the GUI's search-as-you-type
+
+
+def linear_search(names, term):
+    """The search the scripts used to do: check every name."""
+    term = term.lower()
+    return sorted(name for name in names if term in name.lower())
+
+
+def time_query(function, *args):
+    """Returns the median time of a query in milliseconds, and its result."""
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1000, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for size in sizes:
+        names = generate_names(size)
+        start = time.perf_counter()
+        index = NameIndex(names)
+        print(f'\n{size:,} contacts (index built in {time.perf_counter() - start:.1f}s)')
+        print(f'{"query":<10} {"matches":>8} {"scan ms":>10} {"index ms":>10}')
+        for query in QUERIES:
+            scan_ms, expected = time_query(linear_search, names, query)
+            index_ms, found = time_query(index.search, query)
+            assert found == expected
+            print(f'{query:<10} {len(found):>8} {scan_ms:>10.2f} {index_ms:>10.2f}')
+
+        # Fuzzy search, top 10 closest names
+        print(f'{"fuzzy query":<14} {"ms":>8}  best match')
+        for query in FUZZY_QUERIES:
+            fuzzy_ms, found = time_query(index.fuzzy_search, query)
+            print(f'{query:<14} {fuzzy_ms:>8.2f}  {found[0] if found else "-"}')
+
+        # Search-as-you-type: every prefix of a name, sent through the worker thread like the GUI does
+        worker = SearchWorker(lambda term: index.search(term, limit=LIVE_LIMIT))
+        latencies = []
+        for word in ['kwame mensah', 'ama serwaa', 'boateng']:
+            for end in range(1, len(word) + 1):
+                start = time.perf_counter()
+                query_id = worker.submit(word[:end])
+                while worker.results.get()[0] != query_id:
+                    pass
+                latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f'live search, {len(latencies)} keystrokes: median {latencies[len(latencies) // 2]:.2f} ms, '
+              f'worst {latencies[-1]:.2f} ms')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Group 16 - Contact Management System
+# Benchmark: loading a sharded snapshot (contacts.shards) with 1 to 16 worker
+# processes, against one big contacts.json, and what one edit costs to save.
+#
+# Run from the project folder:
+#     python benchmarks/bench_shards.py                        (1M contacts, 1-16 workers)
+#     python benchmarks/bench_shards.py 10000000 --workers 1,2,4,8,16
+#
+# Every load runs in a fresh process, so each one is a cold start for Python.
+# More workers only help when the machine has the cores for them: the numbers
+# printed next to each row say how many cores this machine has.
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT)
+
+from contact_storage import SHARD_COUNT, ShardedStorage, write_snapshot
+from generate import GeneratedContacts
+
+# Run in a fresh process so every load is a cold start for Python
+LOAD = """
+import resource, sys, time
+sys.path.insert(0, {project!r})
+from contact_store import ContactStore
+from contact_storage import JsonStorage, ShardedStorage
+if {workers!r} is None:
+    storage = JsonStorage({path!r})
+else:
+    storage = ShardedStorage({path!r}, workers={workers!r})
+start = time.perf_counter()
+contacts = storage.load(ContactStore())
+print(time.perf_counter() - start, len(contacts), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+# One edit, then close(): the journal is folded back into the snapshot
+SAVE_ONE = """
+import sys, time
+sys.path.insert(0, {project!r})
+from contact_store import ContactStore
+from contact_storage import open_storage
+storage = open_storage({path!r}, use_binary=False)
+contacts = storage.load(ContactStore())
+name = next(iter(contacts))
+contacts.edit(name, phone='0551234567')
+start = time.perf_counter()
+storage.save(name, contacts[name])
+storage.close()
+print(time.perf_counter() - start)
+"""
+
+
+def run(code):
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+
+
+def time_load(path, workers=None):
+    """Returns (seconds, contacts, peak memory of the loading process in MB)."""
+    seconds, count, peak_kb = run(LOAD.format(project=PROJECT, path=path, workers=workers))
+    return float(seconds), int(count), int(peak_kb) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time loading sharded contacts with different numbers of workers.')
+    parser.add_argument('size', nargs='?', type=int, default=1_000_000)
+    parser.add_argument('--workers', default='1,2,4,8,16', help='comma-separated worker counts to try')
+    parser.add_argument('--shards', type=int, default=SHARD_COUNT)
+    arguments = parser.parse_args()
+    worker_counts = [int(count) for count in arguments.workers.split(',')]
+
+    with tempfile.TemporaryDirectory() as folder:
+        json_path = os.path.join(folder, 'contacts.json')
+        shards_path = os.path.join(folder, 'contacts.shards')
+        start = time.perf_counter()
+        write_snapshot(json_path, GeneratedContacts(arguments.size))
+        json_write = time.perf_counter() - start
+        start = time.perf_counter()
+        ShardedStorage(shards_path, arguments.shards).save_all(GeneratedContacts(arguments.size))
+        shards_write = time.perf_counter() - start
+        print(f'{arguments.size:,} contacts, {arguments.shards} shards, {os.cpu_count()} CPU core(s)')
+        print(f'  written in {json_write:.1f}s as one JSON file, {shards_write:.1f}s as shards')
+
+        json_load, count, json_peak = time_load(json_path)
+        assert count == arguments.size
+        print(f"\n  {'load':<22} {'seconds':>9} {'speed-up':>9} {'peak MB':>9}")
+        print(f"  {'contacts.json':<22} {json_load:>9.2f} {'':>9} {json_peak:>9.0f}")
+        baseline = None
+        for workers in worker_counts:
+            seconds, count, peak = time_load(shards_path, workers)
+            assert count == arguments.size
+            baseline = baseline or seconds
+            print(f"  {f'shards, {workers} worker(s)':<22} {seconds:>9.2f} {baseline / seconds:>8.2f}x {peak:>9.0f}")
+
+        print(f"\n  {'save one edit and quit':<22} {'seconds':>9}")
+        for label, path in [('contacts.json', json_path), ('shards', shards_path)]:
+            seconds = float(run(SAVE_ONE.format(project=PROJECT, path=path))[0])
+            print(f"  {label:<22} {seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
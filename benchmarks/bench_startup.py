@@ -0,0 +1,103 @@
+# Group 16 - Contact Management System
+# Benchmark: cold start from contacts.json vs. the binary snapshot (contacts.bin).
+#
+# Run from the project folder:
+#     python benchmarks/bench_startup.py            (100k and 1M contacts)
+#     python benchmarks/bench_startup.py 10000      (any sizes you like)
+#
+# For each size it times, in a fresh process each time:
+#   - loading the contacts into a ContactStore from JSON and from the binary snapshot
+#   - "Group 16 json.py" from launch until its menu appears, and until the answer
+#     to a first search is printed (which needs the contacts and the indexes)
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT)
+
+from contact_store import ContactStore
+from contact_storage import write_binary_snapshot, write_snapshot
+from generate import GeneratedContacts
+
+SCRIPT = os.path.join(PROJECT, 'Group 16 json.py')
+
+# Run in a fresh process so every load is a cold start for Python
+LOAD = """
+import sys, time
+sys.path.insert(0, {project!r})
+from contact_store import ContactStore
+from contact_storage import JsonStorage
+storage = JsonStorage({path!r}, binary_path={binary_path!r})
+start = time.perf_counter()
+contacts = storage.load(ContactStore())
+print(time.perf_counter() - start, len(contacts))
+"""
+
+
+def time_load(path, binary_path):
+    code = LOAD.format(project=PROJECT, path=path, binary_path=binary_path)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    seconds, count = output.split()
+    return float(seconds), int(count)
+
+
+def read_until(process, marker, output):
+    """Reads the script's output until marker shows up. Returns the output so far."""
+    while marker not in output:
+        chunk = os.read(process.stdout.fileno(), 65536)
+        if not chunk:
+            raise RuntimeError(f'The script exited before printing {marker!r}:\n{output}')
+        output += chunk.decode('utf-8', 'replace')
+    return output
+
+
+def time_script(path):
+    """Returns (seconds until the menu, seconds until the first search answer)."""
+    environment = dict(os.environ, CONTACTS_FILE=path)
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-u', SCRIPT], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               env=environment, cwd=os.path.dirname(path))
+    output = read_until(process, 'Your choice:', '')
+    menu = time.perf_counter() - start
+    process.stdin.write(b's\nkwame\n')
+    process.stdin.flush()
+    output = read_until(process, 'Found the following', output.replace('Your choice:', ''))
+    search = time.perf_counter() - start
+    process.communicate(b'q\n')
+    return menu, search
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'contacts.json')
+            binary_path = os.path.join(folder, 'contacts.bin')
+            write_snapshot(path, GeneratedContacts(size))
+
+            start = time.perf_counter()
+            write_binary_snapshot(binary_path, ContactStore(GeneratedContacts(size).items()), path)
+            print(f'\n{size:,} contacts (JSON {os.path.getsize(path) / 2**20:.1f} MB, '
+                  f'binary {os.path.getsize(binary_path) / 2**20:.1f} MB, '
+                  f'written in {time.perf_counter() - start:.1f}s)')
+
+            json_load, _ = time_load(path, None)
+            binary_load, count = time_load(path, binary_path)
+            assert count == size
+            print(f'{"load into ContactStore":<26} {"JSON":>10} {json_load:>8.2f}s   binary {binary_load:>8.2f}s '
+                  f'({json_load / binary_load:.0f}x faster)')
+
+            # Without contacts.bin the script loads the JSON, and writes contacts.bin again when it quits
+            os.remove(binary_path)
+            json_menu, json_search = time_script(path)
+            binary_menu, binary_search = time_script(path)
+            print(f'{"script: menu shown":<26} {"JSON":>10} {json_menu:>8.2f}s   binary {binary_menu:>8.2f}s')
+            print(f'{"script: first search":<26} {"JSON":>10} {json_search:>8.2f}s   binary {binary_search:>8.2f}s')
+
+
+if __name__ == "__main__":
+    main()
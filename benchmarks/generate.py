@@ -0,0 +1,101 @@
+# Group 16 - Contact Management System
+# A deterministic generator of realistic test contacts for the benchmarks.
+#
+# Contacts look like the ones in contacts.json: Ghanaian names, phone numbers in
+# both the local "0XX..." and the international "233XX..." form, and emails such
+# as kwame.mensah@email.com. The same count and seed always give the same contacts,
+# and every name, phone number and email is unique, even at 10 million contacts.
+#
+#     python benchmarks/generate.py 100000 contacts_100k.json
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_storage import write_snapshot
+
+FIRST_NAMES = ['Kwame', 'Kofi', 'Kwasi', 'Kwabena', 'Kwaku', 'Yaw', 'Kojo', 'Kwadwo', 'Ekow', 'Kobina',
+               'Ama', 'Akua', 'Yaa', 'Adwoa', 'Abena', 'Afua', 'Esi', 'Efua', 'Akosua', 'Adjoa',
+               'Nii', 'Naa', 'Eugene', 'Kweku', 'Fiifi', 'Ebo', 'Araba', 'Aba', 'Dede', 'Korkor',
+               'Selorm', 'Edem', 'Elikem', 'Dzifa', 'Mawuli', 'Sena', 'Yayra', 'Delali', 'Kafui', 'Enyonam']
+MIDDLE_NAMES = [''] + ['Serwaa', 'Oforiwaa', 'Animah', 'Boatemaa', 'Nyarko', 'Agyeman', 'Ofori', 'Owusu',
+                       'Kyei', 'Amoako', 'Badu', 'Asante', 'Sarpong', 'Frimpong', 'Dankwa', 'Ansah',
+                       'Tetteh', 'Quaye', 'Lamptey', 'Darko', 'Acheampong', 'Appiah', 'Bonsu', 'Addo']
+# Surnames are built from three syllables, which gives plenty of distinct names
+SYLLABLES = ['Men', 'Sah', 'Os', 'Ei', 'Bo', 'A', 'Teng', 'Ani', 'Mah', 'Sa', 'Re', 'Po', 'Ku', 'Yi',
+             'Tey', 'De', 'Ba', 'Go', 'Ko', 'Dar', 'Fo', 'Gya', 'Kye', 'Nti', 'Twu', 'Mi', 'Wu', 'Dua',
+             'Nk', 'Ru', 'Ma', 'Fri', 'Pong', 'Ye', 'Bi', 'Na']
+DOMAINS = ['email.com', 'gmail.com', 'yahoo.com', 'outlook.com', 'ug.edu.gh', 'knust.edu.gh']
+NETWORKS = ['20', '24', '26', '27', '50', '54', '55', '59']  # Mobile network prefixes
+INTERNATIONAL_SHARE = 5  # One in five numbers is stored in the 233... form
+
+NAME_SPACE = len(FIRST_NAMES) * len(MIDDLE_NAMES) * len(SYLLABLES) ** 3
+PHONE_SPACE = len(NETWORKS) * 10_000_000
+
+
+def _spread(index, space, seed):
+    """Maps 0, 1, 2, ... to distinct, well-mixed numbers below space (space must be coprime with 7919)."""
+    return (index * 7919 + seed * 104729) % space
+
+
+def _surname(number):
+    count = len(SYLLABLES)
+    first, second, third = number // count ** 2, number // count % count, number % count
+    return SYLLABLES[first] + SYLLABLES[second].lower() + SYLLABLES[third].lower()
+
+
+def generate_contacts(count, seed=16):
+    """Yields count (name, details) pairs, always the same ones for the same count and seed."""
+    if count > min(NAME_SPACE, PHONE_SPACE):
+        raise ValueError(f'Can only generate {min(NAME_SPACE, PHONE_SPACE):,} unique contacts.')
+    surnames = len(SYLLABLES) ** 3
+    for index in range(count):
+        code = _spread(index, NAME_SPACE, seed)
+        first = FIRST_NAMES[code % len(FIRST_NAMES)]
+        code //= len(FIRST_NAMES)
+        middle = MIDDLE_NAMES[code % len(MIDDLE_NAMES)]
+        surname = _surname(code // len(MIDDLE_NAMES) % surnames)
+        name = ' '.join(part for part in (first, middle, surname) if part)
+
+        number = _spread(index, PHONE_SPACE, seed)
+        network, line = NETWORKS[number // 10_000_000], number % 10_000_000
+        if index % INTERNATIONAL_SHARE == 0:
+            phone = f'233{network}{line:07d}'
+        else:
+            phone = f'0{network}{line:07d}'
+
+        email = name.lower().replace(' ', '.') + '@' + DOMAINS[index % len(DOMAINS)]
+        yield name, {'phone': phone, 'email': email}
+
+
+def generate_names(count, seed=16):
+    """Just the names, for benchmarks that only need those."""
+    return [name for name, details in generate_contacts(count, seed)]
+
+
+class GeneratedContacts:
+    """Looks enough like a contacts dictionary for write_snapshot, without holding any contacts."""
+
+    def __init__(self, count, seed=16):
+        self.count = count
+        self.seed = seed
+
+    def __len__(self):
+        return self.count
+
+    def items(self):
+        return generate_contacts(self.count, self.seed)
+
+
+def main():
+    if len(sys.argv) != 3:
+        print('Usage: python benchmarks/generate.py COUNT OUTPUT.json')
+        return
+    count, path = int(sys.argv[1]), sys.argv[2]
+    write_snapshot(path, GeneratedContacts(count))
+    print(f'Wrote {count:,} contacts to {path}.')
+
+
+if __name__ == "__main__":
+    main()
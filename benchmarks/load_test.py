@@ -0,0 +1,202 @@
+# Group 16 - Contact Management System
+# Load test for the HTTP/JSON API (contact_api.py).
+#
+# Run from the project folder:
+#     python benchmarks/load_test.py                          (100k contacts, 50 clients, 10 seconds)
+#     python benchmarks/load_test.py --contacts 1000000 --clients 200 --seconds 30
+#     python benchmarks/load_test.py --url http://127.0.0.1:8016    (a server that is already running)
+#
+# Unless --url is given, it writes a generated address book to a temporary folder
+# and starts contact_api.py on it. Every client keeps one connection open and sends
+# requests back to back: mostly searches, plus lookups, list pages and edits.
+# Reports requests per second and latency percentiles, overall and per request type.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_storage import write_snapshot
+from generate import GeneratedContacts, generate_names
+from run import summarize
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# How often each kind of request is sent, out of 100
+MIX = [('search', 60), ('fuzzy', 10), ('get', 15), ('list', 5), ('add', 4), ('update', 4), ('delete', 2)]
+
+
+# ---
+# A tiny keep-alive HTTP client
+# ---
+class Client:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, data=None):
+        """Sends one request and returns (status, parsed JSON body)."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(data).encode('utf-8') if data is not None else b''
+        self.writer.write(f'{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n'
+                          f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            chunks = []
+            while True:
+                size = int(await self.reader.readline(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            payload = b''.join(chunks)
+        else:
+            payload = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        return status, json.loads(payload)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+# ---
+# The load
+# ---
+async def run_client(client_id, host, port, names, deadline, timings, errors):
+    rng = random.Random(client_id)
+    client = Client(host, port)
+    kinds = [kind for kind, weight in MIX for _ in range(weight)]
+    added = []  # Names this client added, to update and delete later
+    count = 0
+    while time.perf_counter() < deadline:
+        kind = rng.choice(kinds)
+        name = rng.choice(names)
+        count += 1
+        if kind == 'search':
+            method, path, data = 'GET', f'/search?q={quote(name[:rng.randint(3, 8)])}&limit=20', None
+        elif kind == 'fuzzy':
+            method, path, data = 'GET', f'/search?q={quote(name.split()[0] + " " + name.split()[-1][:-1])}&fuzzy=1', None
+        elif kind == 'get':
+            method, path, data = 'GET', f'/contacts/{quote(name)}', None
+        elif kind == 'list':
+            method, path, data = 'GET', f'/contacts?offset={rng.randrange(len(names))}&limit=100', None
+        elif kind == 'add' or not added:
+            kind = 'add'
+            letters = ''.join(chr(97 + rng.randrange(26)) for _ in range(8))
+            new_name = f'Load Test {letters.title()}'
+            method, path = 'POST', '/contacts'
+            data = {'name': new_name, 'phone': f'057{client_id % 100:02d}{count % 100000:05d}',
+                    'email': f'{letters}.{client_id}.{count}@loadtest.com'}
+        elif kind == 'update':
+            method, path = 'PATCH', f'/contacts/{quote(rng.choice(added))}'
+            data = {'email': f'updated.{client_id}.{count}@loadtest.com'}
+        else:
+            method, path, data = 'DELETE', f'/contacts/{quote(added.pop())}', None
+
+        start = time.perf_counter()
+        try:
+            status, result = await client.request(method, path, data)
+        except (OSError, ValueError, asyncio.IncompleteReadError) as error:
+            errors.append(f'{kind}: {type(error).__name__}: {error}')
+            client.close()
+            client = Client(host, port)
+            continue
+        timings.setdefault(kind, []).append(time.perf_counter() - start)
+        if kind == 'add' and status == 201:
+            added.append(result['contact']['name'])
+        elif status >= 400 and status != 409:  # 409: a random new name or number was already taken
+            errors.append(f'{kind}: {status} {result.get("error")}')
+    client.close()
+
+
+async def run_load(host, port, names, clients, seconds):
+    timings, errors = {}, []
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(client_id, host, port, names, deadline, timings, errors)
+                           for client_id in range(clients)))
+    return timings, errors, time.perf_counter() - start
+
+
+# ---
+# Starting a server to test
+# ---
+def start_server(path):
+    """Starts contact_api.py on a free port. Returns (process, host, port)."""
+    process = subprocess.Popen([sys.executable, os.path.join(PROJECT, 'contact_api.py'), '--port', '0', '--file', path],
+                               stdout=subprocess.PIPE, text=True, cwd=os.path.dirname(path))
+    line = process.stdout.readline()  # "Serving N contacts on http://127.0.0.1:PORT"
+    if 'http://' not in line:
+        process.kill()
+        raise RuntimeError(f'The server did not start: {line!r}')
+    url = urlsplit(line.split()[-1])
+    return process, url.hostname, url.port
+
+
+def stop_server(process):
+    process.send_signal(signal.SIGINT)  # Like Ctrl+C: the server saves before it exits
+    process.communicate(timeout=120)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the contact HTTP API.')
+    parser.add_argument('--contacts', type=int, default=100_000, help='size of the generated address book')
+    parser.add_argument('--clients', type=int, default=50, help='connections sending requests at once')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--url', help='test a server that is already running instead of starting one')
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        process = None
+        if arguments.url:
+            url = urlsplit(arguments.url)
+            host, port = url.hostname, url.port
+            status, result = asyncio.run(Client(host, port).request('GET', '/contacts?limit=1000'))
+            names = [contact['name'] for contact in result['contacts']]
+        else:
+            path = os.path.join(folder, 'contacts.json')
+            write_snapshot(path, GeneratedContacts(arguments.contacts))
+            process, host, port = start_server(path)
+            names = generate_names(min(arguments.contacts, 10_000))
+
+        print(f'{arguments.clients} clients for {arguments.seconds:g}s against http://{host}:{port} ...')
+        try:
+            timings, errors, elapsed = asyncio.run(run_load(host, port, names, arguments.clients, arguments.seconds))
+        finally:
+            if process is not None:
+                stop_server(process)
+
+    every = [seconds for latencies in timings.values() for seconds in latencies]
+    print(f'\n{len(every):,} requests in {elapsed:.1f}s = {len(every) / elapsed:,.0f} requests/s, {len(errors)} error(s)')
+    print(f"  {'request':<8} {'count':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for kind, latencies in [('all', every)] + sorted(timings.items()):
+        stats = summarize(latencies)
+        print(f"  {kind:<8} {stats['count']:>8} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['max_ms']:>9}")
+    for error in errors[:10]:
+        print('  error:', error)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# Group 16 - Contact Management System
+# Benchmark suite: times the main code paths on generated address books.
+#
+# Run from the project folder:
+#     python benchmarks/run.py                              (1k and 100k contacts)
+#     python benchmarks/run.py --sizes 1k,100k,1m,10m
+#     python benchmarks/run.py --compare benchmarks/results/<older run>.json
+#
+# Every size runs in its own process, so the peak memory reported is for that
+# size alone. Results are saved as JSON in benchmarks/results/, named after the
+# date and git commit, so two commits can be compared.
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_index import FieldIndex, NameIndex, SortedNameIndex
+from contact_phone import PhoneTrie, phone_key
+from contact_store import ContactStore
+from contact_storage import JsonStorage, write_snapshot
+from generate import GeneratedContacts, generate_contacts
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FOLDER = os.path.join(HERE, 'results')
+OPERATIONS = 200  # How many searches, adds, updates and deletes are timed at each size
+TRANSACTION_SIZE = 100  # Edits in each timed transaction
+PAGE_SIZE = 20  # Contacts per page, like View in the CLI
+
+
+# ---
+# Measuring helpers
+# ---
+def summarize(latencies):
+    """Turns a list of timings (in seconds) into throughput and latency percentiles."""
+    latencies = sorted(latencies)
+    total = sum(latencies)
+
+    def percentile(share):
+        return latencies[min(len(latencies) - 1, int(share * len(latencies)))] * 1000
+
+    return {
+        'count': len(latencies),
+        'ops_per_s': round(len(latencies) / total, 1) if total else None,
+        'p50_ms': round(percentile(0.50), 3),
+        'p95_ms': round(percentile(0.95), 3),
+        'p99_ms': round(percentile(0.99), 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+    }
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    multiplier = {'k': 1000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+# ---
+# One address book size
+# ---
+def bench_size(count, folder):
+    rng = random.Random(count)
+    path = os.path.join(folder, f'contacts_{count}.json')
+    write_snapshot(path, GeneratedContacts(count))
+    results = {'contacts': count}
+
+    # load_contacts, then building the same indexes the scripts build
+    storage = JsonStorage(path, os.path.join(folder, f'contacts_{count}.journal'))
+    seconds, contacts = timed(storage.load, ContactStore())
+    results['load'] = summarize([seconds])
+
+    def build_indexes():
+        return (contacts.add_index(NameIndex()), contacts.add_index(FieldIndex('phone', phone_key)),
+                contacts.add_index(FieldIndex('email', str.lower)), contacts.add_index(PhoneTrie()),
+                contacts.add_index(SortedNameIndex()))
+    seconds, (name_index, phone_index, email_index, phone_trie, sorted_names) = timed(build_indexes)
+    results['index_build'] = summarize([seconds])
+
+    # save_contacts: a full rewrite of the file
+    repeats = max(1, min(10, 100_000 // count))
+    results['save'] = summarize([timed(storage.save_all, contacts)[0] for _ in range(repeats)])
+    results['file_mb'] = round(os.path.getsize(path) / 2**20, 2)
+
+    # search: pieces of real names, from 3 to 8 letters long
+    names = [name for _, name in zip(range(OPERATIONS * 50), contacts)]
+    queries = []
+    for name in rng.sample(names, min(OPERATIONS, len(names))):
+        length = rng.randint(3, min(8, len(name)))
+        start = rng.randint(0, len(name) - length)
+        queries.append(name[start:start + length])
+    results['search'] = summarize([timed(name_index.search, query)[0] for query in queries])
+
+    # phone prefix: the first 5 to 8 digits of real numbers, e.g. "02412"
+    prefixes = [contacts[name]['phone'][:rng.randint(5, 8)] for name in rng.sample(names, min(OPERATIONS, len(names)))]
+    results['phone_prefix'] = summarize([timed(phone_trie.search, prefix)[0] for prefix in prefixes])
+
+    # page: any page of View, in alphabetical order, with each contact's details
+    def page(number):
+        return [(name, contacts[name]) for name in sorted_names[number * PAGE_SIZE:(number + 1) * PAGE_SIZE]]
+
+    pages = (len(sorted_names) + PAGE_SIZE - 1) // PAGE_SIZE
+    results['page'] = summarize([timed(page, rng.randrange(pages))[0] for _ in range(OPERATIONS)])
+
+    # name range: where the names from one letter through another start and stop, e.g. K-M
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    ranges = [sorted(rng.sample(letters, 2)) for _ in range(OPERATIONS)]
+    results['name_range'] = summarize([timed(sorted_names.between, first, last)[0] for first, last in ranges])
+
+    # add / update / delete, each saved through the journal like the scripts do
+    def add(name, details):
+        contacts[name] = details
+        storage.save(name, details)
+
+    def update(name, phone):
+        contacts.edit(name, phone=phone)
+        storage.save(name, contacts[name])
+
+    def delete(name):
+        del contacts[name]
+        storage.save(name, None)
+
+    # transaction: TRANSACTION_SIZE edits staged, checked and saved together with one write
+    def transaction(names):
+        with contacts.transaction(storage.save_many) as batch:
+            for index, name in enumerate(names):
+                batch.edit(name, email=f'batch{index}.{name.lower().replace(" ", ".")}@email.com')
+
+    batches = [rng.sample(names, min(TRANSACTION_SIZE, len(names))) for _ in range(OPERATIONS // 10)]
+    results['transaction'] = summarize([timed(transaction, batch)[0] for batch in batches])
+
+    new_contacts = itertools.islice(generate_contacts(count + OPERATIONS), count, None)
+    results['add'] = summarize([timed(add, name, details)[0] for name, details in new_contacts])
+    targets = rng.sample(names, min(OPERATIONS, len(names)))
+    results['update'] = summarize([timed(update, name, f'09{index:08d}')[0] for index, name in enumerate(targets)])
+    results['delete'] = summarize([timed(delete, name)[0] for name in targets])
+
+    results['render'] = bench_render(contacts, sorted_names)
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def bench_render(contacts, sorted_names):
+    """Time to first paint of 'View All' in the GUI's list view. Needs customtkinter and a display."""
+    try:
+        import customtkinter
+        from contact_list_view import ContactListView
+
+        root = customtkinter.CTk()
+        root.withdraw()
+        view = ContactListView(root)
+        view.pack()
+
+        def first_paint():
+            view.show(sorted_names, contacts.get)
+            root.update_idletasks()
+        latencies = [timed(first_paint)[0] for _ in range(20)]
+        root.destroy()
+        return summarize(latencies)
+    except Exception as error:  # No GUI toolkit or no display here
+        return {'skipped': f'{type(error).__name__}: {error}'}
+
+
+# ---
+# Running, saving and comparing
+# ---
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_results(results):
+    print(f"\n{results['contacts']:,} contacts  (file {results['file_mb']} MB, peak RSS {results['peak_rss_mb']} MB)")
+    print(f"  {'operation':<12} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for operation in ['load', 'index_build', 'save', 'search', 'phone_prefix', 'page', 'name_range', 'transaction',
+                      'add', 'update', 'delete', 'render']:
+        stats = results[operation]
+        if 'skipped' in stats:
+            print(f"  {operation:<12} skipped ({stats['skipped']})")
+        else:
+            print(f"  {operation:<12} {stats['ops_per_s']:>10} {stats['p50_ms']:>10} {stats['p95_ms']:>10} {stats['p99_ms']:>10}")
+
+
+def compare(old_path, new_run):
+    """Prints how each operation's median latency changed since an earlier run."""
+    with open(old_path) as file:
+        old_run = json.load(file)
+    old_sizes = {results['contacts']: results for results in old_run['sizes']}
+    print(f"\nCompared with {old_run['commit']} ({old_run['date']}):")
+    for results in new_run['sizes']:
+        old = old_sizes.get(results['contacts'])
+        if old is None:
+            continue
+        for operation, stats in results.items():
+            if isinstance(stats, dict) and 'p50_ms' in stats and 'p50_ms' in old.get(operation, {}):
+                before, after = old[operation]['p50_ms'], stats['p50_ms']
+                change = (after - before) / before * 100 if before else 0.0
+                flag = '  <-- slower' if change > 10 else ''
+                print(f"  {results['contacts']:>10,} {operation:<12} {before:>10} -> {after:<10} ms ({change:+.0f}%){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the contact manager.')
+    parser.add_argument('--sizes', default='1k,100k', help='comma-separated sizes, e.g. 1k,100k,1m,10m')
+    parser.add_argument('--compare', help='an earlier results file to compare against')
+    parser.add_argument('--one', type=int, help=argparse.SUPPRESS)  # Used internally: run a single size
+    parser.add_argument('--folder', help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.one:
+        print(json.dumps(bench_size(arguments.one, arguments.folder)))
+        return
+
+    run = {'commit': git_commit(), 'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+           'python': platform.python_version(), 'platform': platform.platform(), 'sizes': []}
+    with tempfile.TemporaryDirectory() as folder:
+        for size in [parse_size(text) for text in arguments.sizes.split(',')]:
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--one', str(size), '--folder', folder],
+                                    capture_output=True, text=True, check=True).stdout
+            results = json.loads(output)
+            run['sizes'].append(results)
+            print_results(results)
+
+    os.makedirs(RESULTS_FOLDER, exist_ok=True)
+    path = os.path.join(RESULTS_FOLDER, f"{time.strftime('%Y%m%d-%H%M%S')}-{run['commit']}.json")
+    with open(path, 'w') as file:
+        json.dump(run, file, indent=4)
+    print(f'\nSaved results to {path}')
+
+    if arguments.compare:
+        compare(arguments.compare, run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+# Group 16 - Contact Management System
+# A small HTTP/JSON server over the contact store, for other programs to use.
+#
+#     python contact_api.py                       (http://127.0.0.1:8016, contacts.json)
+#     python contact_api.py --port 9000 --file contacts.db
+#
+# Endpoints (names go in the path URL-encoded, e.g. /contacts/Kwame%20Mensah):
+#     GET    /contacts?offset=0&limit=100    list contacts in alphabetical order, a page at a time
+#     GET    /contacts?from=k&to=m           only the names from K through M
+#     POST   /contacts                       add: {"name": ..., "phone": ..., "email": ...}
+#     GET    /contacts/<name>                one contact
+#     PATCH  /contacts/<name>                update: {"phone": ...} and/or {"email": ...}
+#     DELETE /contacts/<name>                delete
+#     GET    /search?q=kwa&fuzzy=1&limit=10  search by name, like the Search menu choice
+#
+# Everything runs on one asyncio event loop, so many connections are served at
+# once while the contacts themselves are only ever touched by one thread. Edits
+# are handed to a BackgroundWriter, which saves them in batches on its own thread,
+# so a request never waits for the disk. Listings are streamed out in chunks.
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from contact_index import FieldIndex, NameIndex, SearchCache, SortedNameIndex
+from contact_io import is_valid_name
+from contact_phone import PhoneTrie, normalize_phone, phone_key
+from contact_storage import BackgroundWriter, open_storage
+from contact_store import ContactStore
+
+DEFAULT_PORT = 8016
+PAGE_SIZE = 100           # Contacts per page when a listing doesn't give a limit
+STREAM_CHUNK = 500        # Contacts per chunk when streaming a listing
+SEARCH_LIMIT = 50         # Results when a search doesn't give a limit
+MAX_BODY = 64 * 1024      # Bigger request bodies are refused
+REFRESH_SECONDS = 2       # How often to pick up edits made by other programs
+COMPACT_EVERY = 20000     # Fold the journal into the snapshot after this many edits
+
+
+class HttpError(Exception):
+    """Ends a request with an error status and a JSON message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def is_valid_email(email):
+    """Checks for a basic email format (contains '@' and '.')."""
+    return '@' in email and '.' in email
+
+
+# ---
+# The server
+# ---
+class ContactAPI:
+    def __init__(self, path):
+        # The journal is folded into the snapshot by the server itself, never from the writer thread
+        self.storage = open_storage(path, compact_every=None)
+        self.contacts = self.storage.load(ContactStore())
+        self.writer = BackgroundWriter(self.storage)
+        self.name_index = self.contacts.add_index(NameIndex())
+        self.search_cache = self.contacts.add_index(SearchCache(self.name_index))
+        self.contacts.add_index(FieldIndex('phone', phone_key))
+        self.contacts.add_index(FieldIndex('email', str.lower))
+        self.contacts.add_index(PhoneTrie())
+        self.sorted_names = self.contacts.add_index(SortedNameIndex())
+
+    # Connections
+
+    async def handle_connection(self, reader, writer):
+        """Answers requests on one connection until the client closes it (HTTP/1.1 keep-alive)."""
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    await self.route(method, target, body, writer, keep_alive)
+                except HttpError as error:
+                    await send_json(writer, error.status, {'ok': False, 'error': str(error)}, keep_alive)
+                if not keep_alive:
+                    break
+        except HttpError as error:  # The request itself couldn't be read
+            await send_json(writer, error.status, {'ok': False, 'error': str(error)}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, target, body, writer, keep_alive):
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+
+        if parts == ['contacts'] and method == 'GET':
+            return await self.list_contacts(query, writer, keep_alive)
+        if parts == ['contacts'] and method == 'POST':
+            result = self.add_contact(read_json(body))
+        elif len(parts) == 2 and parts[0] == 'contacts' and method == 'GET':
+            result = {'ok': True, 'contact': self.contact_json(self.existing_name(parts[1]))}
+        elif len(parts) == 2 and parts[0] == 'contacts' and method in ('PATCH', 'PUT'):
+            result = self.update_contact(parts[1], read_json(body))
+        elif len(parts) == 2 and parts[0] == 'contacts' and method == 'DELETE':
+            result = self.delete_contact(parts[1])
+        elif parts == ['search'] and method == 'GET':
+            result = self.search_contacts(query)
+        elif parts[0] in ('contacts', 'search'):
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f'{method} is not allowed on {url.path}')
+        else:
+            raise HttpError(HTTPStatus.NOT_FOUND, f'no such endpoint: {url.path}')
+        status = HTTPStatus.CREATED if method == 'POST' else HTTPStatus.OK
+        await send_json(writer, status, result, keep_alive)
+
+    # The operations, the same ones the menu offers
+
+    def contact_json(self, name):
+        details = self.contacts[name]
+        return {'name': name, 'phone': details['phone'], 'email': details['email']}
+
+    def existing_name(self, name):
+        name = name.strip().title()
+        if name not in self.contacts:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"contact '{name}' not found")
+        return name
+
+    def check_details(self, name, details):
+        if not normalize_phone(details['phone']):
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid phone number '{details['phone']}'")
+        if not is_valid_email(details['email']):
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid email '{details['email']}'")
+        # The phone and email indexes refuse a number or email another contact already has
+        problem = self.contacts.conflict(name, details)
+        if problem:
+            raise HttpError(HTTPStatus.CONFLICT, problem)
+
+    def add_contact(self, data):
+        try:
+            name = str(data['name']).strip().title()
+            details = {'phone': str(data['phone']).strip(), 'email': str(data['email']).strip()}
+        except KeyError as error:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f'missing {error}') from None
+        if not is_valid_name(name):
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"'{name}' is not a valid name")
+        if name in self.contacts:
+            raise HttpError(HTTPStatus.CONFLICT, f"a contact named '{name}' already exists")
+        self.check_details(name, details)
+        self.contacts[name] = details
+        self.writer.record(name, details)
+        return {'ok': True, 'contact': self.contact_json(name)}
+
+    def update_contact(self, name, data):
+        name = self.existing_name(name)
+        if 'phone' not in data and 'email' not in data:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'give "phone" and/or "email"')
+        details = {'phone': str(data.get('phone', self.contacts[name]['phone'])).strip(),
+                   'email': str(data.get('email', self.contacts[name]['email'])).strip()}
+        self.check_details(name, details)
+        self.contacts.edit(name, phone=details['phone'], email=details['email'])
+        self.writer.record(name, self.contacts[name])
+        return {'ok': True, 'contact': self.contact_json(name)}
+
+    def delete_contact(self, name):
+        name = self.existing_name(name)
+        del self.contacts[name]
+        self.writer.record(name, None)
+        return {'ok': True, 'name': name}
+
+    def search_contacts(self, query):
+        term = query.get('q', '').strip()
+        if not term:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'give a search term: /search?q=...')
+        limit = query_int(query, 'limit', SEARCH_LIMIT)
+        if query.get('fuzzy') in ('1', 'true', 'yes'):
+            found = self.name_index.fuzzy_search(term, limit=limit)
+        else:
+            found = self.search_cache.search(term, limit=limit)
+        return {'ok': True, 'results': [self.contact_json(name) for name in found]}
+
+    async def list_contacts(self, query, writer, keep_alive):
+        """
+        Streams one page of contacts, in alphabetical order, as {"contacts": [...], "next":
+        offset of the next page or null}. With from and/or to, only the names in that range
+        are listed, and offset counts from the start of the range. The page is sent in
+        chunks, so other requests are answered in between.
+        """
+        offset = query_int(query, 'offset', 0)
+        limit = query_int(query, 'limit', PAGE_SIZE)
+        start, stop = self.sorted_names.between(query.get('from'), query.get('to'))
+        # Take the names first: the contacts may change while the page is being sent
+        names = self.sorted_names[min(start + offset, stop):min(start + offset + limit, stop)]
+        next_offset = offset + len(names) if start + offset + len(names) < stop else None
+
+        start_chunked(writer, HTTPStatus.OK, keep_alive)
+        await send_chunk(writer, b'{"ok": true, "contacts": [')
+        separator = ''
+        for start in range(0, len(names), STREAM_CHUNK):
+            # Skip any contact deleted since the page was started
+            rows = [json.dumps(self.contact_json(name)) for name in names[start:start + STREAM_CHUNK]
+                    if name in self.contacts]
+            if rows:
+                await send_chunk(writer, (separator + ', '.join(rows)).encode('utf-8'))
+                separator = ', '
+        await send_chunk(writer, f'], "next": {json.dumps(next_offset)}}}'.encode('utf-8'))
+        await send_chunk(writer, b'')  # The empty chunk that ends the response
+
+    # Upkeep
+
+    async def keep_in_step(self):
+        """
+        Every few seconds, picks up other programs' edits and compacts the journal when
+        it gets long. The lock and the files are only touched on other threads, so
+        requests keep being answered while another program holds the lock.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(REFRESH_SECONDS)
+            # Apply what the writer thread read last time; contacts with edits of ours still
+            # waiting keep our version, which is saved after theirs
+            self.storage.apply_changes(skip=self.writer.pending_names())
+            self.writer.fetch_changes()  # Saves our edits, then reads theirs, ready for next time
+            journal = getattr(self.storage, 'journal', None)
+            if journal is not None and journal.records >= COMPACT_EVERY:
+                # Works from the files alone, so the contacts can keep changing meanwhile
+                await loop.run_in_executor(None, self.storage.compact)
+
+    def close(self):
+        self.writer.close()
+        self.storage.close()
+
+
+# ---
+# Just enough HTTP/1.1
+# ---
+async def read_request(reader):
+    """Reads one request. Returns (method, target, headers, body), or None once the client has gone."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'bad request line') from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+
+    length = headers.get('content-length', '') or '0'
+    # Digits only: int() would also take '-5', '+5' and '1_000', and a negative length can't be read
+    if not (length.isascii() and length.isdigit()):
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'Content-Length should be a whole number of bytes')
+    length = int(length)
+    if length > MAX_BODY:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f'request bodies are limited to {MAX_BODY} bytes')
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+
+def read_json(body):
+    try:
+        data = json.loads(body or b'{}')
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'the body is not valid JSON') from None
+    if not isinstance(data, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'the body should be a JSON object')
+    return data
+
+
+def query_int(query, key, default):
+    try:
+        value = int(query.get(key, default))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f'{key} should be a whole number') from None
+    if value < 0:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f'{key} should not be negative')
+    return value
+
+
+def response_head(status, keep_alive, extra):
+    status = HTTPStatus(status)
+    return (f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            f'Content-Type: application/json\r\n{extra}'
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1')
+
+
+async def send_json(writer, status, result, keep_alive):
+    body = json.dumps(result).encode('utf-8')
+    writer.write(response_head(status, keep_alive, f'Content-Length: {len(body)}\r\n') + body)
+    await writer.drain()
+
+
+def start_chunked(writer, status, keep_alive):
+    writer.write(response_head(status, keep_alive, 'Transfer-Encoding: chunked\r\n'))
+
+
+async def send_chunk(writer, data):
+    """Sends one piece of a chunked response; an empty one ends it."""
+    writer.write(f'{len(data):x}\r\n'.encode('latin-1') + data + b'\r\n')
+    await writer.drain()
+
+
+# ---
+# Running it
+# ---
+async def serve(api, host, port):
+    server = await asyncio.start_server(api.handle_connection, host, port)
+    upkeep = asyncio.create_task(api.keep_in_step())
+
+    # Ctrl+C or a plain kill stops the server, and main() then saves everything
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, server.close)
+        except NotImplementedError:  # Windows: Ctrl+C still works as KeyboardInterrupt
+            pass
+
+    port = server.sockets[0].getsockname()[1]
+    print(f'Serving {len(api.contacts)} contacts on http://{host}:{port}', flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        upkeep.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the contacts over HTTP/JSON.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='0 picks a free port')
+    parser.add_argument('--file', default=os.environ.get('CONTACTS_FILE', 'contacts.json'),
+                        help='contacts file (.json, or .db for SQLite)')
+    arguments = parser.parse_args()
+
+    api = ContactAPI(arguments.file)
+    try:
+        asyncio.run(serve(api, arguments.host, arguments.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Write any edits still waiting and fold the journal into the snapshot
+        api.close()
+        print('Saved. Goodbye!')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# Group 16 - Contact Management System
+# Finding and merging duplicate contacts.
+#
+# Comparing every contact with every other one is N * N pairs: half a trillion for
+# a million contacts. Instead, each contact gets a few blocking keys that two copies
+# of the same person are likely to share, and only contacts sharing a key are compared:
+#   phone:+233241234567   the same number, in any format
+#   email:ama@email.com   the same email, ignoring case
+#   name:kwame mensah     the same words in the name, in any order or case
+# Names spelt a little differently ("Kwame Mensa", or "Ama" next to "Ama Serwaa")
+# share no key, so there is also a sorted neighbourhood: with every name's words
+# in alphabetical order, each name is compared with the few names just after it.
+# That is about NEIGHBOURS comparisons per contact instead of N. The blocks are
+# compared in worker processes, one per CPU core.
+
+import time
+
+from contact_phone import phone_key
+from contact_storage import map_in_processes
+
+# How much each kind of evidence counts towards two contacts being the same person
+WEIGHTS = {'same phone': 0.6, 'same email': 0.6, 'same name': 0.6, 'short name': 0.4, 'similar name': 0.4}
+MIN_SCORE = 0.4         # Pairs scoring less than this aren't reported
+AUTO_MERGE_SCORE = 1.0  # Automatic merging needs this much between every contact in a group
+NEIGHBOURS = 5          # How many names after it in sorted order each name is compared with
+MAX_BLOCK = 100         # A key shared by more contacts than this is compared as a neighbourhood instead
+TASK_SIZE = 20000       # Contacts handed to a worker at a time
+SIMILAR_NAME_LENGTH = 6  # Names shorter than this must match exactly
+FIELDS = ('phone', 'email')  # What a merge carries over from the contacts it deletes
+
+
+# ---
+# Comparing two contacts
+# ---
+def features(name, details):
+    """
+    What a contact is compared by: (phone key, lowercase email, lowercase name words,
+    and those words in alphabetical order as one string, so "Mensah Kwame" is "kwame mensah").
+    """
+    words = tuple(name.lower().split())
+    return phone_key(details['phone']), details['email'].strip().lower(), words, ' '.join(sorted(words))
+
+
+def name_match(first, second):
+    """How the names of two contacts (their features) relate: 'same name', 'short name', 'similar name', or None."""
+    name, other_name = first[3], second[3]
+    if name == other_name:
+        return 'same name'  # "Kwame Mensah" and "mensah kwame"
+    shorter, longer = sorted((first[2], second[2]), key=len)
+    if longer[:len(shorter)] == shorter:
+        return 'short name'  # "Ama" and "Ama Serwaa"
+    # One typo is allowed, and only in longer names: "Kofi Osei" and "Kofi Ose" are
+    # likely the same person, but "Ama" and "Aba" are two different names
+    if min(len(name), len(other_name)) >= SIMILAR_NAME_LENGTH and one_typo_apart(name, other_name):
+        return 'similar name'  # "Kwame Mensah" and "Kwame Mensa"
+    return None
+
+
+def one_typo_apart(a, b):
+    """
+    True if a letter added, removed or changed turns a into b. The same as
+    edit_distance(a, b) == 1, but a single pass, which matters a few million times over.
+    """
+    if abs(len(a) - len(b)) > 1 or a == b:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    for i, letter in enumerate(a):
+        if letter != b[i]:
+            # Skip the typo: a changed letter in both, or the extra letter in the longer one
+            return a[i + 1:] == b[i + 1:] if len(a) == len(b) else a[i:] == b[i + 1:]
+    return True
+
+
+def score_pair(first, second):
+    """How likely two contacts (their features) are one person: (score, [reasons])."""
+    reasons = []
+    if first[0] == second[0]:
+        reasons.append('same phone')
+    if first[1] == second[1]:
+        reasons.append('same email')
+    match = name_match(first, second)
+    if match:
+        reasons.append(match)
+    return round(sum(WEIGHTS[reason] for reason in reasons), 2), reasons
+
+
+# ---
+# Blocks
+# ---
+def blocking_keys(contact_features):
+    phone, email, _, name = contact_features
+    return ('phone:' + phone, 'email:' + email, 'name:' + name)
+
+
+def make_tasks(contact_features):
+    """
+    Splits the work into tasks for the workers: ('block', [names...]) to compare every
+    pair in a few small blocks, and ('window', names) to compare each name with the
+    NEIGHBOURS names after it.
+    """
+    first = {}   # key -> the first name that has it
+    shared = {}  # key -> every name that has it, once a second one turns up
+    def neighbourhood_key(name):
+        # Sorting by the name's words in alphabetical order puts "Ama" beside "Ama Serwaa"
+        # and "Kwame Mensa" beside "Mensah Kwame"
+        return contact_features[name][3]
+
+    for name, values in contact_features.items():
+        for key in blocking_keys(values):
+            other = first.setdefault(key, name)
+            if other != name:
+                shared.setdefault(key, [other]).append(name)
+
+    tasks = []
+    blocks, size = [], 0
+    for names in shared.values():
+        if len(names) > MAX_BLOCK:
+            # A placeholder number or email shared by hundreds says little on its own
+            tasks.append(('window', sorted(names, key=neighbourhood_key)))
+            continue
+        blocks.append(names)
+        size += len(names)
+        if size >= TASK_SIZE:
+            tasks.append(('block', blocks))
+            blocks, size = [], 0
+    if blocks:
+        tasks.append(('block', blocks))
+
+    ordered = sorted(contact_features, key=neighbourhood_key)
+    for start in range(0, len(ordered), TASK_SIZE):
+        # Each window overlaps the next by NEIGHBOURS names, so no neighbour is missed
+        tasks.append(('window', ordered[start:start + TASK_SIZE + NEIGHBOURS]))
+    return tasks
+
+
+def with_features(tasks, contact_features, min_score):
+    """
+    Adds to each task the features of just the contacts in it, and min_score: the
+    workers may have been started before the contacts were loaded, so each task
+    has to bring everything it needs with it.
+    """
+    for kind, data in tasks:
+        names = data if kind == 'window' else [name for names in data for name in names]
+        yield kind, data, {name: contact_features[name] for name in names}, min_score
+
+
+def compare_task(task):
+    """Compares the pairs in one task. Returns [(name, other name, score, reasons)] worth reporting."""
+    kind, data, contact_features, min_score = task
+    found = []
+
+    def compare(name, other):
+        score, reasons = score_pair(contact_features[name], contact_features[other])
+        if score >= min_score:
+            found.append((name, other, score, reasons))
+
+    if kind == 'block':
+        for names in data:
+            for i, name in enumerate(names):
+                for other in names[i + 1:]:
+                    compare(name, other)
+    else:
+        for i, name in enumerate(data):
+            for other in data[i + 1:i + 1 + NEIGHBOURS]:
+                compare(name, other)
+    return found
+
+
+# ---
+# Groups of duplicates
+# ---
+class DuplicateGroup:
+    """Contacts that look like one person, and the pairs that connect them."""
+
+    def __init__(self, names, pairs):
+        self.names = names
+        self.pairs = pairs  # [(name, other name, score, reasons)]
+
+    @property
+    def score(self):
+        return max(score for _, _, score, _ in self.pairs)
+
+    @property
+    def reasons(self):
+        return sorted({reason for _, _, _, reasons in self.pairs for reason in reasons})
+
+    @property
+    def certain(self):
+        """True if every contact is linked to the rest by pairs scoring AUTO_MERGE_SCORE or more."""
+        strong = [(name, other) for name, other, score, _ in self.pairs if score >= AUTO_MERGE_SCORE]
+        return len(connected_groups(self.names, strong)) == 1
+
+    def keeper(self, contacts):
+        """
+        The contact an automatic merge keeps: the one with the most details filled in,
+        and of those the one with the longest (most complete) name.
+        """
+        def detail(name):
+            filled = sum(1 for field in FIELDS if contacts[name][field].strip())
+            return filled, len(name)
+        return max(self.names, key=detail)
+
+
+def connected_groups(names, pairs):
+    """Groups names that are linked by pairs, directly or through others (union-find)."""
+    parent = {name: name for name in names}
+
+    def root(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for name, other in pairs:
+        parent[root(name)] = root(other)
+    groups = {}
+    for name in names:
+        groups.setdefault(root(name), []).append(name)
+    return list(groups.values())
+
+
+def find_duplicates(contacts, workers=None, min_score=MIN_SCORE):
+    """
+    Finds groups of contacts that are probably the same person, best matches first.
+    Returns (groups, stats), where stats says how much work it took.
+    """
+    start = time.perf_counter()
+    contact_features = {name: features(name, details) for name, details in contacts.items()}
+    tasks = make_tasks(contact_features)
+    results = map_in_processes(compare_task, with_features(tasks, contact_features, min_score), workers)
+    pairs = {}
+    for found in results:
+        for name, other, score, reasons in found:
+            pairs[min(name, other), max(name, other)] = (name, other, score, reasons)
+
+    linked = sorted({name for pair in pairs for name in pair})
+    by_name = {}
+    for group_names in connected_groups(linked, pairs):
+        group = DuplicateGroup(group_names, [])
+        for name in group_names:
+            by_name[name] = group
+    for pair in pairs.values():
+        by_name[pair[0]].pairs.append(pair)
+    groups = sorted({id(group): group for group in by_name.values()}.values(),
+                    key=lambda group: (-group.score, group.names[0]))
+    stats = {'contacts': len(contacts), 'tasks': len(tasks), 'pairs': len(pairs), 'groups': len(groups),
+             'seconds': round(time.perf_counter() - start, 3)}
+    return groups, stats
+
+
+def same_value(field, value, other):
+    """True if two phones are the same number (in any format), or two emails the same ignoring case."""
+    if field == 'phone':
+        return phone_key(value) == phone_key(other)
+    return value.strip().lower() == other.strip().lower()
+
+
+def field_values(contacts, names, field):
+    """The different values these contacts have for field, in the order of names, leaving out empty ones."""
+    values = []
+    for name in names:
+        value = contacts[name][field]
+        if value.strip() and not any(same_value(field, value, seen) for seen in values):
+            values.append(value)
+    return values
+
+
+def merge_group(batch, group, keep, chosen=None):
+    """
+    Merges the group into keep (in a transaction, so it can all be saved at once).
+    Any of keep's fields that are empty are filled from the others, chosen
+    ({field: value}) replaces keep's own, and the other contacts are deleted.
+    Returns the details that didn't fit: [{'name', 'field', 'value'}] for each
+    value of the others that keep doesn't end up with.
+    """
+    others = [name for name in group.names if name != keep]
+    old = {field: batch[keep][field] for field in FIELDS}
+    kept = dict(old)
+    for field in FIELDS:
+        if chosen and field in chosen:
+            kept[field] = chosen[field]
+        elif not kept[field].strip():
+            values = field_values(batch, others, field)
+            if values:
+                kept[field] = values[0]
+
+    dropped = []
+    for name in others:
+        for field in FIELDS:
+            value = batch[name][field]
+            if value.strip() and not same_value(field, value, kept[field]):
+                dropped.append({'name': name, 'field': field, 'value': value})
+        del batch[name]
+    # Set after the deletes, so keep can take a number or email that was one of theirs
+    if kept != old:
+        batch[keep] = kept
+    return dropped
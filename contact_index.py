@@ -0,0 +1,652 @@
+# Group 16 - Contact Management System
+# In-memory indexes shared by the contact manager scripts and the GUI.
+# They are updated one contact at a time on add, update and delete, so a search
+# never has to loop over every contact.
+
+import bisect
+import heapq
+import queue
+import threading
+from collections import Counter, OrderedDict
+
+
+# ---
+# Name index
+# Every lowercase name is cut into overlapping 3-letter pieces (trigrams):
+#   "kofi osei" -> "kof", "ofi", "fi ", "i o", " os", "ose", "sei"
+# Any name containing the search term must contain all of the term's trigrams,
+# so we only need to check the names that share the rarest of them.
+# ---
+GRAM_SIZE = 3
+
+
+def trigrams(text):
+    """Returns the set of 3-letter pieces in a lowercase string."""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class NameIndex:
+    """A trigram index for fast, case-insensitive substring search on contact names."""
+
+    def __init__(self, names=()):
+        self._grams = {}        # trigram -> set of names containing it
+        self._short = set()     # names too short to have a trigram
+        self._words = {}        # lowercase word ("kwame") -> set of names with that word, for fuzzy search
+        self._word_grams = {}   # trigram of " kwame " -> set of words containing it
+        for name in names:
+            self.add(name)
+
+    def add(self, name, details=None):
+        """Adds a name to the index."""
+        key = name.lower()
+        for word in key.split():
+            if word not in self._words:
+                self._words[word] = set()
+                for gram in trigrams(f' {word} '):
+                    self._word_grams.setdefault(gram, set()).add(word)
+            self._words[word].add(name)
+        if len(key) < GRAM_SIZE:
+            self._short.add(name)
+            return
+        for gram in trigrams(key):
+            self._grams.setdefault(gram, set()).add(name)
+
+    def update(self, name, old, new):
+        """An update keeps the contact's name, so the index has nothing to change."""
+
+    def remove(self, name, details=None):
+        """Removes a name from the index."""
+        key = name.lower()
+        for word in key.split():
+            names = self._words.get(word)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._words[word]
+                    for gram in trigrams(f' {word} '):
+                        self._word_grams[gram].discard(word)
+                        if not self._word_grams[gram]:
+                            del self._word_grams[gram]
+        if len(key) < GRAM_SIZE:
+            self._short.discard(name)
+            return
+        for gram in trigrams(key):
+            names = self._grams.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._grams[gram]
+
+    def search(self, term, limit=None):
+        """
+        Returns the sorted names that contain term, ignoring case.
+        With a limit, stops once that many matches are found (so they are some of the
+        matches, not necessarily the first ones alphabetically). Safe to call from a
+        worker thread while the main thread adds and deletes contacts.
+        """
+        term = term.strip().lower()
+        if not term:
+            return []
+
+        if len(term) >= GRAM_SIZE:
+            # Start from the rarest trigram and narrow down with the others
+            postings = []
+            for gram in trigrams(term):
+                names = self._grams.get(gram)
+                if not names:
+                    return []
+                postings.append(names)
+            postings.sort(key=len)
+            groups = [postings[0].intersection(*postings[1:])]
+        else:
+            # One or two letters: every trigram that contains the term points at matches
+            groups = [self._short] + [names for gram, names in list(self._grams.items()) if term in gram]
+
+        # The trigrams only narrow things down, so confirm each candidate.
+        # Each group is copied first in case the main thread changes it while we look.
+        found = set()
+        for group in groups:
+            for name in tuple(group):
+                if name not in found and term in name.lower():
+                    found.add(name)
+                    if len(found) == limit:
+                        return sorted(found)
+        return sorted(found)
+
+    def fuzzy_search(self, term, limit=10):
+        """
+        Returns up to limit names that roughly match term, best matches first, so
+        "kwami mensa" finds "Kwame Mensah". Each word of the term is matched against
+        the words of the names, in any order, allowing a typo or two per word; a word
+        that starts a longer name word ("kwa" in "Kwabena") counts as a good match too.
+        Edit distances are only worked out for the few distinct words that share
+        trigrams with the term's words, never for every name.
+        """
+        terms = term.strip().lower().split()
+        if not terms:
+            return []
+
+        # For every word of the term: the similar words in the index and how far off they are
+        matches = [self._similar_words(word) for word in terms]
+        if not all(matches):
+            return []
+
+        # Candidates come from the term word with the fewest matching names, and must
+        # also have a name word close to each of the other term words.
+        sizes = [sum(len(self._words.get(word, ())) for word in similar) for similar in matches]
+        first = sizes.index(min(sizes))
+        others = matches[:first] + matches[first + 1:]
+        other_names = [set().union(*[self._words.get(word, ()) for word in similar]) for similar in others]
+
+        # Go through the first word's matches from closest to furthest. No name reached
+        # through a word can score better than that word's distance, so once limit names
+        # score at least that well, the rest can't beat them. (Like search with a limit,
+        # names that tie with the last one kept may be left out.)
+        best = []  # heap of (-score, name): the worst of the names kept so far is on top
+        seen = set()
+        for distance, word in sorted((distance, word) for word, distance in matches[first].items()):
+            if len(best) == limit and -best[0][0] <= distance:
+                break
+            candidates = set(self._words.get(word, ()))
+            for names in other_names:
+                candidates &= names
+            for name in candidates - seen:
+                if len(best) == limit and -best[0][0] <= distance:
+                    break
+                seen.add(name)
+                score = self._name_distance(name, matches[first], others)
+                if len(best) < limit:
+                    heapq.heappush(best, (-score, name))
+                elif score < -best[0][0]:
+                    heapq.heapreplace(best, (-score, name))
+        return [name for _, name in sorted((-score, name) for score, name in best)]
+
+    def _similar_words(self, word):
+        """Returns {indexed word: distance} for the indexed words close to word."""
+        allowed = max_typos(word)
+        counts = Counter()
+        for gram in trigrams(f' {word} '):
+            counts.update(self._word_grams.get(gram, ()))
+        similar = {}
+        if len(word) >= 2:
+            # Every word that starts with this one shares its first trigram (" " and two letters),
+            # so all of them are kept, however many words share trigrams with this one
+            for candidate in self._word_grams.get(' ' + word[:2], ()):
+                if candidate.startswith(word):
+                    similar[candidate] = PREFIX_DISTANCE if candidate != word else 0
+        for candidate, shared in counts.most_common(FUZZY_CANDIDATES):
+            if candidate in similar:
+                continue
+            distance = edit_distance(word, candidate, allowed)
+            if distance <= allowed:
+                similar[candidate] = distance
+        return similar
+
+    @staticmethod
+    def _name_distance(name, first, others):
+        """How far a name is from the term: the sum of how close each term word comes to a name word."""
+        words = name.lower().split()
+        total = min(first[word] for word in words if word in first)
+        for similar in others:
+            total += min(similar[word] for word in words if word in similar)
+        return total
+
+
+# ---
+# Fuzzy matching helpers
+# ---
+FUZZY_CANDIDATES = 200  # How many words sharing trigrams with a term word are compared to it
+PREFIX_DISTANCE = 0.5   # "kwa" matching the start of "kwame" ranks just below an exact word
+
+
+def max_typos(word):
+    """Short words must match almost exactly; longer ones may have up to two typos."""
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return 1
+    return 2
+
+
+def edit_distance(a, b, limit=None):
+    """
+    The Levenshtein distance between two strings: how many letters must be added,
+    removed or changed to turn one into the other. With a limit, stops early and
+    returns limit + 1 once the distance is known to be larger.
+    """
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, letter_a in enumerate(a, 1):
+        current = [i]
+        for j, letter_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (letter_a != letter_b)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+# ---
+# Phone and email indexes
+# A dictionary from each phone number (or email) to the contact that has it, for
+# reverse lookups and for refusing a number or email that is already taken.
+# Older address books may already share a number between two contacts; those
+# extra owners are kept on the side so nothing is lost.
+# ---
+class FieldIndex:
+    """A hash index from one contact field ('phone' or 'email') back to contact names."""
+
+    def __init__(self, field, normalize=None):
+        self.field = field
+        self.normalize = normalize or (lambda value: value)
+        self._owner = {}   # key -> name
+        self._others = {}  # key -> [more names], only for duplicates already in the data
+
+    def add(self, name, details):
+        key = self.normalize(details[self.field])
+        if key in self._owner:
+            self._others.setdefault(key, []).append(name)
+        else:
+            self._owner[key] = name
+
+    def update(self, name, old, new):
+        if self.normalize(old[self.field]) != self.normalize(new[self.field]):
+            self.remove(name, old)
+            self.add(name, new)
+
+    def remove(self, name, details):
+        key = self.normalize(details[self.field])
+        others = self._others.get(key)
+        if self._owner.get(key) == name:
+            if others:
+                self._owner[key] = others.pop(0)
+            else:
+                del self._owner[key]
+        elif others and name in others:
+            others.remove(name)
+        if others == []:
+            del self._others[key]
+
+    def lookup(self, value):
+        """Returns the names of every contact with this value."""
+        key = self.normalize(value)
+        if key not in self._owner:
+            return []
+        return [self._owner[key]] + self._others.get(key, [])
+
+    def owner(self, value, exclude=None):
+        """Returns a contact (other than exclude) that already has this value, or None."""
+        for name in self.lookup(value):
+            if name != exclude:
+                return name
+        return None
+
+    def conflict(self, name, details):
+        """Explains why name can't have these details, or returns None if it can."""
+        owner = self.owner(details[self.field], exclude=name)
+        if owner is not None:
+            return f"{self.field} {details[self.field]} already belongs to '{owner}'"
+        return None
+
+
+# ---
+# Sorted names
+# Every name in alphabetical order (ignoring case), kept in order as contacts are
+# added and deleted, so a view never has to sort the whole address book again.
+# The names are held in chunks of CHUNK_SIZE to 2 * CHUNK_SIZE names:
+#   [["Abena Asante", ..., "Ama Owusu"], ["Ama Serwaa", ..., "Efua Mensah"], ...]
+# An insert or delete only shifts the names inside one chunk. To find the 5,000th
+# name, a small tree over the chunk lengths (a Fenwick tree) adds up whole chunks
+# in a few steps, so any page costs O(log N + page size) to fetch.
+# ---
+CHUNK_SIZE = 1000
+LAST_CHARACTER = chr(0x10FFFF)  # Sorts after every letter, so "k" + LAST_CHARACTER comes after every "k..." name
+
+
+def sort_key(name):
+    """Alphabetical ignoring case; names that differ only in case keep a fixed order."""
+    return (name.casefold(), name)
+
+
+def _position_in_chunk(chunk, key):
+    """How many names in a sorted chunk come before key (like bisect_left, with sort_key)."""
+    low, high = 0, len(chunk)
+    while low < high:
+        middle = (low + high) // 2
+        if sort_key(chunk[middle]) < key:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class SortedNameIndex:
+    """
+    Contact names in alphabetical order, for paging and for prefix and range queries.
+    It can be indexed and sliced like a list: names[40:60] is the third page of 20.
+    """
+
+    def __init__(self, names=()):
+        self._chunks = []
+        self._rebuild()
+        self.add_all((name, None) for name in names)
+
+    def _rebuild(self):
+        """Works out each chunk's last name and the tree of chunk lengths again, after chunks are split or dropped."""
+        self._maxes = [sort_key(chunk[-1]) for chunk in self._chunks]
+        self._length = sum(len(chunk) for chunk in self._chunks)
+        # self._tree[i] holds the total length of the chunks from i - (i & -i) up to i - 1
+        self._tree = [0] * (len(self._chunks) + 1)
+        for i, chunk in enumerate(self._chunks, 1):
+            self._tree[i] += len(chunk)
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[i]
+
+    def _resize(self, chunk_number, change):
+        """Records that a chunk grew (or shrank) by change names."""
+        i = chunk_number + 1
+        while i < len(self._tree):
+            self._tree[i] += change
+            i += i & -i
+
+    def _names_before(self, chunk_number):
+        """How many names are in the chunks before this one."""
+        total = 0
+        i = chunk_number
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position):
+        """Returns (chunk number, position inside that chunk) of the name at position."""
+        chunk_number = 0
+        step = 1 << (len(self._tree).bit_length() - 1)
+        while step:
+            ahead = chunk_number + step
+            if ahead < len(self._tree) and self._tree[ahead] <= position:
+                chunk_number = ahead
+                position -= self._tree[ahead]
+            step //= 2
+        return chunk_number, position
+
+    def _find(self, name):
+        """Returns (chunk number, position inside it) where name is, or would go."""
+        key = sort_key(name)
+        chunk_number = min(bisect.bisect_left(self._maxes, key), len(self._chunks) - 1)
+        return chunk_number, _position_in_chunk(self._chunks[chunk_number], key)
+
+    # The index protocol
+
+    def add(self, name, details=None):
+        """Puts a name in its place in the order."""
+        if not self._chunks:
+            self._chunks.append([name])
+            self._rebuild()
+            return
+        chunk_number, position = self._find(name)
+        chunk = self._chunks[chunk_number]
+        if position < len(chunk) and chunk[position] == name:
+            return
+        chunk.insert(position, name)
+        self._length += 1
+        if len(chunk) > 2 * CHUNK_SIZE:
+            self._chunks[chunk_number:chunk_number + 1] = [chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:]]
+            self._rebuild()
+            return
+        if position == len(chunk) - 1:
+            self._maxes[chunk_number] = sort_key(name)
+        self._resize(chunk_number, 1)
+
+    def add_all(self, items):
+        """Adds many (name, details) at once: one sort instead of a search per name."""
+        names = sorted(list(self) + [name for name, details in items], key=sort_key)
+        self._chunks = [names[start:start + CHUNK_SIZE] for start in range(0, len(names), CHUNK_SIZE)]
+        self._rebuild()
+
+    def update(self, name, old, new):
+        """An update keeps the contact's name, so the order doesn't change."""
+
+    def remove(self, name, details=None):
+        """Takes a name out of the order. Names that aren't there are ignored."""
+        if not self._chunks:
+            return
+        chunk_number, position = self._find(name)
+        chunk = self._chunks[chunk_number]
+        if position == len(chunk) or chunk[position] != name:
+            return
+        del chunk[position]
+        self._length -= 1
+        if not chunk:
+            del self._chunks[chunk_number]
+            self._rebuild()
+            return
+        if position == len(chunk):
+            self._maxes[chunk_number] = sort_key(chunk[-1])
+        self._resize(chunk_number, -1)
+
+    # Reading it like a list
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield from chunk
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self._length)
+            if step != 1:
+                return list(self)[item]
+            return self._slice(start, stop)
+        if item < 0:
+            item += self._length
+        if not 0 <= item < self._length:
+            raise IndexError('name position out of range')
+        chunk_number, position = self._locate(item)
+        return self._chunks[chunk_number][position]
+
+    def _slice(self, start, stop):
+        names = []
+        if start >= stop:
+            return names
+        chunk_number, position = self._locate(start)
+        while len(names) < stop - start and chunk_number < len(self._chunks):
+            names.extend(self._chunks[chunk_number][position:position + stop - start - len(names)])
+            chunk_number += 1
+            position = 0
+        return names
+
+    def position(self, name):
+        """Where name is in the order, or where it would go (or was, just after a delete)."""
+        if not self._chunks:
+            return 0
+        chunk_number, position = self._find(name)
+        return self._names_before(chunk_number) + position
+
+    def index(self, name):
+        """Like list.index: the position of name, or ValueError if it isn't there."""
+        position = self.position(name)
+        if position == self._length or self[position] != name:
+            raise ValueError(f'{name!r} is not in the index')
+        return position
+
+    # Ranges
+
+    def rank(self, text):
+        """How many names come before text in the order (ignoring case)."""
+        key = (text.casefold(),)
+        chunk_number = bisect.bisect_left(self._maxes, key)
+        if chunk_number == len(self._chunks):
+            return self._length
+        return self._names_before(chunk_number) + _position_in_chunk(self._chunks[chunk_number], key)
+
+    def between(self, first=None, last=None):
+        """
+        Returns the (start, stop) positions of the names from first through last,
+        where last also covers every name that starts with it: between('k', 'm')
+        is everyone from "K" to the end of "M". Either end may be left out.
+        """
+        start = self.rank(first) if first else 0
+        stop = self.rank(last + LAST_CHARACTER) if last else self._length
+        return start, max(start, stop)
+
+    def prefix(self, text, limit=None):
+        """The names that start with text (ignoring case), in order."""
+        start, stop = self.between(text, text)
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return self._slice(start, stop)
+
+
+# ---
+# Search cache
+# People repeat the same searches, and type a name one letter at a time, so the
+# answers to the last CACHE_SIZE searches are kept, least recently used dropped first.
+# The cache is an index too: when a contact is added or deleted, the name is put
+# into (or taken out of) each cached answer it matches, so nothing is thrown away.
+# An update keeps the name, so it can't change any answer. A new search that
+# extends a cached one ("kwa" -> "kwam") only has to check the cached names.
+# ---
+CACHE_SIZE = 256
+
+
+class SearchCache:
+    """Remembers NameIndex.search answers, kept correct as contacts are added and deleted."""
+
+    def __init__(self, name_index, size=CACHE_SIZE):
+        self.name_index = name_index
+        self.size = size
+        self.hits = 0      # Answered straight from the cache
+        self.refined = 0   # Answered by filtering the cached answer for a shorter term
+        self.misses = 0    # Searched in the name index
+        # Lowercase term -> (sorted names, complete). An answer cut short by a limit
+        # isn't complete: it is some of the matches, so it can't be refined.
+        self._answers = OrderedDict()
+        self._generation = 0  # Goes up on every add and delete
+        self._lock = threading.Lock()  # The GUI searches on a worker thread while contacts change
+
+    # Kept up to date by the store, like the other indexes
+
+    def add(self, name, details=None):
+        key = name.lower()
+        with self._lock:
+            self._generation += 1
+            for term, (names, complete) in self._answers.items():
+                if complete and term in key:
+                    names.insert(bisect.bisect_left(names, name), name)
+
+    def add_all(self, items):
+        """A whole new set of contacts: nothing cached can be relied on."""
+        with self._lock:
+            self._generation += 1
+            self._answers.clear()
+
+    def update(self, name, old, new):
+        """An update keeps the contact's name, so every cached answer still holds."""
+
+    def remove(self, name, details=None):
+        key = name.lower()
+        with self._lock:
+            self._generation += 1
+            for term, (names, complete) in self._answers.items():
+                if term in key:
+                    position = bisect.bisect_left(names, name)
+                    if position < len(names) and names[position] == name:
+                        del names[position]
+
+    # Searching
+
+    def search(self, term, limit=None):
+        """The same answer as NameIndex.search, from the cache when it can be."""
+        term = term.strip().lower()
+        if not term:
+            return []
+        with self._lock:
+            answer = self._answers.get(term)
+            if answer is not None and (answer[1] or (limit is not None and len(answer[0]) >= limit)):
+                self.hits += 1
+                self._answers.move_to_end(term)
+                return answer[0][:limit]
+            shorter = self._cached_prefix(term)
+            generation = self._generation
+
+        if shorter is not None:
+            self.refined += 1
+            found = [name for name in shorter if term in name.lower()]
+        else:
+            self.misses += 1
+            found = self.name_index.search(term, limit)
+        # Without a limit, or with fewer matches than the limit, that's all of them
+        complete = limit is None or len(found) < limit or shorter is not None
+
+        with self._lock:
+            # A contact added or deleted during the search may be missing from found,
+            # so it is only kept if nothing changed in the meantime
+            if generation == self._generation:
+                self._answers[term] = (found, complete)
+                self._answers.move_to_end(term)
+                if len(self._answers) > self.size:
+                    self._answers.popitem(last=False)
+        return found[:limit]
+
+    def _cached_prefix(self, term):
+        """The complete cached answer for the longest shorter start of term, if any (lock held)."""
+        for length in range(len(term) - 1, 0, -1):
+            answer = self._answers.get(term[:length])
+            if answer is not None and answer[1]:
+                return list(answer[0])  # A copy, as contacts may be added while it is filtered
+        return None
+
+    def info(self):
+        """How well the cache is doing, for the stats report."""
+        searches = self.hits + self.refined + self.misses
+        return {'hits': self.hits, 'refined': self.refined, 'misses': self.misses, 'cached': len(self._answers),
+                'hit_rate': round((self.hits + self.refined) / searches, 3) if searches else None}
+
+
+# ---
+# Background search
+# Used by the GUI's search-as-you-type. Searches run on a worker thread; when a
+# newer query comes in, any older query that hasn't started is dropped, and the
+# answer to one that has started is thrown away instead of being shown.
+# ---
+class SearchWorker:
+    """Runs a search function on a background thread, always for the newest query."""
+
+    def __init__(self, search):
+        self.search = search
+        self.results = queue.Queue()  # (query_id, term, found, started) for the caller to pick up
+        self._query_id = 0
+        self._latest = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, name='contact-search', daemon=True).start()
+
+    def submit(self, term, started=None):
+        """Queues a query, replacing any that hasn't started yet. Returns its id."""
+        with self._lock:
+            self._query_id += 1
+            self._latest = (self._query_id, term, started)
+        self._wake.set()
+        return self._query_id
+
+    def is_current(self, query_id):
+        """True if no newer query has been submitted since this one."""
+        return query_id == self._query_id
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                job, self._latest = self._latest, None
+                self._wake.clear()
+            if job is None:
+                continue
+            query_id, term, started = job
+            found = self.search(term)
+            if self.is_current(query_id):
+                self.results.put((query_id, term, found, started))
@@ -0,0 +1,224 @@
+# Group 16 - Contact Management System
+# Bulk import and export of contacts in CSV, JSONL and vCard files.
+#
+# Rows are streamed from the file, checked in batches, and only added to the
+# contacts once the whole file has been read, so the caller can save once at
+# the end instead of once per contact. Rows that fail a check are written to a
+# small CSV report with the reason.
+
+import csv
+import json
+import os
+import re
+
+from contact_phone import phone_key
+
+BATCH_SIZE = 10000
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.vcf': 'vcard', '.vcard': 'vcard'}
+
+
+def guess_format(path):
+    """Works out the file format from its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown file type '{extension}'. Use .csv, .jsonl or .vcf.")
+    return FORMATS[extension]
+
+
+# ---
+# Readers
+# Each reader yields (line_number, name, phone, email) for every row in the file.
+# ---
+def read_csv(path):
+    """Reads a CSV file with a header row naming the name, phone and email columns."""
+    with open(path, 'r', newline='', encoding='utf-8-sig') as file:
+        reader = csv.reader(file)
+        header = [column.strip().lower() for column in next(reader, [])]
+        if 'phone' not in header and 'number' in header:
+            header[header.index('number')] = 'phone'
+        missing = {'name', 'phone', 'email'} - set(header)
+        if missing:
+            raise ValueError(f"CSV file is missing the column(s): {', '.join(sorted(missing))}")
+        name_column, phone_column, email_column = header.index('name'), header.index('phone'), header.index('email')
+        width = max(name_column, phone_column, email_column) + 1
+        for row in reader:
+            if not row:
+                continue
+            row += [''] * (width - len(row))
+            yield reader.line_num, row[name_column], row[phone_column], row[email_column]
+
+
+def read_jsonl(path):
+    """Reads one JSON object per line: {"name": ..., "phone": ..., "email": ...}."""
+    with open(path, 'r', encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_number, None, '', ''  # Reported as unreadable below
+                continue
+            if not isinstance(record, dict):
+                record = {}
+            yield (line_number, str(record.get('name', '')), str(record.get('phone', record.get('number', ''))),
+                   str(record.get('email', '')))
+
+
+def read_vcard(path):
+    """Reads the FN (or N), first TEL and first EMAIL of every card in a vCard file."""
+    name = phone = email = ''
+    start = 0
+    for line_number, line in _unfolded_lines(path):
+        key, _, value = line.partition(':')
+        key = key.split(';')[0].upper()
+        if key == 'BEGIN':
+            name = phone = email = ''
+            start = line_number
+        elif key == 'FN':
+            name = _unescape(value)
+        elif key == 'N' and not name:
+            # N is "Last;First;Middle;Prefix;Suffix"
+            parts = [_unescape(part) for part in value.split(';')]
+            name = ' '.join(part for part in parts[1:2] + parts[:1] if part)
+        elif key == 'TEL' and not phone:
+            phone = value.strip()
+        elif key == 'EMAIL' and not email:
+            email = value.strip()
+        elif key == 'END':
+            yield start, name, phone, email
+
+
+def _unfolded_lines(path):
+    """vCard lines longer than 75 characters continue on lines starting with a space."""
+    previous, previous_number = None, 0
+    with open(path, 'r', encoding='utf-8-sig') as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.rstrip('\r\n')
+            if line[:1] in (' ', '\t') and previous is not None:
+                previous += line[1:]
+                continue
+            if previous:
+                yield previous_number, previous
+            previous, previous_number = line, line_number
+    if previous:
+        yield previous_number, previous
+
+
+# A backslash and the character after it: \\ \, \; \n (or \N)
+VCARD_ESCAPE = re.compile(r'\\(.)')
+
+
+def _unescape(value):
+    # One pass from left to right, so in "\\," the first backslash escapes the second, not the comma
+    def unescaped(match):
+        character = match.group(1)
+        return ' ' if character in 'nN' else character
+    return VCARD_ESCAPE.sub(unescaped, value).strip()
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace(',', '\\,').replace(';', '\\;')
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl, 'vcard': read_vcard}
+
+
+# ---
+# Import
+# ---
+def is_valid_name(name):
+    """Names are letters, optionally split by spaces, hyphens or apostrophes."""
+    return name.replace(' ', '').replace('-', '').replace("'", '').isalpha()
+
+
+def import_contacts(path, contacts, is_valid_phone, is_valid_email, file_format=None, report_path=None):
+    """
+    Imports every valid, new contact from a file into contacts.
+    Nothing is added until the whole file has been checked, and the caller is
+    expected to save once afterwards. Returns (added, rejected).
+    """
+    file_format = file_format or guess_format(path)
+    report_path = report_path or os.path.splitext(path)[0] + '.rejected.csv'
+    rows = READERS[file_format](path)
+    staged = {}
+    seen = (set(), set())  # Phones and emails used earlier in this file
+    rejected = 0
+
+    with open(report_path, 'w', newline='', encoding='utf-8') as report_file:
+        report = csv.writer(report_file)
+        report.writerow(['line', 'name', 'phone', 'email', 'reason'])
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                rejected += _check_batch(batch, contacts, staged, seen, is_valid_phone, is_valid_email, report)
+                batch = []
+        rejected += _check_batch(batch, contacts, staged, seen, is_valid_phone, is_valid_email, report)
+
+    # Everything checked out (or was reported), so add the new contacts in one go
+    for name, details in staged.items():
+        contacts[name] = details
+    return len(staged), rejected
+
+
+def _check_batch(batch, contacts, staged, seen, is_valid_phone, is_valid_email, report):
+    """Moves the good rows of a batch into staged and reports the rest. Returns how many were rejected."""
+    seen_phones, seen_emails = seen
+    rejected = 0
+    for line_number, name, phone, email in batch:
+        if name is None:
+            report.writerow([line_number, '', '', '', 'unreadable row'])
+            rejected += 1
+            continue
+        name, phone, email = name.strip().title(), phone.strip(), email.strip()
+        details = {'phone': phone, 'email': email}
+        if not is_valid_name(name):
+            reason = 'invalid name'
+        elif not is_valid_phone(phone):
+            reason = 'invalid phone number'
+        elif not is_valid_email(email):
+            reason = 'invalid email'
+        elif name in contacts or name in staged:
+            reason = 'duplicate name'
+        elif phone_key(phone) in seen_phones:
+            reason = 'phone number used earlier in the file'
+        elif email.lower() in seen_emails:
+            reason = 'email used earlier in the file'
+        else:
+            # The store's phone and email indexes refuse numbers and emails that are taken
+            reason = contacts.conflict(name, details)
+            if reason is None:
+                staged[name] = details
+                seen_phones.add(phone_key(phone))
+                seen_emails.add(email.lower())
+                continue
+        report.writerow([line_number, name, phone, email, reason])
+        rejected += 1
+    return rejected
+
+
+# ---
+# Export
+# contacts_items can be contacts.items() or contact_storage.iter_contacts(path),
+# so a whole file can be converted without loading it.
+# ---
+def export_contacts(contacts_items, path, file_format=None):
+    """Writes contacts to a file one at a time. Returns how many were written."""
+    file_format = file_format or guess_format(path)
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        if file_format == 'csv':
+            writer = csv.writer(file)
+            writer.writerow(['name', 'phone', 'email'])
+        for name, details in contacts_items:
+            if file_format == 'csv':
+                writer.writerow([name, details['phone'], details['email']])
+            elif file_format == 'jsonl':
+                file.write(json.dumps({'name': name, 'phone': details['phone'], 'email': details['email']}) + '\n')
+            else:
+                file.write(f'BEGIN:VCARD\r\nVERSION:3.0\r\nFN:{_escape(name)}\r\n'
+                           f'TEL;TYPE=CELL:{details["phone"]}\r\nEMAIL:{details["email"]}\r\nEND:VCARD\r\n')
+            count += 1
+    return count
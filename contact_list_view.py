@@ -0,0 +1,184 @@
+# Group 16 - Contact Management System
+# A scrolling contact list for the GUI that only draws the rows you can see.
+# However many contacts there are, the list owns a fixed number of row labels
+# and scrolling just changes which contacts those labels show. Subscribed to the
+# store's change feed, it redraws only the rows an add, update or delete touches.
+
+from customtkinter import CTkButton, CTkFrame, CTkLabel, CTkScrollbar
+
+from contact_store import ADDED, UPDATED
+
+
+def format_row(name, details):
+    """The one-line text shown for a contact."""
+    return f'Name: {name}   |   Phone: {details["phone"]}   |   Email: {details["email"]}'
+
+
+class ContactListView(CTkFrame):
+    """
+    A virtual list of contacts.
+    show() takes a sequence of names plus a function that looks up a name's
+    details, and only the visible window of rows is ever turned into widgets.
+    """
+
+    def __init__(self, master, rows=6, **kwargs):
+        super().__init__(master, **kwargs)
+        self.rows = rows
+        self._names = []
+        self._lookup = None
+        self._offset = 0
+        self._window = []  # The names the row labels are showing right now
+
+        # The fixed pool of row labels, with a scrollbar beside them
+        body = CTkFrame(self, fg_color='transparent')
+        body.grid(row=0, column=0, sticky='nsew', padx=5, pady=5)
+        self._labels = []
+        for _ in range(rows):
+            label = CTkLabel(body, text='', anchor='w', font=('Consolas', 13))
+            label.pack(fill='x', padx=5)
+            self._labels.append(label)
+        self._scrollbar = CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky='ns', pady=5)
+
+        # Paging controls
+        pager = CTkFrame(self, fg_color='transparent')
+        pager.grid(row=1, column=0, columnspan=2, pady=(0, 5))
+        CTkButton(pager, text='◀ Prev', width=80, command=self.previous_page).pack(side='left', padx=5)
+        self._page_label = CTkLabel(pager, text='')
+        self._page_label.pack(side='left', padx=10)
+        CTkButton(pager, text='Next ▶', width=80, command=self.next_page).pack(side='left', padx=5)
+
+        self.grid_columnconfigure(0, weight=1)
+
+        # Mouse wheel scrolling over any of the rows
+        for widget in [body] + self._labels:
+            widget.bind('<MouseWheel>', self._on_mouse_wheel)  # Windows and macOS
+            widget.bind('<Button-4>', lambda event: self.scroll_by(-1))  # Linux
+            widget.bind('<Button-5>', lambda event: self.scroll_by(1))
+
+    # ---
+    # Choosing what to show
+    # ---
+    def show(self, names, lookup):
+        """
+        Shows the given names from the top. lookup(name) must return the contact's details.
+        names can be a list, or anything with len() and slicing that keeps itself up to
+        date, like the store's SortedNameIndex.
+        """
+        self._names = names
+        self._lookup = lookup
+        self._offset = 0
+        self.refresh()
+
+    def show_message(self, text):
+        """Empties the list and shows a single line of text instead."""
+        self._names = []
+        self._offset = 0
+        self.refresh()
+        self._labels[0].configure(text=text)
+
+    def remove(self, name):
+        """Drops a deleted contact from a list of names, redrawing only the rows below it."""
+        try:
+            position = self._names.index(name)
+        except ValueError:
+            return
+        del self._names[position]
+        self._rows_moved(position, -1)
+
+    # ---
+    # Following the store's change feed
+    # contacts.subscribe(contact_list.contact_changed) keeps the list up to date.
+    # ---
+    def contact_changed(self, event, name, details):
+        """Patches the list after a change. Only the rows it affects are redrawn."""
+        if self._lookup is None:
+            return
+        if event == UPDATED:
+            if name in self._window:
+                self._labels[self._window.index(name)].configure(text=format_row(name, details))
+        elif isinstance(self._names, list):
+            # A plain list (search results) keeps the names it was given; deleted ones leave it
+            if event != ADDED:
+                self.remove(name)
+        else:
+            # A live sequence such as SortedNameIndex has already taken the change in
+            self._rows_moved(self._names.position(name), 1 if event == ADDED else -1)
+
+    def _rows_moved(self, position, change):
+        """Keeps the window in step after a name was added (change 1) or removed (change -1) at position."""
+        if position < self._offset:
+            # Above the window: move the window along, so the same contacts stay on screen
+            self._offset += change
+        elif position < self._offset + self.rows:
+            if self._offset and self._offset >= len(self._names):
+                # The last contacts on screen are gone; show the end of the list instead
+                self._offset = max(0, len(self._names) - self.rows)
+                self.refresh()
+                return
+            self._draw_rows(position - self._offset)
+        self._draw_position()
+
+    # ---
+    # Scrolling and paging
+    # ---
+    def scroll_to(self, offset):
+        """Moves the first visible row to the given position."""
+        last_offset = max(0, len(self._names) - self.rows)
+        offset = min(max(0, offset), last_offset)
+        if offset != self._offset:
+            self._offset = offset
+            self.refresh()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self._offset + rows)
+
+    def next_page(self):
+        self.scroll_by(self.rows)
+
+    def previous_page(self):
+        self.scroll_by(-self.rows)
+
+    def _on_mouse_wheel(self, event):
+        self.scroll_by(-1 if event.delta > 0 else 1)
+
+    def _on_scrollbar(self, action, *args):
+        """Handles the same 'moveto' / 'scroll' commands a Tk scrollbar sends."""
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * len(self._names)))
+        elif action == 'scroll':
+            amount = int(float(args[0]))
+            if len(args) > 1 and args[1] == 'pages':
+                amount *= self.rows
+            self.scroll_by(amount)
+
+    # ---
+    # Drawing
+    # ---
+    def refresh(self):
+        """Redraws the visible rows. This costs the same for ten contacts or ten million."""
+        self._draw_rows()
+        self._draw_position()
+
+    def _draw_rows(self, first_row=0):
+        """Redraws the visible rows from first_row down."""
+        self._window = list(self._names[self._offset:self._offset + self.rows])
+        for row in range(first_row, self.rows):
+            if row < len(self._window):
+                name = self._window[row]
+                self._labels[row].configure(text=format_row(name, self._lookup(name)))
+            else:
+                self._labels[row].configure(text='')
+
+    def _draw_position(self):
+        """Keeps the scrollbar and page counter in step with the window."""
+        total = len(self._names)
+        if total:
+            self._scrollbar.set(self._offset / total, min(1.0, (self._offset + self.rows) / total))
+            pages = (total + self.rows - 1) // self.rows
+            page = pages if self._offset + self.rows >= total else self._offset // self.rows + 1
+            self._page_label.configure(text=f'Page {page} of {pages}  ({total} contacts)')
+        else:
+            self._scrollbar.set(0.0, 1.0)
+            self._page_label.configure(text='')
+
@@ -0,0 +1,167 @@
+# Group 16 - Contact Management System
+# Phone number normalization and a prefix index over phone numbers.
+#
+# Numbers are stored the way they were typed, but the indexes key them by one
+# canonical E.164 form, so "0241234567", "233241234567" and "+233241234567" are
+# all the same number: +233241234567.
+
+COUNTRY_CODE = '233'  # Ghana: local numbers are 0 followed by 9 digits
+
+
+# ---
+# Normalization
+# ---
+def normalize_phone(number):
+    """
+    Returns the E.164 form of a phone number ("+233241234567"), or None if it isn't
+    a phone number we accept: 10 local digits starting with 0, 12 digits starting
+    with 233, or + (or 00) followed by a country code and number, 8 to 15 digits.
+    """
+    number = number.strip()
+    if number.startswith('+'):
+        digits = number[1:]
+    elif number.startswith('00'):
+        digits = number[2:]
+    elif len(number) == 10 and number.startswith('0'):
+        digits = COUNTRY_CODE + number[1:]
+    elif len(number) == 12 and number.startswith(COUNTRY_CODE):
+        digits = number
+    else:
+        return None
+    if not (digits.isdigit() and 8 <= len(digits) <= 15):
+        return None
+    return '+' + digits
+
+
+def phone_key(number):
+    """The key a number is indexed under: its E.164 form, or just the number for odd old entries."""
+    return normalize_phone(number) or number.strip()
+
+
+def normalize_prefix(prefix):
+    """
+    Turns the start of a number, as a person would type it, into the start of an
+    E.164 key: "024" -> "+23324", "23324" -> "+23324", "+44" -> "+44".
+    Returns None if it isn't made of digits.
+    """
+    prefix = prefix.strip()
+    if prefix.startswith('+'):
+        digits = prefix[1:]
+    elif prefix.startswith('00'):
+        digits = prefix[2:]
+    elif prefix.startswith('0'):
+        digits = COUNTRY_CODE + prefix[1:]
+    else:
+        digits = prefix
+    if not digits.isdigit():
+        return None
+    return '+' + digits
+
+
+# ---
+# Prefix index
+# A trie keyed by the digits of each number: following "+", "2", "3", "3", "2",
+# "4" leads to every number on the 024 network. To save memory, a node keeps its
+# numbers in a small list (a "bucket") and only grows children, one per next digit,
+# once the list gets longer than BURST_SIZE. A query walks down one node per digit
+# of the prefix and then gathers what is below, so it costs time in proportion to
+# the prefix and the number of results, not to the number of contacts.
+# ---
+BURST_SIZE = 32
+
+
+class _TrieNode:
+    __slots__ = ('children', 'bucket')
+
+    def __init__(self):
+        self.children = None  # next digit -> _TrieNode, once this node has burst
+        self.bucket = []      # (rest of the number, name); after bursting, only numbers that end here
+
+    def burst(self):
+        """Moves the bucket's numbers down into one child per next digit."""
+        self.children = {}
+        entries, self.bucket = self.bucket, []
+        for rest, name in entries:
+            if rest:
+                self.children.setdefault(rest[0], _TrieNode()).bucket.append((rest[1:], name))
+            else:
+                self.bucket.append((rest, name))
+        for child in self.children.values():
+            if len(child.bucket) > BURST_SIZE:
+                child.burst()
+
+
+class PhoneTrie:
+    """A prefix index over normalized phone numbers, kept up to date by the ContactStore."""
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _find(self, key, create=False):
+        """Walks down as far as the trie goes. Returns (node, the part of key left over)."""
+        node, depth = self._root, 0
+        while depth < len(key) and node.children is not None:
+            child = node.children.get(key[depth])
+            if child is None:
+                if not create:
+                    return None, key[depth:]
+                child = node.children[key[depth]] = _TrieNode()
+            node, depth = child, depth + 1
+        return node, key[depth:]
+
+    def add(self, name, details):
+        node, rest = self._find(phone_key(details['phone']), create=True)
+        node.bucket.append((rest, name))
+        self._count += 1
+        if node.children is None and len(node.bucket) > BURST_SIZE:
+            node.burst()
+
+    def update(self, name, old, new):
+        if phone_key(old['phone']) != phone_key(new['phone']):
+            self.remove(name, old)
+            self.add(name, new)
+
+    def remove(self, name, details):
+        node, rest = self._find(phone_key(details['phone']))
+        if node is not None and (rest, name) in node.bucket:
+            node.bucket.remove((rest, name))
+            self._count -= 1
+
+    def search(self, prefix, limit=None):
+        """
+        Returns the names of the contacts whose number starts with prefix, in number
+        order. The prefix is typed like a number ("024", "23324", "+23324") and may
+        be a whole number. With a limit, stops after that many names.
+        """
+        key = normalize_prefix(prefix)
+        if key is None:
+            return []
+        node, rest = self._find(key)
+        if node is None:
+            return []
+
+        found = []
+        if node.children is None:
+            # A bucket: only some of its numbers may carry on with the rest of the prefix
+            for number_rest, name in sorted(node.bucket):
+                if number_rest.startswith(rest):
+                    found.append(name)
+                    if len(found) == limit:
+                        break
+            return found
+
+        # The whole prefix was matched by the walk, so everything below this node matches
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for _, name in sorted(node.bucket):
+                found.append(name)
+                if len(found) == limit:
+                    return found
+            if node.children is not None:
+                stack.extend(node.children[digit] for digit in sorted(node.children, reverse=True))
+        return found
@@ -0,0 +1,249 @@
+# Group 16 - Contact Management System
+# Timers and counters for finding out where the time goes.
+#
+# Start a program with --profile to switch them on:
+#     python "Group 16 json.py" --profile
+#     python GUI.py --profile=gui_profile.json
+# Loading, saving, searching, adding, updating, deleting and drawing the list are
+# then timed. The stats menu choice (the Stats button in the GUI) prints a latency
+# histogram for each of them, and everything is written to a JSON file on exit.
+#
+# With profiling off, timer() hands back one shared do-nothing object, and wrap()
+# and instrument() leave functions as they are, so the cost is a single "if".
+
+import atexit
+import bisect
+import json
+import platform
+import sys
+import time
+from array import array
+
+PROFILE_FLAG = '--profile'
+
+# The upper edge of each histogram bucket, in milliseconds
+BUCKETS_MS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+BAR_WIDTH = 40
+
+
+# ---
+# One timed operation
+# ---
+class OperationStats:
+    """Every timing recorded for one operation, and how many bytes it wrote."""
+
+    def __init__(self):
+        self.latencies = array('d')  # Seconds, one per call
+        self.bytes_written = 0
+
+    def record(self, seconds, bytes_written=0):
+        self.latencies.append(seconds)
+        self.bytes_written += bytes_written
+
+    def histogram(self):
+        """Returns [(bucket label, calls)] for the buckets that have any calls in them."""
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for seconds in self.latencies:
+            counts[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+        labels = [f'<= {edge:g} ms' for edge in BUCKETS_MS] + [f'> {BUCKETS_MS[-1]:g} ms']
+        return [(label, count) for label, count in zip(labels, counts) if count]
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        calls = len(latencies)
+        if not calls:
+            return {'calls': 0}
+
+        def percentile(share):
+            return round(latencies[min(calls - 1, int(share * calls))] * 1000, 3)
+
+        summary = {
+            'calls': calls,
+            'total_ms': round(sum(latencies) * 1000, 3),
+            'mean_ms': round(sum(latencies) * 1000 / calls, 3),
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(latencies[-1] * 1000, 3),
+            'histogram': dict(self.histogram()),
+        }
+        if self.bytes_written:
+            summary['bytes_written'] = self.bytes_written
+            summary['bytes_per_call'] = round(self.bytes_written / calls)
+        return summary
+
+
+class _Timer:
+    """Times the code inside a with block."""
+    __slots__ = ('operation', 'start')
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.operation.record(time.perf_counter() - self.start)
+
+
+class _NoTimer:
+    """What timer() hands back when profiling is off: a with block that does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NO_TIMER = _NoTimer()
+
+
+# ---
+# All the operations and counters of one program
+# ---
+class Stats:
+    def __init__(self):
+        self.enabled = False
+        self.dump_path = None
+        self.operations = {}  # operation name -> OperationStats
+        self.counters = {}    # counter name -> count
+        self.started = time.time()
+
+    def enable(self, dump_path=None):
+        """Switches profiling on. With a dump_path, the stats are written there as JSON on exit."""
+        self.enabled = True
+        if dump_path and self.dump_path is None:
+            atexit.register(self.dump)
+        self.dump_path = dump_path or self.dump_path
+
+    def enable_from_args(self, argv, default_path):
+        """
+        Switches profiling on if argv has --profile (stats go to default_path) or
+        --profile=FILE. Returns True if it did.
+        """
+        for arg in argv[1:]:
+            if arg == PROFILE_FLAG:
+                self.enable(default_path)
+                return True
+            if arg.startswith(PROFILE_FLAG + '='):
+                self.enable(arg.split('=', 1)[1] or default_path)
+                return True
+        return False
+
+    def operation(self, name):
+        if name not in self.operations:
+            self.operations[name] = OperationStats()
+        return self.operations[name]
+
+    # Ways to time something
+
+    def timer(self, name):
+        """For a with block: with stats.timer('add'): ..."""
+        if not self.enabled:
+            return NO_TIMER
+        return _Timer(self.operation(name))
+
+    def wrap(self, function, name, bytes_written=None):
+        """
+        Returns a version of function whose calls are timed as operation name. If
+        bytes_written is given, it is called before and after to count the bytes written.
+        With profiling off, returns function itself, so switch profiling on first.
+        """
+        if not self.enabled:
+            return function
+        operation = self.operation(name)
+
+        def timed(*args, **kwargs):
+            before = bytes_written() if bytes_written else 0
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                operation.record(seconds, bytes_written() - before if bytes_written else 0)
+        return timed
+
+    def instrument(self, obj, *method_names, **renamed):
+        """
+        Times every call of obj's named methods from now on, each as the operation of
+        the same name, or under a new name: instrument(trie, search='phone_prefix').
+        Returns obj, so an index can be instrumented on its way into add_index().
+        """
+        if self.enabled:
+            for method_name, name in [(method, method) for method in method_names] + list(renamed.items()):
+                setattr(obj, method_name, self.wrap(getattr(obj, method_name), name))
+        return obj
+
+    def instrument_storage(self, storage):
+        """Times a storage backend's load, saves, refreshes and close, and the bytes its saves write."""
+        if not self.enabled:
+            return
+        bytes_written = None
+        if hasattr(storage, 'bytes_written'):
+            def bytes_written():
+                return storage.bytes_written
+        # save() goes through save_many(), so every save is counted once, as 'save'
+        for method_name, name in [('load', 'load'), ('save_many', 'save'), ('save_all', 'save_all'),
+                                  ('refresh', 'refresh'), ('fetch_changes', 'fetch_changes'),
+                                  ('apply_changes', 'apply_changes'), ('close', 'close')]:
+            setattr(storage, method_name, self.wrap(getattr(storage, method_name), name, bytes_written))
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    # Reporting
+
+    def to_dict(self):
+        return {
+            'started': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started)),
+            'seconds': round(time.time() - self.started, 3),
+            'program': sys.argv[0],
+            'python': platform.python_version(),
+            'operations': {name: operation.summary() for name, operation in sorted(self.operations.items())},
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def report(self):
+        """The stats as text: a table of latencies, a histogram per operation, then the counters."""
+        if not self.enabled:
+            return f'Profiling is off. Start the program with {PROFILE_FLAG} to time each operation.'
+        operations = {name: operation for name, operation in sorted(self.operations.items()) if operation.latencies}
+        if not operations and not self.counters:
+            return 'Nothing has been timed yet.'
+
+        lines = [f"{'operation':<14} {'calls':>7} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} "
+                 f"{'p99 ms':>9} {'max ms':>9} {'bytes/call':>11}"]
+        for name, operation in operations.items():
+            summary = operation.summary()
+            lines.append(f"{name:<14} {summary['calls']:>7} {summary['mean_ms']:>9} {summary['p50_ms']:>9} "
+                         f"{summary['p95_ms']:>9} {summary['p99_ms']:>9} {summary['max_ms']:>9} "
+                         f"{summary.get('bytes_per_call', ''):>11}".rstrip())
+
+        for name, operation in operations.items():
+            lines.append(f'\n{name}:')
+            histogram = operation.histogram()
+            most = max(count for _, count in histogram)
+            for label, count in histogram:
+                bar = '#' * max(1, round(count / most * BAR_WIDTH))
+                lines.append(f'  {label:>12} {count:>7}  {bar}')
+
+        if self.counters:
+            lines.append('\ncounters:')
+            for name, count in sorted(self.counters.items()):
+                lines.append(f'  {name:<24} {count:>7}')
+        return '\n'.join(lines)
+
+    def dump(self, path=None):
+        """Writes the stats to path (or the dump_path given to enable()) as JSON."""
+        path = path or self.dump_path
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=4)
+        print(f'Profile written to {path}.')
+
+
+# The one Stats object every part of a program records into
+stats = Stats()
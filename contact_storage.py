@@ -0,0 +1,1595 @@
+# Group 16 - Contact Management System
+# Storage shared by the contact manager scripts and the GUI.
+# The default backend keeps contacts in a JSON snapshot file plus an append-only
+# journal of changes: every edit is appended to the journal as one small line,
+# and the journal is folded back into the snapshot (compacted) from time to time.
+# For very big address books the snapshot can be split into shards that load in
+# parallel, or written in a compact row format. An SQLite backend is also
+# available; see open_storage().
+
+import argparse
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from contact_store import ContactStore
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# How much of a contacts file iter_contacts reads at a time
+CHUNK_SIZE = 1024 * 1024
+
+# The permissions a plain open(path, 'w') would give a new file (os.umask can only be
+# read by setting it, so it is read once here)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+NEW_FILE_MODE = 0o666 & ~_UMASK
+
+# Fold the journal back into the snapshot once it holds at least this many edits
+# and has grown to this share of the snapshot's size. Rewriting the snapshot costs
+# time in proportion to its size, so waiting for the journal to grow in proportion
+# too keeps the cost of each edit the same however big the address book is.
+COMPACT_EVERY = 200
+COMPACT_SHARE = 0.1
+
+
+# ---
+# Snapshot helpers
+# ---
+def read_snapshot(path):
+    """
+    Loads a whole contacts snapshot into a dictionary. If the file doesn't exist,
+    returns an empty dictionary. This is the fast path when every contact is
+    needed in memory anyway; use iter_contacts to walk a file without keeping it.
+    """
+    try:
+        if is_rows_file(path):
+            return dict(iter_rows(path))
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def iter_contacts(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields (name, details) pairs from a contacts JSON file without loading all of it.
+    The file is read in chunks and each contact is decoded on its own, so memory use
+    stays at about one chunk no matter how large the file is.
+    """
+    if is_rows_file(path):
+        yield from iter_rows(path, chunk_size)
+        return
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as file:
+        reader = _ChunkReader(file, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            name = reader.decode(decoder)
+            reader.expect(':')
+            details = reader.decode(decoder)
+            yield name, details
+            if reader.peek() == '}':
+                return
+            reader.expect(',')
+
+
+class _ChunkReader:
+    """A small cursor over a text file that reads more of it only when needed."""
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def _read_more(self):
+        # Drop the text we have already used before adding more
+        chunk = self.file.read(self.chunk_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        if not chunk:
+            self.eof = True
+
+    def peek(self):
+        """Returns the next character that isn't whitespace, without using it up."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in ' \t\r\n':
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.eof:
+                raise ValueError('Unexpected end of contacts file.')
+            self._read_more()
+
+    def expect(self, character):
+        if self.peek() != character:
+            raise ValueError(f'Expected {character!r} in contacts file at offset {self.position}.')
+        self.position += 1
+
+    def decode(self, decoder):
+        """Decodes the next JSON value, reading more of the file until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.position)
+            except ValueError:
+                if self.eof:
+                    raise
+            else:
+                # A value that stops right at the end of the buffer may have been cut short
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            self._read_more()
+
+
+def write_snapshot(path, contacts_data):
+    """
+    Writes every contact to a temporary file and swaps it in.
+    os.replace is atomic, so a crash leaves either the old file or the new one,
+    never a half-written mix of both. A .rows or .rows.gz file gets the compact
+    row format (see write_rows), anything else JSON.
+    """
+    if path.lower().endswith(ROWS_EXTENSIONS):
+        write_rows(path, contacts_data)
+    else:
+        _replace_file(path, lambda file: _dump_contacts(contacts_data, file))
+
+
+def _replace_file(path, write, binary=False, mode_from=None):
+    """
+    Calls write(file) on a temporary file next to path, then atomically swaps it in for path.
+    The new file keeps path's permissions (or mode_from's, if path doesn't exist yet).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.contacts-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb' if binary else 'w', **({} if binary else {'encoding': 'utf-8'})) as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        _copy_mode(temp_path, path, mode_from)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def _copy_mode(temp_path, path, mode_from=None):
+    """
+    mkstemp makes files only their owner can read. This gives temp_path the permissions
+    of the file it replaces, or of mode_from, or else what open() would have given it.
+    """
+    for existing in (path, mode_from):
+        try:
+            os.chmod(temp_path, os.stat(existing).st_mode & 0o7777)
+            return
+        except (FileNotFoundError, TypeError):
+            continue
+    os.chmod(temp_path, NEW_FILE_MODE)
+
+
+def _dump_contacts(contacts_data, file):
+    """
+    Writes contacts in the same layout as json.dump(..., indent=4), one contact at a
+    time, so any mapping with an items() method can be saved without copying it.
+    """
+    separator = '{'
+    for name, details in contacts_data.items():
+        file.write(separator + _format_contact(name, details))
+        separator = ','
+    file.write('{}' if separator == '{' else '\n}')
+
+
+def _format_contact(name, details):
+    """One contact as it appears in a snapshot, after the '{' or ',' before it."""
+    return (f'\n    {json.dumps(name)}: {{\n'
+            f'        "phone": {json.dumps(details["phone"])},\n'
+            f'        "email": {json.dumps(details["email"])}\n'
+            f'    }}')
+
+
+def _fsync_directory(directory):
+    """Makes the rename itself durable. Not every platform supports this, so errors are ignored."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ---
+# Compact snapshot
+# The JSON snapshot repeats "phone" and "email" and four spaces of indent for every
+# contact, and the same few email domains over and over. The row format leaves all
+# that out: one short JSON array per line, and each domain written once and then
+# referred to by number.
+#   {"format": "group16-rows", "version": 1}     the header line
+#   ["gmail.com"]                                 domain 1 (domains are numbered as they appear)
+#   ["Kwame Mensah","233241234567","kwame.mensah",1]
+#   ["Kwadwo","1234567890","no-at-sign",0]       domain 0: the email is kept whole
+# A file ending in .gz is also gzip-compressed. Both are written and read a chunk
+# of rows at a time, so neither side ever holds the whole file.
+# ---
+ROWS_FORMAT = 'group16-rows'
+ROWS_VERSION = 1
+ROWS_EXTENSIONS = ('.rows', '.rows.gz')
+ROWS_HEADER = json.dumps({'format': ROWS_FORMAT, 'version': ROWS_VERSION})
+ROWS_PER_WRITE = 10000
+GZIP_MAGIC = b'\x1f\x8b'
+GZIP_LEVEL = 6  # Nearly as small as the slowest level 9, in a fraction of the time
+
+# Turns a string into a JSON string literal (quotes and escapes), leaving other letters as they are
+_quote = json.encoder.encode_basestring
+
+
+def is_rows_file(path):
+    """True if path holds the row format (compressed or not), going by its first bytes rather than its name."""
+    with open(path, 'rb') as file:
+        start = file.read(len(ROWS_HEADER))
+    return start.startswith(GZIP_MAGIC) or start == ROWS_HEADER.encode('utf-8')
+
+
+def _open_rows(path, mode):
+    """Opens a row file as text; .gz files (or, when reading, any gzip file) go through gzip."""
+    if 'w' in mode:
+        compressed = path.lower().endswith('.gz')
+    else:
+        with open(path, 'rb') as file:
+            compressed = file.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def write_rows(path, contacts_data):
+    """Writes contacts_data in the row format, through a temporary file like write_snapshot."""
+    def write(file):
+        packed = None
+        if path.lower().endswith('.gz'):
+            # mtime=0 keeps the same contacts giving the same bytes
+            packed = gzip.GzipFile(fileobj=file, mode='wb', compresslevel=GZIP_LEVEL, mtime=0)
+        text = io.TextIOWrapper(packed or file, encoding='utf-8', newline='\n')
+        _dump_rows(contacts_data, text)
+        text.flush()
+        text.detach()  # Leaves file open for _replace_file to sync
+        if packed:
+            packed.close()
+    _replace_file(path, write, binary=True)
+
+
+def _dump_rows(contacts_data, file):
+    domains = {}
+    lines = [ROWS_HEADER]
+    for name, details in contacts_data.items():
+        local, at, domain = details['email'].rpartition('@')
+        if not at:
+            local, number = domain, 0
+        else:
+            number = domains.get(domain)
+            if number is None:
+                number = domains[domain] = len(domains) + 1
+                lines.append(f'[{_quote(domain)}]')
+        lines.append(f'[{_quote(name)},{_quote(details["phone"])},{_quote(local)},{number}]')
+        if len(lines) >= ROWS_PER_WRITE:
+            file.write('\n'.join(lines) + '\n')
+            lines = []
+    if lines:  # Empty when the rows came out an exact number of writes
+        file.write('\n'.join(lines) + '\n')
+
+
+def iter_rows(path, chunk_size=CHUNK_SIZE):
+    """Yields (name, details) pairs from a row file, decoding about chunk_size bytes of rows at a time."""
+    with _open_rows(path, 'r') as file:
+        header = json.loads(file.readline() or 'null')
+        if not isinstance(header, dict) or header.get('format') != ROWS_FORMAT or header.get('version') != ROWS_VERSION:
+            raise ValueError(f'{path} is not a contacts file this program can read')
+        domains = ['']
+        while True:
+            lines = file.readlines(chunk_size)
+            if not lines:
+                return
+            # Older versions could leave a blank line at the end, which isn't a row
+            lines = [line for line in lines if not line.isspace()]
+            # One json.loads for the whole chunk is much quicker than one per row
+            for row in json.loads('[' + ','.join(lines) + ']'):
+                if len(row) == 1:
+                    domains.append(row[0])
+                    continue
+                name, phone, local, number = row
+                yield name, {'phone': phone, 'email': f'{local}@{domains[number]}' if number else local}
+
+
+# ---
+# Binary snapshot
+# A copy of the JSON snapshot in the ContactStore's own column layout, so loading
+# it is a few bulk copies instead of parsing every contact:
+#   header   magic, version, contact count, the size and modification time of the
+#            contacts.json it was made from, the length of each section, and a
+#            CRC32 checksum of all the sections
+#   sections names (NUL-separated UTF-8), packed phones, odd phones (JSON),
+#            email text, email lengths, email domain numbers, domains (JSON)
+# It is only trusted while contacts.json is still the file it was made from, its
+# version is known and its checksum matches; otherwise the JSON is loaded instead.
+# ---
+BINARY_MAGIC = b'G16SNAP\n'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<8sHQQq7QI')
+BINARY_SECTIONS = ('names', 'phones', 'odd_phones', 'email_text', 'email_length', 'email_domain', 'domains')
+
+
+def write_binary_snapshot(path, contacts_data, json_path):
+    """Saves contacts as a binary snapshot that stands in for json_path as it is right now."""
+    if not hasattr(contacts_data, 'to_columns'):
+        contacts_data = ContactStore(contacts_data.items())
+    columns = contacts_data.to_columns()
+    names = '\0'.join(columns['names'])
+    if names.count('\0') != max(len(columns['names']) - 1, 0):
+        raise ValueError('A contact name contains a NUL character, so it cannot go in a binary snapshot.')
+
+    sections = []
+    for section in BINARY_SECTIONS:
+        value = columns[section]
+        if section == 'names':
+            value = names.encode('utf-8')
+        elif isinstance(value, array):
+            if sys.byteorder == 'big':  # The file is always little-endian
+                value = array(value.typecode, value)
+                value.byteswap()
+            value = value.tobytes()
+        elif not isinstance(value, bytes):
+            value = json.dumps(value).encode('utf-8')
+        sections.append(value)
+
+    checksum = 0
+    for section in sections:
+        checksum = zlib.crc32(section, checksum)
+    json_stat = os.stat(json_path)
+    header = BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(columns['names']), json_stat.st_size,
+                                json_stat.st_mtime_ns, *[len(section) for section in sections], checksum)
+
+    def write(file):
+        file.write(header)
+        for section in sections:
+            file.write(section)
+    _replace_file(path, write, binary=True)
+
+
+def read_binary_snapshot(path, json_path, store):
+    """
+    Fills an empty ContactStore from a binary snapshot in one bulk read. Returns False,
+    leaving the store empty, if the snapshot is missing, out of date or damaged.
+    """
+    try:
+        json_stat = os.stat(json_path)
+        with open(path, 'rb') as file:
+            data = file.read()
+    except OSError:
+        return False
+    if len(data) < BINARY_HEADER.size:
+        return False
+    magic, version, count, json_size, json_mtime, *lengths, checksum = BINARY_HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        return False
+    if (json_size, json_mtime) != (json_stat.st_size, json_stat.st_mtime_ns):
+        return False  # contacts.json has been written since, by us or by hand
+    if BINARY_HEADER.size + sum(lengths) != len(data):
+        return False
+    body = memoryview(data)[BINARY_HEADER.size:]
+    if zlib.crc32(body) != checksum:
+        return False
+
+    columns = {}
+    offset = 0
+    for section, length in zip(BINARY_SECTIONS, lengths):
+        value = body[offset:offset + length]
+        offset += length
+        if section == 'names':
+            value = str(value, 'utf-8').split('\0') if count else []
+        elif section in ('phones', 'email_length', 'email_domain'):
+            numbers = array('Q' if section == 'phones' else 'I')
+            numbers.frombytes(value)
+            if sys.byteorder == 'big':
+                numbers.byteswap()
+            value = numbers
+        elif section == 'email_text':
+            value = bytes(value)
+        else:
+            value = json.loads(str(value, 'utf-8'))
+        columns[section] = value
+    columns['odd_phones'] = {int(row): phone for row, phone in columns['odd_phones'].items()}
+
+    if any(len(columns[section]) != count
+           for section in ('names', 'phones', 'email_length', 'email_domain')):
+        return False
+    store.load_columns(columns)
+    return True
+
+
+# ---
+# The journal
+# Each line is one JSON record:
+#   {"op": "set", "name": ..., "phone": ..., "email": ...}
+#   {"op": "delete", "name": ...}
+#   {"op": "batch", "changes": [set and delete records]}
+# Records always hold the full contact, so replaying one twice is harmless.
+# Changes saved together go in one batch line, which is only read back once it is
+# complete, so after a crash either all of them are in the journal or none are.
+#
+# Several programs can share one journal. Each remembers how far into it it has
+# read (offset), so it can pick up just the records the others have added since.
+# Every compaction starts a new "generation": the old journal is kept beside the
+# new one as contacts.journal.old, and the new one starts with the line
+#   {"op": "generation", "generation": 7}
+# so a program that is one compaction behind can still finish reading the old one.
+# ---
+class ContactJournal:
+    """An append-only log of contact changes that sits next to the snapshot file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.old_path = path + '.old'
+        self.records = 0     # Records in the journal since the last compaction
+        self.generation = 0  # Goes up by one at every compaction
+        self.offset = 0      # How far into the journal this program has read
+
+    def replay(self, contacts_data):
+        """Applies every journal record to contacts_data, oldest first."""
+        self.generation, self.offset = _journal_header(self.path)
+        self.records = 0
+        for record in self.read_new():
+            apply_record(contacts_data, record)
+        return contacts_data
+
+    def read_new(self):
+        """
+        Returns the records added since this program last read or wrote the journal,
+        from any program. Returns None if a compaction this program missed has thrown
+        some of them away, in which case the snapshot has to be loaded again.
+        Call with the storage's lock held.
+        """
+        generation, start = _journal_header(self.path)
+        records = []
+        if generation == self.generation + 1:
+            # Someone compacted since we last looked: finish the old journal first
+            old_generation, _ = _journal_header(self.old_path)
+            if old_generation != self.generation:
+                return None
+            records, _ = _read_records(self.old_path, self.offset)
+            self.generation, self.offset, self.records = generation, start, 0
+        elif generation != self.generation:
+            return None
+
+        new_records, self.offset = _read_records(self.path, max(self.offset, start), repair=True)
+        self.records += len(new_records)
+        return records + new_records
+
+    def append(self, name, details):
+        """Appends one change. details=None means the contact was deleted."""
+        return self.append_many([(name, details)])
+
+    def append_many(self, changes):
+        """
+        Appends several (name, details) changes with a single write and fsync, as one
+        batch record, so they are replayed all together or (after a crash) not at all.
+        Call read_new first (with the lock held), so no one else's records are skipped.
+        Returns the number of bytes written.
+        """
+        records = []
+        for name, details in changes:
+            if details is None:
+                records.append({'op': 'delete', 'name': name})
+            else:
+                records.append({'op': 'set', 'name': name, 'phone': details['phone'], 'email': details['email']})
+        if not records:
+            return 0
+        record = records[0] if len(records) == 1 else {'op': 'batch', 'changes': records}
+        data = (json.dumps(record) + '\n').encode('utf-8')
+        with open(self.path, 'ab') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+            self.offset = file.tell()
+        self.records += len(records)
+        return len(data)
+
+    def start_generation(self):
+        """
+        Starts an empty journal once its records are safely inside the snapshot.
+        The old journal is kept as contacts.journal.old for programs that haven't read it all.
+        """
+        if os.path.exists(self.path):
+            os.replace(self.path, self.old_path)
+        header = json.dumps({'op': 'generation', 'generation': self.generation + 1}) + '\n'
+        _replace_file(self.path, lambda file: file.write(header), mode_from=self.old_path)
+        self.generation += 1
+        self.offset = len(header.encode('utf-8'))
+        self.records = 0
+
+
+def _journal_header(path):
+    """Returns (generation, where the records start) for a journal; (0, 0) if it has no header."""
+    try:
+        with open(path, 'rb') as file:
+            line = file.readline()
+    except FileNotFoundError:
+        return 0, 0
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return 0, 0
+    if isinstance(record, dict) and record.get('op') == 'generation' and line.endswith(b'\n'):
+        return record['generation'], len(line)
+    return 0, 0
+
+
+def _read_records(path, offset, repair=False):
+    """
+    Reads the complete records from offset to the end of a journal file.
+    Batch records come back as the set and delete records inside them.
+    Returns (records, the offset just after the last one). A crash in the middle of
+    an append leaves a torn last line; with repair, it is cut off so the next append
+    starts on a clean line (only safe with the lock held).
+    """
+    records = []
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return records, offset
+
+    with file:
+        file.seek(offset)
+        for line in file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if record.get('op') == 'batch':
+                records.extend(record['changes'])
+            elif record.get('op') != 'generation':
+                records.append(record)
+            offset += len(line)
+
+    if repair and offset < os.path.getsize(path):
+        with open(path, 'r+b') as file:
+            file.truncate(offset)
+    return records, offset
+
+
+def apply_record(contacts_data, record):
+    """Applies a single journal record to a contacts dictionary."""
+    if record['op'] == 'set':
+        contacts_data[record['name']] = {'phone': record['phone'], 'email': record['email']}
+    elif record['op'] == 'delete':
+        contacts_data.pop(record['name'], None)
+
+
+# ---
+# Putting it together
+# ---
+def load_contacts(path, journal=None, contacts_data=None):
+    """
+    Loads the snapshot and replays the journal on top of it.
+    Pass an empty mapping (such as a ContactStore) as contacts_data to have it filled
+    one contact at a time, without building a dictionary of the whole file first.
+    """
+    if contacts_data is None:
+        contacts_data = read_snapshot(path)
+    elif os.path.exists(path):
+        for name, details in iter_contacts(path):
+            contacts_data[name] = details
+    if journal is not None:
+        journal.replay(contacts_data)
+    return contacts_data
+
+
+# ---
+# Locking
+# Programs sharing one contacts file take turns through a lock file next to it
+# (contacts.lock). It is held only while reading or writing, never while a person
+# is typing, so another window is never kept waiting for long.
+# ---
+class FileLock:
+    """An exclusive lock shared between programs (and between threads of one program)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        self._depth += 1
+        if self._depth == 1:
+            try:
+                self._file = open(self.path, 'a+b')
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)  # Retries for up to 10 seconds
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._depth -= 1
+                self._thread_lock.release()
+                raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+# ---
+# Storage backends
+# Every front end goes through one of these instead of touching files itself.
+# They all offer the same methods:
+#   load(contacts_data)   fill contacts_data (or a new dict) and return it
+#   save(name, details)   save one added/updated contact; details=None for a delete
+#   save_many(changes)    save several (name, details) changes together
+#   save_all(contacts)    replace everything that is stored
+#   refresh()             pick up changes saved by other programs; returns the changed names
+#   fetch_changes()       the half of refresh() that reads the files, safe on any thread
+#   apply_changes(skip)   the other half, on the thread that uses the contacts; touches no files
+#   compact()             fold the journal into the snapshot from the files alone, safe on any thread
+#   close(compact=True)   finish up before the program exits; compact=False leaves the
+#                         journal as it is instead of folding it into the snapshot
+# ---
+class JsonStorage:
+    """
+    A JSON snapshot file, plus (optionally) a journal of the edits made since it was
+    written and a binary copy of the snapshot that loads much faster.
+
+    With the journal, several programs can use the same file at once: every save
+    happens under a lock, and refresh() applies the records the others have added
+    to the journal since, instead of loading the whole file again.
+    """
+
+    def __init__(self, path, journal_path=None, compact_every=COMPACT_EVERY, binary_path=None, lock_path=None):
+        self.path = path
+        self.journal = ContactJournal(journal_path) if journal_path else None
+        self.compact_every = compact_every  # None means only compact in close()
+        self.binary_path = binary_path
+        self.binary_fresh = False  # True while the binary snapshot matches the JSON one
+        self.lock = FileLock(lock_path or path + '.lock')
+        self.contacts_data = None
+        self._incoming = []         # other programs' records, read while saving, for refresh() to apply
+        self._fresh = None          # Or, after a reload, all the contacts as they are on disk
+        self._incoming_lock = threading.Lock()  # _incoming and _fresh are filled on one thread and applied on another
+        self._needs_reload = False  # True if we fell more than a compaction behind the others
+        self.bytes_written = 0      # Everything this program has written to the files, for profiling
+
+    def load(self, contacts_data=None):
+        with self.lock:
+            # The binary snapshot can only fill an empty ContactStore
+            if self.binary_path and isinstance(contacts_data, ContactStore) and not contacts_data:
+                self.binary_fresh = read_binary_snapshot(self.binary_path, self.path, contacts_data)
+            if self.binary_fresh:
+                if self.journal is not None:
+                    self.journal.replay(contacts_data)
+                self.contacts_data = contacts_data
+            else:
+                self.contacts_data = load_contacts(self.path, self.journal, contacts_data)
+        return self.contacts_data
+
+    def save(self, name, details):
+        self.save_many([(name, details)])
+
+    def save_many(self, changes):
+        changes = list(changes)
+        with self.lock:
+            if self.journal is None:
+                # Without a journal the only way to save is to rewrite the file
+                self._write_snapshots(self.contacts_data)
+                return
+            # Set aside what others wrote since we last looked, except for the contacts
+            # being saved now: our records go after theirs, so ours are the ones that count
+            self._collect_incoming()
+            saved = {name for name, _ in changes}
+            with self._incoming_lock:
+                self._incoming = [record for record in self._incoming if record['name'] not in saved]
+                if self._fresh is not None:
+                    _apply_changes(self._fresh, changes)
+            self.bytes_written += self.journal.append_many(changes)
+            if self.compact_every and self.journal.records >= self.compact_every and self._journal_is_long():
+                self._catch_up()
+                self._write_snapshots(self.contacts_data)
+
+    def save_all(self, contacts_data):
+        with self.lock:
+            if self.contacts_data is not None:
+                self._catch_up()
+            self._write_snapshots(contacts_data)
+
+    def refresh(self):
+        """
+        Applies the changes other programs have saved since we last looked, and returns
+        the names of the contacts that changed. This changes the loaded contacts, so
+        call it from the thread that uses them (and after saving any pending edits).
+        """
+        self.fetch_changes()
+        return self.apply_changes()
+
+    def fetch_changes(self):
+        """
+        Reads what other programs have saved since we last looked, for apply_changes()
+        to apply. It leaves the loaded contacts alone, so it can run on a background
+        thread while waiting for the lock and reading the files.
+        """
+        if self.journal is None or self.contacts_data is None:
+            return
+        with self.lock:
+            self._collect_incoming()
+            if self._needs_reload:
+                fresh = self._read_fresh()
+                with self._incoming_lock:
+                    self._fresh, self._incoming = fresh, []
+                self._needs_reload = False
+
+    def apply_changes(self, skip=()):
+        """
+        Applies what fetch_changes() has read to the loaded contacts, and returns the
+        names of the contacts that changed. Nothing here touches the files. Contacts
+        named in skip keep their loaded details: they have edits of ours still waiting
+        to be saved, and those will go in after the ones read.
+        """
+        with self._incoming_lock:
+            fresh, self._fresh = self._fresh, None
+            incoming, self._incoming = self._incoming, []
+        changed = []
+        if fresh is not None:
+            for name in skip:
+                if name in self.contacts_data:
+                    fresh[name] = self.contacts_data[name]
+                elif name in fresh:
+                    del fresh[name]
+            changed = replace_contents(self.contacts_data, fresh)
+        for record in incoming:
+            if record['name'] not in skip:
+                apply_record(self.contacts_data, record)
+                changed.append(record['name'])
+        return list(dict.fromkeys(changed))
+
+    def compact(self):
+        """
+        Folds the journal into the snapshot without the loaded contacts: the old snapshot
+        is streamed through with the journal's changes applied. A server can run this on
+        another thread while it carries on changing the contacts. The binary copy is
+        built from the loaded contacts, so it is left for close() to write.
+        """
+        if self.journal is None:
+            return
+        with self.lock:
+            self._collect_incoming()  # Keep the others' records for apply_changes() before the journal starts over
+            self._fold_journal()
+            self.journal.start_generation()
+
+    def close(self, compact=True):
+        """
+        Folds the journal into the snapshot. With compact=False nothing is rewritten:
+        every edit is already safe in the journal, and quitting costs the same however
+        big the file is. The journal is then folded in by a later save, once it is long.
+        """
+        if not compact:
+            return
+        with self.lock:
+            if self.journal is not None and (self.journal.records or self._incoming or self._fresh is not None):
+                self._catch_up()
+                self._write_snapshots(self.contacts_data)
+            elif self.binary_path and not self.binary_fresh and self.contacts_data is not None:
+                # The JSON was loaded because the binary copy was missing or out of date; make it for next time
+                self._write_binary(self.contacts_data)
+
+    # The methods below expect the lock to be held
+
+    def _journal_is_long(self):
+        try:
+            return self.journal.offset >= COMPACT_SHARE * os.path.getsize(self.path)
+        except FileNotFoundError:
+            return True
+
+    def _collect_incoming(self):
+        """Reads other programs' new journal records into _incoming."""
+        if self._needs_reload:
+            return
+        records = self.journal.read_new()
+        if records is None:
+            self._needs_reload = True
+        else:
+            with self._incoming_lock:
+                self._incoming.extend(records)
+
+    def _catch_up(self):
+        """Applies every record from other programs that we haven't applied yet. Returns the changed names."""
+        if self.journal is None:
+            return []
+        self.fetch_changes()
+        return self.apply_changes()
+
+    def _read_fresh(self):
+        """Loads the snapshot and journal again, for when we fell too far behind to follow the journal."""
+        return load_contacts(self.path, self.journal)
+
+    def _fold_journal(self):
+        write_snapshot(self.path, _FoldedSnapshot(self.path, _journal_changes(self.journal)))
+        self.bytes_written += os.path.getsize(self.path)
+        self.binary_fresh = False
+
+    def _write_snapshots(self, contacts_data):
+        """
+        Folds the journal into a fresh JSON snapshot (and its binary copy).
+        The snapshots are replaced first and a new journal started second, so a crash
+        in between only means some records get replayed again on the next load.
+        """
+        write_snapshot(self.path, contacts_data)
+        self.bytes_written += os.path.getsize(self.path)
+        self._write_binary(contacts_data)
+        if self.journal is not None:
+            self.journal.start_generation()
+
+    def _write_binary(self, contacts_data):
+        self.binary_fresh = False
+        if self.binary_path:
+            try:
+                write_binary_snapshot(self.binary_path, contacts_data, self.path)
+                self.bytes_written += os.path.getsize(self.binary_path)
+                self.binary_fresh = True
+            except ValueError:
+                pass  # Contacts the binary format can't hold; the JSON snapshot is enough on its own
+
+
+def _journal_changes(journal):
+    """The last change in the journal to each contact: {name: details, or None if it was deleted}."""
+    records, _ = _read_records(journal.path, _journal_header(journal.path)[1])
+    changes = {}
+    for record in records:
+        if record['op'] == 'set':
+            changes[record['name']] = {'phone': record['phone'], 'email': record['email']}
+        else:
+            changes[record['name']] = None
+    return changes
+
+
+class _FoldedSnapshot:
+    """
+    A snapshot file with changes applied on top, read a chunk at a time as it is
+    written out, so compacting never holds the whole address book in memory.
+    It only has items(), which is all write_snapshot needs.
+    """
+
+    def __init__(self, path, changes):
+        self.path = path
+        self.changes = changes
+
+    def items(self):
+        changes = dict(self.changes)
+        if os.path.exists(self.path):
+            for name, details in iter_contacts(self.path):
+                if name in changes:
+                    details = changes.pop(name)
+                if details is not None:
+                    yield name, details
+        for name, details in changes.items():
+            if details is not None:
+                yield name, details
+
+
+def _apply_changes(contacts_data, changes):
+    """Applies (name, details) changes to a contacts dictionary; details=None deletes."""
+    for name, details in changes:
+        if details is None:
+            contacts_data.pop(name, None)
+        else:
+            contacts_data[name] = details
+
+
+def replace_contents(contacts_data, fresh):
+    """Makes contacts_data the same as fresh, touching only the contacts that differ. Returns their names."""
+    changed = [name for name in contacts_data if name not in fresh]
+    for name in changed:
+        del contacts_data[name]
+    for name, details in fresh.items():
+        if contacts_data.get(name) != details:
+            contacts_data[name] = details
+            changed.append(name)
+    return changed
+
+
+class SqliteStorage:
+    """
+    An SQLite database with one row per contact.
+    Loading reads rows straight into memory with no JSON to parse, and every edit
+    touches only its own row, however big the address book gets. WAL mode lets
+    readers carry on while a write is in progress.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # The GUI saves from its background writer thread, so the connection is shared behind a lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.executescript(SQLITE_SCHEMA)
+        self.contacts_data = None
+        self._data_version = None
+        self._fresh = None  # Every row, read by fetch_changes() for apply_changes()
+
+    def load(self, contacts_data=None):
+        if contacts_data is None:
+            contacts_data = {}
+        for name, details in self._read_all().items():
+            contacts_data[name] = details
+        self.contacts_data = contacts_data
+        return contacts_data
+
+    def _read_all(self):
+        with self._lock:
+            return self._read_rows()
+
+    def _read_rows(self):
+        """Reads every row. Call with _lock held."""
+        # data_version changes whenever another connection commits, which is how fetch_changes() notices
+        self._data_version = self._db.execute('PRAGMA data_version').fetchone()[0]
+        rows = self._db.execute('SELECT name, phone, email FROM contacts ORDER BY rowid').fetchall()
+        return {name: {'phone': phone, 'email': email} for name, phone, email in rows}
+
+    def save(self, name, details):
+        self.save_many([(name, details)])
+
+    def save_many(self, changes):
+        with self._lock, self._db:  # One transaction for the whole batch
+            for name, details in changes:
+                if details is None:
+                    self._db.execute('DELETE FROM contacts WHERE name = ?', (name,))
+                else:
+                    self._db.execute(SQLITE_UPSERT, (name, details['phone'], details['email']))
+            if self._fresh is not None:
+                _apply_changes(self._fresh, changes)
+
+    def save_all(self, contacts_data):
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM contacts')
+            self._db.executemany('INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)',
+                                 ((name, details['phone'], details['email'])
+                                  for name, details in contacts_data.items()))
+
+    def refresh(self):
+        """If another program has changed the database, brings the loaded contacts in line with it."""
+        self.fetch_changes()
+        return self.apply_changes()
+
+    def fetch_changes(self):
+        """If another program has changed the database, reads every row for apply_changes(). Safe on any thread."""
+        if self.contacts_data is None:
+            return
+        with self._lock:
+            if self._db.execute('PRAGMA data_version').fetchone()[0] != self._data_version:
+                self._fresh = self._read_rows()
+
+    def apply_changes(self, skip=()):
+        """Brings the loaded contacts in line with the rows fetch_changes() read, except those in skip."""
+        with self._lock:
+            fresh, self._fresh = self._fresh, None
+        if fresh is None:
+            return []
+        for name in skip:
+            if name in self.contacts_data:
+                fresh[name] = self.contacts_data[name]
+            else:
+                fresh.pop(name, None)
+        # SQLite keeps no list of what changed, so compare every row (still no file to parse)
+        return replace_contents(self.contacts_data, fresh)
+
+    def compact(self):
+        pass  # Every edit already went straight into its row
+
+    def close(self, compact=True):
+        with self._lock:
+            self._db.close()
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    name  TEXT PRIMARY KEY,
+    phone TEXT NOT NULL,
+    email TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_phone ON contacts (phone);
+CREATE INDEX IF NOT EXISTS contacts_email ON contacts (email COLLATE NOCASE);
+"""
+
+# Updating in place (rather than INSERT OR REPLACE) keeps a contact's position in the list
+SQLITE_UPSERT = """
+INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)
+ON CONFLICT (name) DO UPDATE SET phone = excluded.phone, email = excluded.email
+"""
+
+
+class MemoryStorage:
+    """Keeps nothing on disk. Used by the in-memory version of the program."""
+
+    def __init__(self, contacts_data=None):
+        self.initial = contacts_data or {}
+
+    def load(self, contacts_data=None):
+        if contacts_data is None:
+            contacts_data = {}
+        for name, details in self.initial.items():
+            contacts_data[name] = details
+        return contacts_data
+
+    def save(self, name, details):
+        pass
+
+    def save_many(self, changes):
+        pass
+
+    def save_all(self, contacts_data):
+        pass
+
+    def refresh(self):
+        return []
+
+    def fetch_changes(self):
+        pass
+
+    def apply_changes(self, skip=()):
+        return []
+
+    def compact(self):
+        pass
+
+    def close(self, compact=True):
+        pass
+
+
+# ---
+# Sharded snapshot
+# For very big address books the snapshot is split into shard files by a hash of
+# each name, in a folder with a small manifest:
+#   contacts.shards/manifest.json       {"format": "group16-shards", "version": 1, "shards": 64, ...}
+#   contacts.shards/shard-00.json ...   ordinary contacts snapshots, one per shard
+#   contacts.shards/contacts.journal    the same journal (and lock file) as contacts.json has
+# json.load only ever uses one core, so the shards are parsed side by side in a
+# pool of processes. Each process turns its shard into ContactStore columns, which
+# are quick to send back and to join together. Compaction only rewrites the shards
+# that the journal's records touch: the old shard file plus those few contacts.
+# ---
+MANIFEST_FORMAT = 'group16-shards'
+MANIFEST_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+SHARD_COUNT = 64
+SHARD_EXTENSION = '.shards'
+
+
+# The worker processes are forked, so they start at once and don't run the program's
+# own start-up code again (spawned ones would import the GUI or the menu and run it).
+# Forking while other threads are running can leave a worker stuck forever on a lock
+# one of them held at that moment (Python 3.12 warns about it), so a pool is only ever
+# forked while the program has a single thread: either up front by start_process_pool(),
+# before the loader, writer and search threads start, or for one call to map_in_processes.
+_pool = None
+
+
+def start_process_pool(workers=None):
+    """
+    Forks the pool map_in_processes uses from then on, from any thread. Call it before
+    the program starts any threads of its own; afterwards it does nothing. Also does
+    nothing with one worker or where fork isn't available (Windows).
+    """
+    global _pool
+    workers = workers or os.cpu_count() or 1
+    if _pool is not None or workers < 2 or not _can_fork():
+        return
+    _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'))
+    # A fork pool starts all its processes at the first task, before its own helper thread
+    _pool.submit(int).result()
+
+
+def _can_fork():
+    """True if a pool can be forked right now: fork exists and no other thread is running."""
+    return 'fork' in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+
+def map_in_processes(function, items, workers=None):
+    """
+    Returns [function(item) for item in items], worked out by a pool of processes
+    (one per CPU core unless workers says otherwise): the one start_process_pool()
+    started, or else one forked just for this call. The workers don't share the
+    caller's memory, so everything function needs has to be in its item. With one
+    worker, or on a thread when no pool was started, everything runs here instead.
+    """
+    items = list(items)
+    workers = min(workers or os.cpu_count() or 1, len(items))
+    if workers > 1 and _pool is not None:
+        return list(_pool.map(function, items))
+    if workers > 1 and _can_fork():
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            return list(pool.map(function, items))
+    return [function(item) for item in items]
+
+
+def shard_of(name, shard_count):
+    """Which shard a contact lives in. (crc32, because hash() of a string changes from run to run.)"""
+    return zlib.crc32(name.encode('utf-8')) % shard_count
+
+
+def shard_name(number):
+    return f'shard-{number:02d}.json'
+
+
+def read_shard_columns(path):
+    """Parses one shard file into ContactStore columns. Runs in the worker processes."""
+    return ContactStore(read_snapshot(path).items()).to_columns()
+
+
+def merge_columns(parts):
+    """Joins the columns of several shards into one set, renumbering their email domains."""
+    merged = {'names': [], 'phones': array('Q'), 'odd_phones': {}, 'email_text': bytearray(),
+              'email_length': array('I'), 'email_domain': array('I'), 'domains': ['']}
+    domain_numbers = {}
+    for part in parts:
+        first_row = len(merged['names'])
+        merged['names'] += part['names']
+        merged['phones'] += part['phones']
+        for row, phone in part['odd_phones'].items():
+            merged['odd_phones'][first_row + row] = phone
+        merged['email_text'] += part['email_text']
+        merged['email_length'] += part['email_length']
+
+        # Domain 0 means "no domain" everywhere; the rest get the merged set's numbers
+        renumber = [0]
+        for domain in part['domains'][1:]:
+            if domain not in domain_numbers:
+                domain_numbers[domain] = len(merged['domains'])
+                merged['domains'].append(domain)
+            renumber.append(domain_numbers[domain])
+        if renumber == list(range(len(renumber))):
+            merged['email_domain'] += part['email_domain']
+        else:
+            merged['email_domain'] += array('I', map(renumber.__getitem__, part['email_domain']))
+    return merged
+
+
+def write_shards(folder, contacts_data, shard_count):
+    """
+    Writes every contact into its shard's file in one pass over contacts_data.
+    Each shard goes to a temporary file first and is swapped in once all are written.
+    Returns the number of bytes written.
+    """
+    temp_files = []
+    try:
+        for _ in range(shard_count):
+            fd, temp_path = tempfile.mkstemp(prefix='.contacts-', suffix='.tmp', dir=folder)
+            temp_files.append((os.fdopen(fd, 'w', encoding='utf-8'), temp_path))
+        separators = ['{'] * shard_count
+        for name, details in contacts_data.items():
+            number = shard_of(name, shard_count)
+            temp_files[number][0].write(separators[number] + _format_contact(name, details))
+            separators[number] = ','
+        for (file, _), separator in zip(temp_files, separators):
+            file.write('{}' if separator == '{' else '\n}')
+            file.flush()
+            os.fsync(file.fileno())
+            file.close()
+    except BaseException:
+        for file, temp_path in temp_files:
+            file.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        raise
+
+    written = 0
+    for number, (_, temp_path) in enumerate(temp_files):
+        written += os.path.getsize(temp_path)
+        path = os.path.join(folder, shard_name(number))
+        _copy_mode(temp_path, path)
+        os.replace(temp_path, path)
+    _fsync_directory(folder)
+    return written
+
+
+class ShardedStorage(JsonStorage):
+    """
+    A JSON snapshot split into shard files, with the same journal, locking and
+    refresh() as JsonStorage. Loading parses the shards in parallel, and saving
+    rewrites only the shards whose contacts changed.
+    """
+
+    def __init__(self, folder, shard_count=SHARD_COUNT, use_journal=True, compact_every=COMPACT_EVERY,
+                 workers=None):
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.manifest_path = os.path.join(folder, MANIFEST_NAME)
+        manifest = self._read_manifest()
+        self.shard_count = manifest['shards'] if manifest else shard_count  # Fixed once a folder has shards
+        self.workers = workers  # Processes for loading; None means one per CPU core
+        # Loading and reloading happen on the programs' loader and writer threads, where
+        # forking isn't safe, so the processes are started now, while there are no threads yet
+        start_process_pool(workers)
+        self._unsaved = set()   # Without a journal: names saved since the shards were last written
+        journal_path = os.path.join(folder, 'contacts.journal') if use_journal else None
+        super().__init__(self.manifest_path, journal_path, compact_every, None, os.path.join(folder, 'contacts.lock'))
+
+    def load(self, contacts_data=None):
+        with self.lock:
+            self.contacts_data = self._read_shards(contacts_data)
+            if self.journal is not None:
+                self.journal.replay(self.contacts_data)
+        return self.contacts_data
+
+    def save_many(self, changes):
+        changes = list(changes)
+        if self.journal is None:
+            self._unsaved.update(name for name, _ in changes)
+        super().save_many(changes)
+
+    # The methods below expect the lock to be held
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return None
+        if manifest.get('format') != MANIFEST_FORMAT or manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f'{self.manifest_path} is not a contacts manifest this program can read')
+        return manifest
+
+    def _write_manifest(self):
+        manifest = {'format': MANIFEST_FORMAT, 'version': MANIFEST_VERSION, 'shards': self.shard_count,
+                    'hash': 'crc32 of the UTF-8 name, modulo shards',
+                    'files': [shard_name(number) for number in range(self.shard_count)]}
+        _replace_file(self.manifest_path, lambda file: json.dump(manifest, file, indent=4))
+
+    def _shard_path(self, number):
+        return os.path.join(self.folder, shard_name(number))
+
+    def _read_shards(self, contacts_data):
+        """Fills contacts_data (or a new ContactStore) from every shard, parsing them in parallel."""
+        paths = [path for path in map(self._shard_path, range(self.shard_count)) if os.path.exists(path)]
+        parts = map_in_processes(read_shard_columns, paths, self.workers)
+
+        store = contacts_data if isinstance(contacts_data, ContactStore) and not contacts_data else ContactStore()
+        store.load_columns(merge_columns(parts))
+        if contacts_data is None or contacts_data is store:
+            return store
+        for name, details in store.items():
+            contacts_data[name] = details
+        return contacts_data
+
+    def _journal_is_long(self):
+        size = sum(os.path.getsize(path) for path in map(self._shard_path, range(self.shard_count))
+                   if os.path.exists(path))
+        return self.journal.offset >= COMPACT_SHARE * size
+
+    def _read_fresh(self):
+        fresh = self._read_shards(None)
+        if self.journal is not None:
+            self.journal.replay(fresh)
+        return fresh
+
+    def _fold_journal(self):
+        if not os.path.exists(self.manifest_path):
+            self._write_manifest()
+        self._write_changed_shards()
+
+    def _write_snapshots(self, contacts_data):
+        """Rewrites the shards that changed (or all of them, for a different set of contacts)."""
+        if not os.path.exists(self.manifest_path):
+            self._write_manifest()
+        if contacts_data is self.contacts_data:
+            self._write_changed_shards()
+        else:
+            self.bytes_written += write_shards(self.folder, contacts_data, self.shard_count)
+        if self.journal is not None:
+            self.journal.start_generation()
+
+    def _write_changed_shards(self):
+        """
+        The shards on disk plus the journal make up the contacts, so each shard the
+        journal touches is its old file with the journal's last change to those contacts.
+        """
+        if self.journal is None:
+            unsaved, self._unsaved = self._unsaved, set()
+            changes = {name: self.contacts_data.get(name) for name in unsaved}
+        else:
+            changes = _journal_changes(self.journal)
+
+        by_shard = {}
+        for name in changes:
+            by_shard.setdefault(shard_of(name, self.shard_count), []).append(name)
+        for number, names in sorted(by_shard.items()):
+            path = self._shard_path(number)
+            shard = read_snapshot(path)
+            for name in names:
+                details = changes[name]
+                if details is None:
+                    shard.pop(name, None)
+                else:
+                    shard[name] = {'phone': details['phone'], 'email': details['email']}
+            write_snapshot(path, shard)
+            self.bytes_written += os.path.getsize(path)
+
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+
+def open_storage(path, use_journal=True, compact_every=COMPACT_EVERY, use_binary=True, shard_count=SHARD_COUNT):
+    """
+    Picks the backend from the file name: .db / .sqlite for SQLite, a folder ending in
+    .shards for a sharded snapshot, anything else is a snapshot file: JSON, or the compact
+    row format for .rows / .rows.gz. A snapshot file gets a journal (contacts.journal),
+    a binary copy (contacts.bin) and a lock file (contacts.lock) next to it; a row file
+    keeps its whole name in theirs (contacts.rows.gz.journal and so on).
+    """
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return SqliteStorage(path)
+    if path.rstrip('/\\').lower().endswith(SHARD_EXTENSION):
+        return ShardedStorage(path, shard_count, use_journal, compact_every)
+    if path.lower().endswith(ROWS_EXTENSIONS):
+        # contacts.rows.gz.journal and so on: contacts.json, contacts.rows and contacts.rows.gz
+        # can sit side by side, each with a journal, binary copy and lock of its own
+        base = path
+    else:
+        base = os.path.splitext(path)[0]
+    journal_path = base + '.journal' if use_journal else None
+    binary_path = base + '.bin' if use_binary else None
+    return JsonStorage(path, journal_path, compact_every, binary_path, base + '.lock')
+
+
+def migrate(source_path, target_path, shard_count=SHARD_COUNT):
+    """Copies every contact from one storage file to another, e.g. contacts.json -> contacts.db."""
+    source = open_storage(source_path)
+    target = open_storage(target_path, shard_count=shard_count)
+    contacts_data = source.load(ContactStore())
+    target.save_all(contacts_data)
+    source.close()
+    target.close()
+    return len(contacts_data)
+
+
+# ---
+# Lazy loading
+# Loading a big address book (and building its indexes) takes a while. With
+# LazyContacts a program can show its menu straight away while the contacts load
+# on a background thread; the first thing that really needs them waits for it.
+# ---
+class LazyContacts:
+    """Stands in for the ContactStore that load() returns, loading it in the background."""
+
+    def __init__(self, load):
+        self._load = load
+        self._contacts = None
+        self._error = None
+        self._pending = []      # indexes to attach once the contacts are loaded
+        self._attached = False  # True once the loader has attached every pending index
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='contact-loader', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self._contacts = self._load()
+            while True:
+                with self._lock:
+                    indexes, self._pending = self._pending, []
+                    if not indexes:
+                        self._attached = True
+                        return
+                for index in indexes:
+                    self._contacts.add_index(index)
+        except Exception as error:  # Handed to whoever first uses the contacts
+            self._error = error
+
+    def wait(self):
+        """Blocks until the contacts (and their indexes) are ready, and returns the real store."""
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._contacts
+
+    def add_index(self, index):
+        """Like ContactStore.add_index, but the index is filled in the background too."""
+        with self._lock:
+            if not self._attached and self._error is None:
+                self._pending.append(index)
+                return _WhenLoaded(index, self.wait)
+        return self.wait().add_index(index)
+
+    # Everything else is the store's own behaviour, once it has loaded
+    def __getattr__(self, attribute):
+        return getattr(self.wait(), attribute)
+
+    def __len__(self):
+        return len(self.wait())
+
+    def __contains__(self, name):
+        return name in self.wait()
+
+    def __iter__(self):
+        return iter(self.wait())
+
+    def __getitem__(self, name):
+        return self.wait()[name]
+
+    def __setitem__(self, name, details):
+        self.wait()[name] = details
+
+    def __delitem__(self, name):
+        del self.wait()[name]
+
+
+class _WhenLoaded:
+    """An index handed out by LazyContacts.add_index; using it waits for the load."""
+
+    def __init__(self, index, wait):
+        self._index = index
+        self._wait = wait
+
+    def __getattr__(self, attribute):
+        self._wait()
+        return getattr(self._index, attribute)
+
+    # len(), slicing and loops look these up on the class, so they are passed on here
+    def __len__(self):
+        self._wait()
+        return len(self._index)
+
+    def __getitem__(self, item):
+        self._wait()
+        return self._index[item]
+
+    def __iter__(self):
+        self._wait()
+        return iter(self._index)
+
+
+# ---
+# Background writer
+# For the GUI and the HTTP API: handlers only hand their change to the writer, which
+# saves it through the storage backend on its own thread. Changes that arrive close
+# together are written as one batch, and later changes to the same contact
+# replace earlier ones that haven't been written yet.
+# ---
+class BackgroundWriter:
+    """Saves changes on a background thread so the caller never waits on the disk."""
+
+    def __init__(self, storage, delay=0.5):
+        self.storage = storage
+        self.delay = delay  # How long to wait for more changes before writing
+        self.error = None   # The last write error, if any
+        self._pending = {}  # name -> details, or None for a deleted contact
+        self._writing = {}  # The changes being written right now
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._fetch_wanted = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='contact-writer', daemon=True)
+        self._thread.start()
+
+    def record(self, name, details):
+        """Queues a change. details=None means the contact was deleted. Returns at once."""
+        if details is not None:
+            details = {'phone': details['phone'], 'email': details['email']}
+        with self._lock:
+            self._pending[name] = details
+        self._wake.set()
+
+    def pending_names(self):
+        """The names of the contacts with changes that haven't been saved yet."""
+        with self._lock:
+            return set(self._pending) | set(self._writing)
+
+    def fetch_changes(self):
+        """
+        Asks the thread to save what is queued and then read other programs' changes
+        (storage.fetch_changes), so the caller only has to apply them. Returns at once.
+        """
+        self._fetch_wanted.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._closed.is_set():
+            self._wake.wait()
+            self._closed.wait(self.delay)  # Let a burst of edits pile up (unless we're closing)
+            self._wake.clear()
+            self.flush()
+            if self._fetch_wanted.is_set():
+                self._fetch_wanted.clear()
+                with self._write_lock:
+                    try:
+                        self.storage.fetch_changes()
+                    except (OSError, sqlite3.Error) as error:
+                        self.error = error  # Tried again at the next fetch_changes()
+
+    def flush(self):
+        """Writes everything queued so far."""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._writing = pending
+            if not pending:
+                return
+            try:
+                self.storage.save_many(pending.items())
+            except (OSError, sqlite3.Error) as error:
+                # Put the changes back (behind anything newer) so the next flush retries them
+                self.error = error
+                with self._lock:
+                    pending.update(self._pending)
+                    self._pending = pending
+                    self._writing = {}
+            else:
+                self.error = None
+                with self._lock:
+                    self._writing = {}
+
+    def close(self):
+        """Stops the thread and writes anything still queued. Call this before quitting."""
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+
+# ---
+# Command line: python contact_storage.py migrate contacts.json contacts.db
+# ---
+def main():
+    parser = argparse.ArgumentParser(description='Contact storage tools.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    migrate_command = commands.add_parser('migrate', help='copy contacts from one storage file to another')
+    migrate_command.add_argument('source', help='for example contacts.json')
+    migrate_command.add_argument('target', help='for example contacts.db, or contacts.shards for a sharded folder')
+    migrate_command.add_argument('--shards', type=int, default=SHARD_COUNT, help='how many shards a new .shards folder gets')
+    arguments = parser.parse_args()
+
+    if arguments.command == 'migrate':
+        count = migrate(arguments.source, arguments.target, arguments.shards)
+        print(f'Copied {count} contact(s) from {arguments.source} to {arguments.target}.')
+
+
+if __name__ == "__main__":
+    main()
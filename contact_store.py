@@ -0,0 +1,483 @@
+# Group 16 - Contact Management System
+# A compact, dictionary-like container for contacts.
+#
+# A plain dict-of-dicts spends hundreds of bytes per contact on the inner dict and
+# its two string objects. ContactStore keeps the same "contacts[name]" feel but
+# stores the details in columns instead:
+#   - phones are packed into an array of 64-bit integers
+#   - the part of each email before the '@' lives in one shared byte buffer
+#   - email domains ("gmail.com", "email.com", ...) are stored once and referred to by number
+# The names themselves are the dictionary keys, just like before.
+
+from array import array
+from itertools import accumulate
+
+# Rebuild the email buffer once this many bytes in it belong to old, replaced emails
+EMAIL_GARBAGE_LIMIT = 1024 * 1024
+
+# The kinds of event in the change feed (see ContactStore.subscribe)
+ADDED = 'added'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+
+class Contact:
+    """
+    The details of one contact, built on request from the store's columns.
+    It reads like the old inner dictionary: details['phone'], details['email'].
+    """
+    __slots__ = ('phone', 'email')
+
+    def __init__(self, phone, email):
+        self.phone = phone
+        self.email = email
+
+    def __getitem__(self, key):
+        if key == 'phone':
+            return self.phone
+        if key == 'email':
+            return self.email
+        raise KeyError(key)
+
+    def __eq__(self, other):
+        if isinstance(other, Contact):
+            return (self.phone, self.email) == (other.phone, other.email)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f'Contact(phone={self.phone!r}, email={self.email!r})'
+
+    def to_dict(self):
+        return {'phone': self.phone, 'email': self.email}
+
+
+# ---
+# Packing helpers
+# A phone made of digits is kept as one integer. A leading marker digit remembers
+# whether the number started with '+', and also keeps any leading zeros:
+#   "0549876543"    -> 10549876543
+#   "+233241234567" -> 2233241234567
+# Anything else (which validation shouldn't let in) is kept as-is on the side.
+# ---
+def _pack_phone(phone):
+    digits = phone[1:] if phone.startswith('+') else phone
+    if digits.isdigit() and digits.isascii() and len(digits) <= 18:
+        return int(('2' if phone.startswith('+') else '1') + digits)
+    return 0
+
+
+def _unpack_phone(code):
+    text = str(code)
+    return ('+' if text[0] == '2' else '') + text[1:]
+
+
+class ContactStore:
+    """A memory-efficient mapping of contact name -> Contact details."""
+
+    def __init__(self, contacts_data=()):
+        self._rows = {}              # name -> row number in the columns below
+        self._phones = array('Q')    # packed phone numbers
+        self._odd_phones = {}        # row -> phone for the rare phone that can't be packed
+        self._email_text = bytearray()  # the part before '@' of every email, back to back
+        self._email_start = array('Q')  # where each row's text starts in _email_text
+        self._email_length = array('I')
+        self._email_domain = array('I')  # domain number; 0 means the email had no '@'
+        self._domains = ['']         # domain number -> domain text
+        self._domain_numbers = {}    # domain text -> domain number
+        self._garbage = 0            # bytes in _email_text no longer used by any row
+        self._free_rows = []         # rows left behind by deleted contacts, ready for reuse
+        self._indexes = []
+        self._listeners = []         # functions told about every change, see subscribe()
+
+        if isinstance(contacts_data, dict):
+            contacts_data = contacts_data.items()
+        for name, details in contacts_data:
+            self[name] = details
+
+    # ---
+    # Reading
+    # ---
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __getitem__(self, name):
+        return self._read(self._rows[name])
+
+    def get(self, name, default=None):
+        row = self._rows.get(name)
+        return default if row is None else self._read(row)
+
+    def keys(self):
+        return self._rows.keys()
+
+    def items(self):
+        """Yields (name, details) pairs in the order the contacts were added."""
+        for name, row in self._rows.items():
+            yield name, self._read(row)
+
+    def values(self):
+        for row in self._rows.values():
+            yield self._read(row)
+
+    def _read(self, row):
+        code = self._phones[row]
+        phone = _unpack_phone(code) if code else self._odd_phones[row]
+        start = self._email_start[row]
+        email = self._email_text[start:start + self._email_length[row]].decode('utf-8')
+        domain = self._email_domain[row]
+        if domain:
+            email += '@' + self._domains[domain]
+        return Contact(phone, email)
+
+    # ---
+    # Writing
+    # ---
+    def __setitem__(self, name, details):
+        """Adds a contact, or replaces all of an existing contact's details."""
+        phone, email = details['phone'], details['email']
+        old = self.get(name)
+        row = self._rows.get(name)
+        if row is None:
+            row = self._new_row()
+            self._rows[name] = row
+        self._write(row, phone, email)
+
+        new = self._read(row)
+        for index in self._indexes:
+            if old is None:
+                index.add(name, new)
+            else:
+                index.update(name, old, new)
+        for listener in self._listeners:
+            listener(ADDED if old is None else UPDATED, name, new)
+
+    def edit(self, name, phone=None, email=None):
+        """Changes just the phone and/or the email of an existing contact."""
+        old = self[name]
+        self[name] = {'phone': old.phone if phone is None else phone,
+                      'email': old.email if email is None else email}
+
+    def __delitem__(self, name):
+        old = self[name]
+        row = self._rows.pop(name)
+        self._odd_phones.pop(row, None)
+        self._garbage += self._email_length[row]
+        self._email_length[row] = 0
+        self._free_rows.append(row)
+        for index in self._indexes:
+            index.remove(name, old)
+        for listener in self._listeners:
+            listener(DELETED, name, None)
+
+    def pop(self, name, *default):
+        if name not in self._rows:
+            if default:
+                return default[0]
+            raise KeyError(name)
+        details = self[name]
+        del self[name]
+        return details
+
+    def _new_row(self):
+        if self._free_rows:
+            return self._free_rows.pop()
+        self._phones.append(0)
+        self._email_start.append(0)
+        self._email_length.append(0)
+        self._email_domain.append(0)
+        return len(self._phones) - 1
+
+    def _write(self, row, phone, email):
+        code = _pack_phone(phone)
+        self._phones[row] = code
+        if code:
+            self._odd_phones.pop(row, None)
+        else:
+            self._odd_phones[row] = phone
+
+        local, at, domain = email.rpartition('@')
+        if not at:
+            local, domain = email, None
+        if domain is None:
+            domain_number = 0
+        else:
+            domain_number = self._domain_numbers.get(domain)
+            if domain_number is None:
+                domain_number = len(self._domains)
+                self._domains.append(domain)
+                self._domain_numbers[domain] = domain_number
+
+        # New email text always goes on the end of the buffer; the old text becomes garbage
+        encoded = local.encode('utf-8')
+        self._garbage += self._email_length[row]
+        self._email_start[row] = len(self._email_text)
+        self._email_length[row] = len(encoded)
+        self._email_domain[row] = domain_number
+        self._email_text += encoded
+        if self._garbage > EMAIL_GARBAGE_LIMIT and self._garbage * 2 > len(self._email_text):
+            self._compact_emails()
+
+    def _compact_emails(self):
+        """Copies the live email text into a fresh buffer, dropping replaced and deleted emails."""
+        text = bytearray()
+        for row in self._rows.values():
+            start = self._email_start[row]
+            self._email_start[row] = len(text)
+            text += self._email_text[start:start + self._email_length[row]]
+        self._email_text = text
+        self._garbage = 0
+
+    # ---
+    # Indexes
+    # An index is any object with add(name, details), update(name, old, new) and
+    # remove(name, details). The store keeps every index it is given up to date.
+    # An index may also have conflict(name, details) to refuse duplicates, and
+    # add_all(items) to be filled with every (name, details) at once, faster than one by one.
+    # ---
+    def conflict(self, name, details):
+        """Asks each index whether details could be saved under name. Returns the first objection, or None."""
+        for index in self._indexes:
+            check = getattr(index, 'conflict', None)
+            problem = check(name, details) if check else None
+            if problem:
+                return problem
+        return None
+
+    def add_index(self, index):
+        """Fills an index with the current contacts and keeps it in step from now on."""
+        add_all = getattr(index, 'add_all', None)
+        if add_all:
+            add_all(self.items())
+        else:
+            for name, details in self.items():
+                index.add(name, details)
+        self._indexes.append(index)
+        return index
+
+    # ---
+    # Change feed
+    # Listeners hear about each change after it is made and the indexes are up to
+    # date, as listener(event, name, details): ADDED or UPDATED with the new
+    # details, or DELETED with None. The GUI uses it to redraw just the rows that
+    # changed, whether the change came from a button, a transaction or another window.
+    # ---
+    def subscribe(self, listener):
+        """Calls listener(event, name, details) after every add, update and delete from now on."""
+        self._listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    # ---
+    # Transactions
+    # ---
+    def transaction(self, save=None, check=None):
+        """
+        Groups adds, updates and deletes so they all happen, or none do:
+            with contacts.transaction(storage.save_many) as batch:
+                batch['Ama Serwaa'] = {'phone': '0549876543', 'email': 'ama@email.com'}
+                batch.edit('Kofi Osei', phone='0551234567')
+                del batch['Yaw Boateng']
+        See Transaction for save and check.
+        """
+        return Transaction(self, save, check)
+
+    # ---
+    # Columns
+    # The whole store can be handed out and taken back as a few big arrays and byte
+    # strings, which is what the binary snapshot saves. Loading them back is a handful
+    # of bulk copies instead of one step per contact.
+    # ---
+    def to_columns(self):
+        """Returns the contacts as columns, in the order they were added, leaving out deleted rows."""
+        rows = list(self._rows.values())
+        email_text = bytearray()
+        for row in rows:
+            start = self._email_start[row]
+            email_text += self._email_text[start:start + self._email_length[row]]
+        return {
+            'names': list(self._rows),
+            'phones': array('Q', (self._phones[row] for row in rows)),
+            'odd_phones': {new_row: self._odd_phones[row] for new_row, row in enumerate(rows) if row in self._odd_phones},
+            'email_text': bytes(email_text),
+            'email_length': array('I', (self._email_length[row] for row in rows)),
+            'email_domain': array('I', (self._email_domain[row] for row in rows)),
+            'domains': list(self._domains),
+        }
+
+    def load_columns(self, columns):
+        """Fills an empty store (with no indexes yet) from to_columns() output."""
+        if self._rows or self._indexes:
+            raise ValueError('load_columns needs an empty store with no indexes')
+        names = columns['names']
+        self._rows = dict(zip(names, range(len(names))))
+        self._phones = columns['phones']
+        self._odd_phones = dict(columns['odd_phones'])
+        self._email_text = bytearray(columns['email_text'])
+        self._email_length = columns['email_length']
+        self._email_start = array('Q', accumulate(self._email_length, initial=0))
+        self._email_start.pop()  # accumulate also gives the total length at the end
+        self._email_domain = columns['email_domain']
+        self._domains = list(columns['domains'])
+        self._domain_numbers = {domain: number for number, domain in enumerate(self._domains) if number}
+
+
+
+# ---
+# Transactions
+# Changes are staged in the transaction, not the store, until it commits. Commit
+# checks them all, applies them all, and hands them to save() in one go (one
+# journal append and fsync, one SQLite transaction, or one snapshot rewrite). If
+# a check or the save fails, the store is put back the way it was, in the same
+# order. Listeners only hear about the changes once they have been saved.
+# ---
+class TransactionError(ValueError):
+    """A transaction was refused. problems lists (name, reason) for every change that didn't check out."""
+
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__('; '.join(f'{name}: {reason}' for name, reason in problems))
+
+
+class Transaction:
+    """
+    Staged changes to a ContactStore. Reading from it sees the staged changes on top
+    of the store. save(changes) is called with every (name, details) change on commit,
+    details=None for a delete; check(name, details) may return a reason to refuse one.
+    """
+
+    def __init__(self, store, save=None, check=None):
+        self.store = store
+        self.save = save
+        self.check = check
+        self.changes = {}  # name -> details, or None for a delete
+        self.finished = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Leaving the with block normally commits; an exception throws the changes away
+        if exc_type is None and not self.finished:
+            self.commit()
+        else:
+            self.rollback()
+
+    # Reading
+
+    def __contains__(self, name):
+        if name in self.changes:
+            return self.changes[name] is not None
+        return name in self.store
+
+    def __getitem__(self, name):
+        if name in self.changes:
+            if self.changes[name] is None:
+                raise KeyError(name)
+            return self.changes[name]
+        return self.store[name]
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def conflict(self, name, details):
+        """The store's objection to details, if any. Commit checks again, with every change in place."""
+        return self.store.conflict(name, details)
+
+    # Staging
+
+    def __setitem__(self, name, details):
+        self.changes[name] = {'phone': details['phone'], 'email': details['email']}
+
+    def edit(self, name, phone=None, email=None):
+        old = self[name]
+        self[name] = {'phone': old['phone'] if phone is None else phone,
+                      'email': old['email'] if email is None else email}
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self.changes[name] = None
+
+    # Finishing
+
+    def commit(self):
+        """
+        Applies and saves every staged change together. Raises TransactionError, with
+        the store left as it was, if any change is refused.
+        """
+        if self.finished:
+            raise RuntimeError('This transaction has already been committed or rolled back.')
+        self.finished = True
+        changes = list(self.changes.items())
+        if not changes:
+            return
+
+        problems = []
+        if self.check is not None:
+            for name, details in changes:
+                problem = self.check(name, details) if details is not None else None
+                if problem:
+                    problems.append((name, problem))
+        if problems:
+            raise TransactionError(problems)
+
+        store = self.store
+        undo = []  # (name, details before the change), to put the store back
+        # A deleted contact put back would go on the end, so remember where everyone was
+        order = list(store) if any(details is None and name in store for name, details in changes) else None
+        listeners, store._listeners = store._listeners, []  # Told below, once the changes are saved
+        try:
+            for name, details in changes:
+                undo.append((name, store.get(name)))
+                if details is None:
+                    store.pop(name, None)
+                else:
+                    store[name] = details
+
+            # Duplicates are checked with every change in place, so two contacts may swap
+            # numbers, but two contacts can't end up with the same one
+            for name, details in changes:
+                problem = store.conflict(name, details) if details is not None else None
+                if problem:
+                    problems.append((name, problem))
+            if problems:
+                raise TransactionError(problems)
+
+            if self.save is not None:
+                self.save(changes)
+        except BaseException:
+            for name, details in reversed(undo):
+                if details is None:
+                    store.pop(name, None)
+                else:
+                    store[name] = details
+            if order is not None:
+                store._rows = {name: store._rows[name] for name in order}
+            raise
+        finally:
+            store._listeners = listeners
+
+        for name, old in undo:
+            if name in store:
+                event, details = (UPDATED if old is not None else ADDED), store[name]
+            elif old is not None:
+                event, details = DELETED, None
+            else:
+                continue  # Deleted something that wasn't there
+            for listener in listeners:
+                listener(event, name, details)
+
+    def rollback(self):
+        """Throws away the staged changes. The store was never touched."""
+        self.finished = True
+        self.changes = {}
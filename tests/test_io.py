@@ -0,0 +1,27 @@
+# Group 16 - Contact Management System
+# Tests for reading and writing vCard text.
+#
+# Run from the project folder:
+#     python -m unittest discover tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_io import _escape, _unescape
+
+
+class VcardEscapeTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        for value in ['Ama Serwaa', 'Mensah, Kwame', 'a;b', 'back\\slash', 'ends with \\', 'slash then comma \\,']:
+            self.assertEqual(_unescape(_escape(value)), value)
+
+    def test_escaped_backslash_before_comma(self):
+        self.assertEqual(_unescape('a\\\\,b'), 'a\\,b')
+
+
+if __name__ == '__main__':
+    unittest.main()
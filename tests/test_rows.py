@@ -0,0 +1,39 @@
+# Group 16 - Contact Management System
+# Tests for the compact row snapshot (contacts.rows).
+#
+# Run from the project folder:
+#     python -m unittest discover tests
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_storage import ROWS_HEADER, ROWS_PER_WRITE, read_snapshot, write_snapshot
+
+
+class RowsTest(unittest.TestCase):
+
+    def test_exact_number_of_writes(self):
+        # The header and one domain line, plus contacts to make exactly ROWS_PER_WRITE lines
+        contacts = {f'Contact {number}': {'phone': f'{number:010d}', 'email': f'person{number}@email.com'}
+                    for number in range(ROWS_PER_WRITE - 2)}
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'contacts.rows')
+            write_snapshot(path, contacts)
+            with open(path, encoding='utf-8') as file:
+                self.assertEqual(len(file.read().split('\n')), ROWS_PER_WRITE + 1)  # No blank line after the last row
+            self.assertEqual(read_snapshot(path), contacts)
+
+    def test_blank_line_from_older_versions(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'contacts.rows')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(ROWS_HEADER + '\n["email.com"]\n["Ama Serwaa","0549876543","ama",1]\n\n')
+            self.assertEqual(read_snapshot(path), {'Ama Serwaa': {'phone': '0549876543', 'email': 'ama@email.com'}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# Group 16 - Contact Management System
+# Tests for ContactStore transactions.
+#
+# Run from the project folder:
+#     python -m unittest discover tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_store import ADDED, DELETED, UPDATED, ContactStore
+
+
+def failing_save(changes):
+    raise OSError('disk full')
+
+
+class TransactionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.contacts = ContactStore()
+        for number, name in enumerate(['Ama', 'Kofi', 'Yaw']):
+            self.contacts[name] = {'phone': f'054000000{number}', 'email': f'{name.lower()}@email.com'}
+        self.events = []
+        self.contacts.subscribe(lambda event, name, details: self.events.append((event, name)))
+
+    def test_rollback_keeps_order_and_is_silent(self):
+        with self.assertRaises(OSError):
+            with self.contacts.transaction(failing_save) as batch:
+                del batch['Ama']
+                batch.edit('Kofi', phone='0551111111')
+                batch['Esi'] = {'phone': '0552222222', 'email': 'esi@email.com'}
+        self.assertEqual(list(self.contacts), ['Ama', 'Kofi', 'Yaw'])
+        self.assertEqual(self.contacts['Kofi']['phone'], '0540000001')
+        self.assertEqual(self.events, [])
+
+    def test_commit_tells_listeners_once(self):
+        with self.contacts.transaction() as batch:
+            del batch['Ama']
+            batch.edit('Kofi', phone='0551111111')
+            batch['Esi'] = {'phone': '0552222222', 'email': 'esi@email.com'}
+        self.assertEqual(self.events, [(DELETED, 'Ama'), (UPDATED, 'Kofi'), (ADDED, 'Esi')])
+
+
+if __name__ == '__main__':
+    unittest.main()